@@ -3,9 +3,11 @@ import importlib
 from .base_challenge import *
 from .bitpacking import *
 from .cache_utils import *
+from .circuit import *
 from .collections_utils import *
 from .crypto import *
 from .direction import *
+from .graph_contraction import *
 from .helper import *
 from .icpc_utils import *
 from .math_utils import *
@@ -13,9 +15,12 @@ from .method_utils import *
 from .parse_map_utils import *
 from .point import *
 from .polymorphic import *
+from .register_machine import *
+from .search import *
 from .show_utils import *
 from .string_utils import *
 from .system_utils import *
+from .travelling_salesman import *
 from .typing_utils import *
 
 test_modules = sum((
@@ -24,9 +29,11 @@ test_modules = sum((
         importlib.import_module('utils.base_challenge'),
         importlib.import_module('utils.bitpacking'),
         importlib.import_module('utils.cache_utils'),
+        importlib.import_module('utils.circuit'),
         importlib.import_module('utils.collections_utils'),
         importlib.import_module('utils.crypto'),
         importlib.import_module('utils.direction'),
+        importlib.import_module('utils.graph_contraction'),
         importlib.import_module('utils.math_utils'),
         importlib.import_module('utils.method_utils'),
         importlib.import_module('utils.helper'),
@@ -34,9 +41,12 @@ test_modules = sum((
         importlib.import_module('utils.parse_map_utils'),
         importlib.import_module('utils.point'),
         importlib.import_module('utils.polymorphic'),
+        importlib.import_module('utils.register_machine'),
+        importlib.import_module('utils.search'),
         importlib.import_module('utils.show_utils'),
         importlib.import_module('utils.string_utils'),
         importlib.import_module('utils.system_utils'),
+        importlib.import_module('utils.travelling_salesman'),
         importlib.import_module('utils.typing_utils'),
     )
 ), [])
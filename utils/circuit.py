@@ -0,0 +1,310 @@
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+__all__ = [
+    'Circuit',
+    'CircuitCycleException',
+    'CircuitGate',
+]
+
+
+CircuitGate = Tuple[Callable[..., Any], Tuple[str, ...]]
+CompiledGate = Tuple[int, Callable[..., Any], Tuple[int, ...]]
+
+
+class CircuitCycleException(Exception):
+    pass
+
+
+class Circuit:
+    """
+    A netlist of gates, compiled once into a topologically sorted list of
+    operations on value slots, so that it can be evaluated without polling
+    for gates whose inputs are ready.
+
+    The gates are keyed by their output wire, and are a function and the names
+    of their input wires. Any wire that has a value is a source, even if a
+    gate would drive it.
+
+    >>> circuit = Circuit({
+    ...     'c': (int.__add__, ('a', 'b')),
+    ...     'd': (int.__mul__, ('c', 'c')),
+    ...     'e': (int.__neg__, ('b',)),
+    ... }, {'a': 1, 'b': 2})
+    >>> circuit['c'], circuit['d'], circuit['e']
+    (3, 9, -2)
+
+    Changing a source only re-evaluates the gates downstream of it, and
+    returns the wires that changed:
+
+    >>> circuit.set_values({'a': 2})
+    ['a', 'c', 'd']
+    >>> circuit['d']
+    16
+    >>> circuit.set_values({'a': 2})
+    []
+
+    A gate output can be overridden, which disconnects its gate:
+
+    >>> circuit.set_values({'c': 5})
+    ['c', 'd']
+    >>> circuit['d']
+    25
+    >>> circuit.set_values({'a': 0})
+    ['a']
+    """
+
+    def __init__(self, gates: Dict[str, CircuitGate],
+                 values: Dict[str, Any]):
+        self.gates = dict(gates)
+        self.names = list(values) + [
+            name
+            for name in gates
+            if name not in values
+        ]
+        self.slots = {
+            name: slot
+            for slot, name in enumerate(self.names)
+        }
+        for output, (_, inputs) in gates.items():
+            for name in inputs:
+                if name not in self.slots:
+                    raise Exception(
+                        f"Wire '{name}', read by '{output}', has no value "
+                        f"and no gate")
+        self.sources: Set[int] = {self.slots[name] for name in values}
+        self.operations = self.compile()
+        self.index_operations()
+        self.values: List[Any] = [None] * len(self.names)
+        for name, value in values.items():
+            self.values[self.slots[name]] = value
+        self.evaluate()
+
+    def compile(self) -> List[CompiledGate]:
+        """
+        Sort the gates topologically, and resolve the wires to slots
+
+        >>> Circuit({
+        ...     'a': (int.__neg__, ('b',)),
+        ...     'b': (int.__neg__, ('a',)),
+        ...     'c': (int.__neg__, ('d',)),
+        ... }, {'d': 1})
+        Traceback (most recent call last):
+        ...
+        utils.circuit.CircuitCycleException: Could not sort 2 gates: a, b
+        """
+        pending_counts = {
+            output: sum(
+                1
+                for name in inputs
+                if name in self.gates and self.slots[name] not in self.sources
+            )
+            for output, (_, inputs) in self.gates.items()
+            if self.slots[output] not in self.sources
+        }
+        readers_by_name: Dict[str, List[str]] = {}
+        for output in pending_counts:
+            _, inputs = self.gates[output]
+            for name in inputs:
+                readers_by_name.setdefault(name, []).append(output)
+        ready = [
+            output
+            for output, count in pending_counts.items()
+            if count == 0
+        ]
+        order = []
+        while ready:
+            output = ready.pop()
+            order.append(output)
+            for reader in readers_by_name.get(output, []):
+                pending_counts[reader] -= 1
+                if pending_counts[reader] == 0:
+                    ready.append(reader)
+        if len(order) != len(pending_counts):
+            unsorted = sorted(set(pending_counts) - set(order))
+            raise CircuitCycleException(
+                f"Could not sort {len(unsorted)} gates: {', '.join(unsorted)}")
+
+        return [
+            (self.slots[output], function,
+             tuple(self.slots[name] for name in inputs))
+            for output in order
+            for function, inputs in [self.gates[output]]
+        ]
+
+    def index_operations(self) -> None:
+        """
+        Index which operations read each slot, and where each gate output is
+        computed
+        """
+        self.readers: List[List[int]] = [[] for _ in self.names]
+        for index, (_, _, input_slots) in enumerate(self.operations):
+            for slot in set(input_slots):
+                self.readers[slot].append(index)
+        self.positions: Dict[int, int] = {
+            output_slot: index
+            for index, (output_slot, _, _) in enumerate(self.operations)
+        }
+
+    def evaluate(self) -> None:
+        values = self.values
+        for output_slot, function, input_slots in self.operations:
+            values[output_slot] = function(
+                *(values[slot] for slot in input_slots))
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[self.slots[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.slots
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        >>> Circuit({'b': (int.__neg__, ('a',))}, {'a': 1}).as_dict()
+        {'a': 1, 'b': -1}
+        """
+        return dict(zip(self.names, self.values))
+
+    def set_values(self, values: Dict[str, Any]) -> List[str]:
+        """
+        Set the values of some wires, disconnecting any gates that drove them,
+        and re-evaluate the gates that depend on any changed wire, in
+        topological order. Returns the names of the wires that changed.
+        """
+        changed_slots = []
+        for name, value in values.items():
+            slot = self.slots[name]
+            self.sources.add(slot)
+            if self.values[slot] != value:
+                self.values[slot] = value
+                changed_slots.append(slot)
+
+        return [
+            self.names[slot]
+            for slot in changed_slots + self.propagate(changed_slots)
+        ]
+
+    def propagate(self, changed_slots: Iterable[int],
+                  changed_indexes: Iterable[int] = ()) -> List[int]:
+        """
+        Re-evaluate the operations that read the changed slots, and the
+        changed operations, and anything downstream of those that changed
+        """
+        values = self.values
+        queue = []
+        queued = set()
+
+        def enqueue(_slot: int) -> None:
+            for _index in self.readers[_slot]:
+                if _index not in queued:
+                    queued.add(_index)
+                    heapq.heappush(queue, _index)
+
+        for slot in changed_slots:
+            enqueue(slot)
+        for index in changed_indexes:
+            if index not in queued:
+                queued.add(index)
+                heapq.heappush(queue, index)
+        propagated_slots = []
+        while queue:
+            index = heapq.heappop(queue)
+            output_slot, function, input_slots = self.operations[index]
+            if output_slot in self.sources:
+                continue
+            value = function(*(values[slot] for slot in input_slots))
+            if value == values[output_slot]:
+                continue
+            values[output_slot] = value
+            propagated_slots.append(output_slot)
+            enqueue(output_slot)
+
+        return propagated_slots
+
+    def swap_outputs(self, pairs: Iterable[Tuple[str, str]]) -> List[str]:
+        """
+        Swap the outputs of each pair of gates in place, and only re-evaluate
+        the swapped gates and the gates downstream of them. Returns the names
+        of the wires that changed. The compiled order is kept if the swapped
+        gates' inputs are still computed before them, and otherwise it's
+        sorted again. If the swap creates a cycle, the circuit is left as it
+        was.
+
+        >>> circuit = Circuit({
+        ...     'c': (int.__add__, ('a', 'b')),
+        ...     'd': (int.__sub__, ('a', 'b')),
+        ...     'e': (int.__mul__, ('c', 'a')),
+        ... }, {'a': 5, 'b': 2})
+        >>> circuit.swap_outputs([('c', 'd')])
+        ['d', 'c', 'e']
+        >>> circuit['c'], circuit['d'], circuit['e']
+        (3, 7, 15)
+        >>> circuit.swap_outputs([('d', 'e')])
+        ['e', 'd']
+        >>> circuit['c'], circuit['d'], circuit['e']
+        (3, 15, 7)
+        >>> circuit.swap_outputs([('c', 'd')])
+        Traceback (most recent call last):
+        ...
+        utils.circuit.CircuitCycleException: Could not sort 1 gates: c
+        >>> circuit['c'], circuit['d'], circuit['e']
+        (3, 15, 7)
+        >>> sorted(circuit.swap_outputs([('d', 'e'), ('c', 'd')]))
+        ['c', 'd', 'e']
+        >>> circuit.as_dict()
+        {'a': 5, 'b': 2, 'c': 7, 'd': 3, 'e': 35}
+        """
+        pairs = list(pairs)
+        gates = self.gates
+        for first, second in pairs:
+            gates[first], gates[second] = gates[second], gates[first]
+        changed_outputs = {
+            name
+            for pair in pairs
+            for name in pair
+        }
+        changed_operations = {}
+        for output in changed_outputs:
+            output_slot = self.slots[output]
+            if output_slot not in self.positions:
+                changed_operations = None
+                break
+            function, inputs = gates[output]
+            index = self.positions[output_slot]
+            input_slots = tuple(self.slots[name] for name in inputs)
+            if any(
+                self.positions.get(slot, -1) >= index
+                for slot in input_slots
+            ):
+                changed_operations = None
+                break
+            changed_operations[index] = (output_slot, function, input_slots)
+
+        if changed_operations is None:
+            try:
+                self.operations = self.compile()
+            except CircuitCycleException:
+                for first, second in reversed(pairs):
+                    gates[first], gates[second] = gates[second], gates[first]
+                raise
+            self.index_operations()
+            changed_indexes = [
+                self.positions[self.slots[output]]
+                for output in changed_outputs
+                if self.slots[output] in self.positions
+            ]
+        else:
+            for index, operation in changed_operations.items():
+                _, _, old_input_slots = self.operations[index]
+                for slot in set(old_input_slots):
+                    self.readers[slot].remove(index)
+                _, _, input_slots = operation
+                for slot in set(input_slots):
+                    self.readers[slot].append(index)
+                self.operations[index] = operation
+            changed_indexes = list(changed_operations)
+
+        return [
+            self.names[slot]
+            for slot in self.propagate((), changed_indexes)
+        ]
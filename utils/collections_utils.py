@@ -1,4 +1,5 @@
 import itertools
+from array import array
 from typing import Iterable, Tuple, TypeVar, List, Optional, Sized, cast, Dict, \
     Callable
 
@@ -12,6 +13,7 @@ __all__ = [
     'iterable_length',
     'count_by',
     'unique_without_hash',
+    'CompactIntSet',
 ]
 
 
@@ -233,3 +235,97 @@ def unique_without_hash(items: Iterable[T]) -> Iterable[T]:
             continue
         seen.add(item_id)
         yield item
+
+
+class CompactIntSet:
+    """
+    A set of 64-bit ints, stored in an open-addressed table backed by an
+    `array`. The table is kept between a quarter and half full, so that it
+    takes 16 to 32 bytes per item, instead of the overhead of a `set` entry
+    and an `int` object per item. The capacity is rounded up to a power of
+    two.
+
+    >>> _set = CompactIntSet()
+    >>> _set.add(5), _set.add(-3), _set.add(5), _set.add(0)
+    (True, True, False, True)
+    >>> 5 in _set, 6 in _set, -3 in _set, len(_set)
+    (True, False, True, 3)
+    >>> sorted(_set)
+    [-3, 0, 5]
+    >>> _set = CompactIntSet(range(0, 3000, 3))
+    >>> len(_set), 2997 in _set, 2998 in _set, len(_set.table)
+    (1000, True, False, 2048)
+    >>> _set = CompactIntSet(range(20), capacity=10)
+    >>> len(_set), 19 in _set, len(_set.table)
+    (20, True, 64)
+    >>> CompactIntSet.EMPTY in CompactIntSet()
+    False
+    >>> CompactIntSet().add(CompactIntSet.EMPTY)
+    Traceback (most recent call last):
+    ...
+    ValueError: Cannot store -9223372036854775808
+    """
+
+    EMPTY = -2 ** 63
+    HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+    HASH_MASK = 2 ** 64 - 1
+
+    def __init__(self, items: Iterable[int] = (), capacity: int = 16):
+        capacity = 1 << max(capacity - 1, 0).bit_length()
+        self.table = array('q', [self.EMPTY]) * capacity
+        self.mask = capacity - 1
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterable[int]:
+        return (item for item in self.table if item != self.EMPTY)
+
+    def __contains__(self, item: int) -> bool:
+        if item == self.EMPTY:
+            return False
+        table, mask = self.table, self.mask
+        index = self.get_start_index(item)
+        while True:
+            value = table[index]
+            if value == item:
+                return True
+            if value == self.EMPTY:
+                return False
+            index = (index + 1) & mask
+
+    def get_start_index(self, item: int) -> int:
+        return (
+            ((item * self.HASH_MULTIPLIER) & self.HASH_MASK) >> 32
+        ) & self.mask
+
+    def add(self, item: int) -> bool:
+        """Add the item, and return whether it was new"""
+        if item == self.EMPTY:
+            raise ValueError(f"Cannot store {item}")
+        table, mask = self.table, self.mask
+        index = self.get_start_index(item)
+        while True:
+            value = table[index]
+            if value == item:
+                return False
+            if value == self.EMPTY:
+                break
+            index = (index + 1) & mask
+        table[index] = item
+        self.count += 1
+        if self.count * 2 > len(table):
+            self.resize(len(table) * 2)
+
+        return True
+
+    def resize(self, capacity: int) -> None:
+        items = list(self)
+        self.table = array('q', [self.EMPTY]) * capacity
+        self.mask = capacity - 1
+        self.count = 0
+        for item in items:
+            self.add(item)
@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Set, \
+    Tuple, TypeVar
+
+from .search import bfs
+
+__all__ = [
+    'ContractedGraph',
+]
+
+
+PointT = TypeVar('PointT')
+ContractedEdge = Tuple[int, int, int]
+
+
+@dataclass
+class ContractedGraph(Generic[PointT]):
+    """
+    A grid maze contracted to a graph between its points of interest, and
+    optionally its junctions, so that searches run on a few nodes instead of
+    every cell.
+
+    The nodes are numbered by their index in `nodes`, and each node has a
+    list of `(neighbour, distance, mask)` edges. The mask is the union of the
+    masks of the cells that the edge goes through (eg the doors on the way).
+    """
+    nodes: List[PointT]
+    indexes: Dict[PointT, int]
+    edges: List[List[ContractedEdge]]
+
+    @classmethod
+    def from_grid(
+        cls, points_of_interest: Iterable[PointT],
+        is_passable: Callable[[PointT], bool],
+        get_neighbours: Optional[Callable[[PointT], Iterable[PointT]]] = None,
+        get_mask: Optional[Callable[[PointT], int]] = None,
+        include_junctions: bool = True,
+    ) -> "ContractedGraph[PointT]":
+        """
+        Create the graph from the points of interest, and all the junctions
+        that are reachable from them. The edges are the ways between two nodes
+        that don't go through any other node, keeping only those that aren't
+        both longer and through more of the mask than another. The neighbours
+        default to the Manhattan neighbours, and can be directional.
+
+        >>> from utils import Point2D, parse_map_points
+        >>> _points, _starts, _doors = parse_map_points(
+        ...     "#####.#\\n"
+        ...     "#SD...#\\n"
+        ...     "#.###.#\\n"
+        ...     "#.....#\\n"
+        ...     "#######\\n",
+        ...     [".", "S", "D"],
+        ... )
+        >>> _points |= _starts | _doors
+        >>> graph = ContractedGraph.from_grid(
+        ...     [Point2D(1, 1), Point2D(5, 0)], _points.__contains__,
+        ...     get_mask=lambda point: int(point in _doors))
+        >>> graph.nodes
+        [Point2D(x=1, y=1), Point2D(x=5, y=0), Point2D(x=5, y=1)]
+        >>> graph.edges
+        [[(2, 4, 1), (2, 8, 0)], [(2, 1, 0)], [(0, 4, 1), (0, 8, 0), (1, 1, 0)]]
+        >>> ContractedGraph.from_grid(
+        ...     [Point2D(1, 1), Point2D(5, 0)], _points.__contains__,
+        ...     include_junctions=False).edges
+        [[(1, 5, 0)], [(0, 5, 0)]]
+        """
+        if get_neighbours is None:
+            def get_neighbours(point: PointT) -> Iterable[PointT]:
+                return point.get_manhattan_neighbours()
+
+        def get_next_points(point: PointT) -> List[PointT]:
+            return [
+                next_point
+                for next_point in get_neighbours(point)
+                if is_passable(next_point)
+            ]
+
+        nodes = list(dict.fromkeys(points_of_interest))
+        if include_junctions:
+            points_of_interest = set(nodes)
+            nodes.extend(
+                point
+                for point in bfs(nodes, get_next_points).distances
+                if point not in points_of_interest
+                and len(get_next_points(point)) > 2
+            )
+        indexes = {
+            node: index
+            for index, node in enumerate(nodes)
+        }
+        return cls(
+            nodes=nodes,
+            indexes=indexes,
+            edges=[
+                cls.get_node_edges(
+                    node, indexes, get_next_points, get_mask)
+                for node in nodes
+            ],
+        )
+
+    @classmethod
+    def get_node_edges(
+        cls, node: PointT, indexes: Dict[PointT, int],
+        get_next_points: Callable[[PointT], List[PointT]],
+        get_mask: Optional[Callable[[PointT], int]],
+    ) -> List[ContractedEdge]:
+        """
+        Get the edges from a node, by searching from it until it reaches other
+        nodes. Separate corridors to the same neighbour are all kept, unless
+        another one dominates them.
+        """
+        edges: Set[ContractedEdge] = set()
+        for first_point in get_next_points(node):
+            if first_point in indexes:
+                edges.add((indexes[first_point], 1, 0))
+                continue
+
+            def get_corridor_points(point: PointT) -> List[PointT]:
+                if point in indexes:
+                    return []
+                return [
+                    next_point
+                    for next_point in get_next_points(point)
+                    if next_point != node
+                ]
+
+            result = bfs([first_point], get_corridor_points)
+            for point, distance in result.distances.items():
+                if point not in indexes:
+                    continue
+                mask = 0
+                if get_mask:
+                    for path_point in result.get_path(point)[:-1]:
+                        mask |= get_mask(path_point)
+                edges.add((indexes[point], distance + 1, mask))
+
+        return cls.remove_dominated_edges(edges)
+
+    @classmethod
+    def remove_dominated_edges(
+        cls, edges: Iterable[ContractedEdge],
+    ) -> List[ContractedEdge]:
+        """
+        Drop any edge to the same neighbour that is no shorter, and goes
+        through at least the same mask
+
+        >>> ContractedGraph.remove_dominated_edges([
+        ...     (1, 5, 0), (1, 3, 0), (1, 2, 1), (2, 4, 1), (2, 4, 3)])
+        [(1, 2, 1), (1, 3, 0), (2, 4, 1)]
+        """
+        edges = sorted(set(edges))
+        return [
+            (neighbour, distance, mask)
+            for neighbour, distance, mask in edges
+            if not any(
+                other_neighbour == neighbour
+                and (other_distance, other_mask) != (distance, mask)
+                and other_distance <= distance
+                and other_mask & mask == other_mask
+                for other_neighbour, other_distance, other_mask in edges
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
@@ -0,0 +1,444 @@
+import string
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, \
+    Union
+
+from .polymorphic import CouldNotParseException
+
+__all__ = [
+    'RegisterMachineSpec',
+]
+
+
+DecodedInstruction = Tuple[Any, ...]
+Operand = Union[str, int]
+
+
+class RegisterMachineSpec:
+    """
+    A declarative description of a register machine's instruction set, that
+    compiles to a single interpreter loop.
+
+    Each operation has a name, the kinds of its operands, and a Python
+    statement. The operands are called `a`, `b`, and `c`, and their kinds
+    are:
+
+    * `r`: a register, decoded to its slot
+    * `v`: a register or a value, decoded to `a_is_register, a`
+    * `i`: an immediate value
+
+    In the statement `{a}` is replaced with the value of the operand, and the
+    names `registers`, `pc`, `inbound`, and `outbound` are available. The
+    statement can jump by setting `pc` and using `continue`, and can block
+    (eg waiting for input) by using `break`, which leaves `pc` on the
+    instruction. A blocked instruction still counts as a step.
+
+    Instructions are decoded to tuples of the op code and the operands, and
+    the op code after the last operation calls a superinstruction, decoded as
+    `(spec.call_op_code, superinstruction)`. The superinstruction is called
+    with the registers and `pc`, and returns the next `pc`, or `None` to
+    continue normally.
+
+    >>> spec = RegisterMachineSpec({
+    ...     'set': ('rv', "registers[a] = {b}"),
+    ...     'dec': ('r', "registers[a] -= 1"),
+    ...     'jnz': ('vi', "if {a}:\\n    pc += b\\n    continue"),
+    ...     'out': ('v', "outbound.append({a})"),
+    ... })
+    >>> program = spec.parse_program(
+    ...     "set a 3\\n"
+    ...     "out a\\n"
+    ...     "dec a\\n"
+    ...     "jnz a -2\\n"
+    ... )
+    >>> program
+    [(0, 0, False, 3), (3, True, 0), (1, 0), (2, True, 0, -2)]
+    >>> registers, outbound = [0] * 26, []
+    >>> spec.run(program, registers, outbound=outbound)
+    (4, 10)
+    >>> registers[0], outbound
+    (0, [3, 2, 1])
+    """
+
+    def __init__(self, operations: Dict[str, Tuple[str, str]],
+                 register_names: Iterable[str] = string.ascii_lowercase):
+        self.operations = operations
+        self.register_names = list(register_names)
+        self.register_slots = {
+            name: slot
+            for slot, name in enumerate(self.register_names)
+        }
+        self.op_codes = {
+            name: op_code
+            for op_code, name in enumerate(operations)
+        }
+        self.call_op_code = len(operations)
+        self.interpreters: Dict[Tuple[bool, ...], Callable] = {}
+        self.instruction_runners: Dict[int, Callable] = {}
+
+    def extend(self, operations: Dict[str, Tuple[str, str]],
+               ) -> 'RegisterMachineSpec':
+        """
+        Add more operations, or replace existing ones while keeping their op
+        codes
+
+        >>> spec = RegisterMachineSpec({'inc': ('r', "registers[a] += 1")})
+        >>> spec.extend({
+        ...     'dec': ('r', "registers[a] -= 1"),
+        ...     'inc': ('r', "registers[a] += 2"),
+        ... }).op_codes
+        {'inc': 0, 'dec': 1}
+        """
+        return RegisterMachineSpec(
+            {**self.operations, **operations}, self.register_names)
+
+    def parse_program(self, program_text: str) -> List[DecodedInstruction]:
+        """
+        >>> RegisterMachineSpec({
+        ...     'jio': ('ri', "pass"),
+        ... }, 'ab').parse_program("jio b, +22")
+        [(0, 1, 22)]
+        """
+        return [
+            self.parse_instruction(line)
+            for line in filter(None, map(str.strip, program_text.splitlines()))
+        ]
+
+    def parse_instruction(self, text: str) -> DecodedInstruction:
+        """
+        >>> RegisterMachineSpec({'inc': ('r', "pass")}).parse_instruction(
+        ...     "tpl a")
+        Traceback (most recent call last):
+        ...
+        utils.polymorphic.CouldNotParseException: Unknown operation 'tpl'
+        """
+        name, *operands = text.replace(',', ' ').split()
+        if name not in self.operations:
+            raise CouldNotParseException(f"Unknown operation '{name}'")
+        return self.decode(name, operands)
+
+    def decode(self, name: str, operands: Iterable[Operand],
+               ) -> DecodedInstruction:
+        """
+        >>> spec = RegisterMachineSpec({'cpy': ('vr', "pass")})
+        >>> spec.decode('cpy', ['b', 'c']), spec.decode('cpy', [-4, 'c'])
+        ((0, True, 1, 2), (0, False, -4, 2))
+        >>> spec.decode('cpy', ['b'])
+        Traceback (most recent call last):
+        ...
+        utils.polymorphic.CouldNotParseException: Expected 2 operands for
+            'cpy', but got 1
+        """
+        kinds, _ = self.operations[name]
+        operands = list(operands)
+        if len(operands) != len(kinds):
+            raise CouldNotParseException(
+                f"Expected {len(kinds)} operands for '{name}', but got "
+                f"{len(operands)}")
+        decoded = [self.op_codes[name]]
+        for kind, operand in zip(kinds, operands):
+            if kind == 'r':
+                decoded.append(self.get_register_slot(operand))
+            elif kind == 'v':
+                decoded.extend(self.decode_value(operand))
+            elif kind == 'i':
+                decoded.append(int(operand))
+            else:
+                raise Exception(f"Unknown operand kind '{kind}'")
+
+        return tuple(decoded)
+
+    def get_register_slot(self, operand: Operand) -> int:
+        if isinstance(operand, int):
+            return operand
+        if operand not in self.register_slots:
+            raise CouldNotParseException(
+                f"Expected a register, but got '{operand}'")
+        return self.register_slots[operand]
+
+    def decode_value(self, operand: Operand) -> Tuple[bool, int]:
+        if isinstance(operand, str) and operand in self.register_slots:
+            return True, self.register_slots[operand]
+        try:
+            return False, int(operand)
+        except ValueError:
+            raise CouldNotParseException(
+                f"Expected a register or a value, but got '{operand}'")
+
+    def run(self, instructions: List[DecodedInstruction],
+            registers: List[int], pc: int = 0,
+            max_step_count: Optional[int] = None,
+            inbound: Any = None, outbound: Any = None,
+            trace: Optional[Callable[[int, List[int]], None]] = None,
+            op_code_counts: Optional[List[int]] = None,
+            instruction_pointer_register: Optional[int] = None,
+            stop_pc: Optional[int] = None,
+            ) -> Tuple[int, int]:
+        """
+        Run the decoded instructions on the mutable list of registers, and
+        return the final `pc` and the number of steps. It stops when `pc` is
+        out of bounds, after `max_step_count` steps, when an instruction
+        blocks, or right before it would run the instruction at `stop_pc`,
+        however it got there (including if it starts there).
+
+        Optionally:
+
+        * `trace` is called with `pc` and the registers before each step
+        * `op_code_counts` is incremented for each executed op code
+        * `instruction_pointer_register` is set to `pc` before each step, and
+        the next `pc` is read back from it
+
+        >>> spec = RegisterMachineSpec({
+        ...     'add': ('rrr', "registers[c] = registers[a] + registers[b]"),
+        ...     'seti': ('iir', "registers[c] = a"),
+        ... }, [])
+        >>> program = [spec.decode('add', [0, 1, 0]),
+        ...            spec.decode('seti', [7, 0, 2]),
+        ...            spec.decode('seti', [2, 0, 0])]
+        >>> registers, counts = [0, 1, 0], [0] * 3
+        >>> spec.run(program, registers, instruction_pointer_register=0,
+        ...          op_code_counts=counts, trace=print)
+        0 [0, 1, 0]
+        2 [1, 1, 0]
+        (3, 2)
+        >>> registers, counts
+        ([2, 1, 0], [1, 1, 0])
+        >>> spec.run(program, [0, 1, 0], instruction_pointer_register=0,
+        ...          stop_pc=2)
+        (2, 1)
+        >>> jumps = RegisterMachineSpec({
+        ...     'inc': ('r', "registers[a] += 1"),
+        ...     'jnz': ('vi', "if {a}:\\n    pc += b\\n    continue"),
+        ... })
+        >>> jump_program = jumps.parse_program("jnz 1 2\\ninc a\\ninc b")
+        >>> registers = [0] * 3
+        >>> jumps.run(jump_program, registers, stop_pc=2), registers
+        ((2, 1), [0, 0, 0])
+        >>> jumps.run(jump_program, registers, pc=2, stop_pc=2)
+        (2, 0)
+        >>> jumps.run([(jumps.call_op_code, lambda _registers, _pc: _pc + 2)]
+        ...           + jump_program[1:], registers, stop_pc=2)
+        (2, 1)
+        >>> def skip(_registers, _pc):
+        ...     _registers[2] = 5
+        ...     return _pc + 2
+        >>> registers = [0, 1, 0]
+        >>> spec.run([(spec.call_op_code, skip)] + program, registers,
+        ...          max_step_count=2)
+        (3, 2)
+        >>> registers
+        [0, 1, 7]
+        """
+        interpreter = self.get_interpreter(
+            trace is not None, op_code_counts is not None,
+            instruction_pointer_register is not None, stop_pc is not None)
+        if max_step_count is None:
+            max_step_count = -1
+        return interpreter(
+            registers, instructions, pc, max_step_count, inbound, outbound,
+            trace, op_code_counts, instruction_pointer_register, stop_pc)
+
+    def get_interpreter(self, trace: bool, count_op_codes: bool,
+                        bind_instruction_pointer: bool,
+                        stop_at_pc: bool) -> Callable:
+        key = (
+            trace, count_op_codes, bind_instruction_pointer,
+            stop_at_pc,
+        )
+        if key not in self.interpreters:
+            source = self.get_interpreter_source(*key)
+            namespace = {}
+            exec(compile(source, f"<{type(self).__name__}>", "exec"),
+                 namespace)
+            self.interpreters[key] = namespace['run']
+
+        return self.interpreters[key]
+
+    def get_interpreter_source(self, trace: bool, count_op_codes: bool,
+                               bind_instruction_pointer: bool,
+                               stop_at_pc: bool) -> str:
+        """
+        >>> print(RegisterMachineSpec({
+        ...     'inc': ('r', "registers[a] += 1"),
+        ...     'jnz': ('vv', "if {a}:\\n    pc += {b}\\n    continue"),
+        ... }).get_interpreter_source(False, False, False, False))
+        def run(registers, instructions, pc, max_step_count, inbound, outbound,
+                trace, op_code_counts, instruction_pointer_register,
+                stop_pc):
+            instruction_count = len(instructions)
+            step_count = 0
+            while 0 <= pc < instruction_count and step_count != max_step_count:
+                instruction = instructions[pc]
+                op_code = instruction[0]
+                step_count += 1
+                if op_code == 0:  # inc
+                    _, a = instruction
+                    registers[a] += 1
+                elif op_code == 1:  # jnz
+                    _, a_is_register, a, b_is_register, b = instruction
+                    if (registers[a] if a_is_register else a):
+                        pc += (registers[b] if b_is_register else b)
+                        continue
+                elif op_code == 2:  # call
+                    next_pc = instruction[1](registers, pc)
+                    if next_pc is not None:
+                        pc = next_pc
+                        continue
+                else:
+                    raise Exception(f"Unknown op code {op_code}")
+                pc += 1
+            return pc, step_count
+        """
+        lines = [
+            "def run(registers, instructions, pc, max_step_count, inbound, "
+            "outbound,",
+            "        trace, op_code_counts, instruction_pointer_register,",
+            "        stop_pc):",
+            "    instruction_count = len(instructions)",
+            "    step_count = 0",
+            "    while 0 <= pc < instruction_count "
+            "and step_count != max_step_count:",
+        ]
+        if stop_at_pc:
+            lines.extend([
+                "        if pc == stop_pc:",
+                "            break",
+            ])
+        lines.extend([
+            "        instruction = instructions[pc]",
+            "        op_code = instruction[0]",
+            "        step_count += 1",
+        ])
+        if trace:
+            lines.append("        trace(pc, registers)")
+        if count_op_codes:
+            lines.append("        op_code_counts[op_code] += 1")
+        if bind_instruction_pointer:
+            lines.append(
+                "        registers[instruction_pointer_register] = pc")
+        for name in self.operations:
+            keyword = "if" if self.op_codes[name] == 0 else "elif"
+            lines.append(
+                f"        {keyword} op_code == {self.op_codes[name]}:  "
+                f"# {name}")
+            lines.extend(
+                f"            {line}"
+                for line in self.get_operation_source_lines(name)
+            )
+        lines.extend([
+            f"        elif op_code == {self.call_op_code}:  # call",
+            "            next_pc = instruction[1](registers, pc)",
+            "            if next_pc is not None:",
+            "                pc = next_pc",
+            "                continue",
+            "        else:",
+            "            raise Exception(f\"Unknown op code {op_code}\")",
+        ])
+        if bind_instruction_pointer:
+            lines.append(
+                "        pc = registers[instruction_pointer_register] + 1")
+        else:
+            lines.append("        pc += 1")
+        lines.append("    return pc, step_count")
+
+        return "\n".join(lines)
+
+    def get_operation_source_lines(self, name: str) -> List[str]:
+        """
+        The lines that unpack an instruction of the operation, and run its
+        statement
+
+        >>> RegisterMachineSpec({
+        ...     'jnz': ('vi', "if {a}:\\n    pc += b\\n    continue"),
+        ... }).get_operation_source_lines('jnz')
+        ['_, a_is_register, a, b = instruction',
+         'if (registers[a] if a_is_register else a):',
+         '    pc += b', '    continue']
+        """
+        kinds, statement = self.operations[name]
+        names = []
+        values = {}
+        for operand_name, kind in zip("abc", kinds):
+            if kind == 'r':
+                names.append(operand_name)
+                values[operand_name] = f"registers[{operand_name}]"
+            elif kind == 'v':
+                names.append(f"{operand_name}_is_register")
+                names.append(operand_name)
+                values[operand_name] = (
+                    f"(registers[{operand_name}] "
+                    f"if {operand_name}_is_register else {operand_name})")
+            else:
+                names.append(operand_name)
+                values[operand_name] = operand_name
+        lines = []
+        if names:
+            lines.append(f"_, {', '.join(names)} = instruction")
+        lines.extend(statement.format(**values).splitlines())
+
+        return lines
+
+    def get_instruction_runner(self, instruction: DecodedInstruction,
+                               ) -> Callable[[List[int], int], int]:
+        """
+        Get a function that runs a single decoded instruction on the
+        registers and `pc`, and returns the next `pc`, in the same way as a
+        superinstruction. It can be used as the fallback of a
+        superinstruction, when the loop it replaces has to be interpreted.
+
+        >>> spec = RegisterMachineSpec({
+        ...     'inc': ('r', "registers[a] += 1"),
+        ...     'jnz': ('vi', "if {a}:\\n    pc += b\\n    continue"),
+        ... })
+        >>> registers = [0] * 3
+        >>> spec.get_instruction_runner(spec.parse_instruction("inc b"))(
+        ...     registers, 3), registers
+        (4, [0, 1, 0])
+        >>> spec.get_instruction_runner(spec.parse_instruction("jnz b -2"))(
+        ...     registers, 3)
+        1
+        >>> spec.get_instruction_runner(spec.parse_instruction("jnz c -2"))(
+        ...     registers, 3)
+        4
+        """
+        op_code = instruction[0]
+        if op_code not in self.instruction_runners:
+            source = self.get_instruction_runner_source(
+                list(self.operations)[op_code])
+            namespace = {}
+            exec(compile(source, f"<{type(self).__name__}>", "exec"),
+                 namespace)
+            self.instruction_runners[op_code] = namespace['run_instruction']
+        run_instruction = self.instruction_runners[op_code]
+
+        def run(registers: List[int], pc: int) -> int:
+            return run_instruction(registers, pc, instruction)
+
+        return run
+
+    def get_instruction_runner_source(self, name: str) -> str:
+        """
+        The statement runs in a loop of a single iteration, so that it can
+        still jump with `continue`, or block with `break`
+
+        >>> print(RegisterMachineSpec({
+        ...     'inc': ('r', "registers[a] += 1"),
+        ... }).get_instruction_runner_source('inc'))
+        def run_instruction(registers, pc, instruction, inbound=None,
+                            outbound=None):
+            for _ in (None,):
+                _, a = instruction
+                registers[a] += 1
+                pc += 1
+            return pc
+        """
+        return "\n".join([
+            "def run_instruction(registers, pc, instruction, inbound=None,",
+            "                    outbound=None):",
+            "    for _ in (None,):",
+        ] + [
+            f"        {line}"
+            for line in self.get_operation_source_lines(name)
+        ] + [
+            "        pc += 1",
+            "    return pc",
+        ])
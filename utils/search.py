@@ -0,0 +1,338 @@
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Set, \
+    Tuple, TypeVar
+
+from aox.challenge import Debugger
+
+__all__ = [
+    'SearchResult',
+    'dijkstra',
+    'bfs',
+    'bidirectional_bfs',
+]
+
+
+StateT = TypeVar('StateT')
+
+
+@dataclass
+class SearchResult(Generic[StateT]):
+    """
+    The distances to every settled state, the parent pointers to reconstruct
+    the paths, and the targets that were reached at the shortest distance
+    """
+    distances: Dict[StateT, int] = field(default_factory=dict)
+    parents: Dict[StateT, List[StateT]] = field(default_factory=dict)
+    targets: List[StateT] = field(default_factory=list)
+
+    @property
+    def target(self) -> Optional[StateT]:
+        if not self.targets:
+            return None
+        return self.targets[0]
+
+    @property
+    def target_distance(self) -> Optional[int]:
+        if not self.targets:
+            return None
+        return self.distances[self.targets[0]]
+
+    def get_path(self, state: Optional[StateT] = None) -> List[StateT]:
+        """
+        Get one shortest path from an initial state, to the given state, or the
+        first target
+
+        >>> SearchResult(
+        ...     {'a': 0, 'b': 1, 'c': 2}, {'a': [], 'b': ['a'], 'c': ['b']},
+        ...     ['c'],
+        ... ).get_path()
+        ['a', 'b', 'c']
+        """
+        if state is None:
+            state = self.target
+            if state is None:
+                raise Exception("No target was reached")
+        path = [state]
+        while self.parents[state]:
+            state = self.parents[state][0]
+            path.append(state)
+        path.reverse()
+        return path
+
+    def get_states_on_shortest_paths(
+        self, states: Optional[Iterable[StateT]] = None,
+    ) -> Set[StateT]:
+        """
+        Get all the states that are on any shortest path to the given states,
+        or to the targets. This needs the search to have kept all parents.
+
+        >>> sorted(SearchResult(
+        ...     {'a': 0, 'b': 1, 'c': 1, 'd': 2, 'e': 1},
+        ...     {'a': [], 'b': ['a'], 'c': ['a'], 'd': ['b', 'c'], 'e': ['a']},
+        ...     ['d'],
+        ... ).get_states_on_shortest_paths())
+        ['a', 'b', 'c', 'd']
+        """
+        if states is None:
+            states = self.targets
+        stack = list(states)
+        seen = set(stack)
+        while stack:
+            state = stack.pop()
+            for parent in self.parents[state]:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                stack.append(parent)
+        return seen
+
+
+def dijkstra(
+    initial_states: Iterable[StateT],
+    get_next_states: Callable[[StateT], Iterable[Tuple[StateT, int]]],
+    is_target: Optional[Callable[[StateT], bool]] = None,
+    heuristic: Optional[Callable[[StateT], int]] = None,
+    max_distance: Optional[int] = None,
+    keep_all_parents: bool = False,
+    debugger: Debugger = Debugger(enabled=False),
+) -> SearchResult[StateT]:
+    """
+    Find the shortest distances from the initial states, with a heap, and
+    lazily skipping the stale entries of states that were since reached with a
+    shorter distance.
+
+    If there is an `is_target`, the search stops after all the targets at the
+    shortest distance have been settled. If there is a `heuristic`, it must be
+    admissible and consistent, and the search is A*. Any state further than
+    `max_distance` is ignored. With `keep_all_parents`, all the parents that
+    reach a state at its shortest distance are kept, instead of just the first.
+
+    >>> graph = {
+    ...     'a': [('b', 1), ('c', 4)],
+    ...     'b': [('c', 2), ('d', 5)],
+    ...     'c': [('d', 3)],
+    ...     'd': [],
+    ... }
+    >>> result = dijkstra(['a'], graph.__getitem__)
+    >>> result.distances
+    {'a': 0, 'b': 1, 'c': 3, 'd': 6}
+    >>> dijkstra(['a'], graph.__getitem__, max_distance=5).distances
+    {'a': 0, 'b': 1, 'c': 3}
+    >>> result = dijkstra(
+    ...     ['a'], graph.__getitem__, is_target=lambda state: state == 'd',
+    ...     keep_all_parents=True)
+    >>> result.get_path(), result.target_distance
+    (['a', 'b', 'd'], 6)
+    >>> sorted(result.get_states_on_shortest_paths())
+    ['a', 'b', 'c', 'd']
+    >>> result.parents['d']
+    ['b', 'c']
+    >>> dijkstra(
+    ...     [0], lambda state: [(state + 1, 1), (state + 3, 2)],
+    ...     is_target=lambda state: state == 10,
+    ...     heuristic=lambda state: (10 - state) // 2,
+    ... ).target_distance
+    7
+    """
+    result: SearchResult[StateT] = SearchResult()
+    distances = result.distances
+    parents = result.parents
+    targets = result.targets
+    counter = count()
+    queue: List[Tuple[int, int, int, StateT]] = []
+    for state in initial_states:
+        distances[state] = 0
+        parents[state] = []
+        priority = heuristic(state) if heuristic else 0
+        heapq.heappush(queue, (priority, next(counter), 0, state))
+    settled_count = 0
+    while debugger.step_if(queue):
+        priority, _, distance, state = heapq.heappop(queue)
+        if distance > distances[state]:
+            continue
+        if targets and priority > distances[targets[0]]:
+            break
+        settled_count += 1
+        if is_target and is_target(state):
+            targets.append(state)
+            continue
+        for next_state, cost in get_next_states(state):
+            next_distance = distance + cost
+            if max_distance is not None and next_distance > max_distance:
+                continue
+            if next_state in distances:
+                previous_distance = distances[next_state]
+                if next_distance > previous_distance:
+                    continue
+                if next_distance == previous_distance:
+                    if keep_all_parents \
+                            and state not in parents[next_state]:
+                        parents[next_state].append(state)
+                    continue
+            distances[next_state] = next_distance
+            parents[next_state] = [state]
+            next_priority = next_distance
+            if heuristic:
+                next_priority += heuristic(next_state)
+            heapq.heappush(
+                queue, (next_priority, next(counter), next_distance,
+                        next_state))
+        if debugger.should_report():
+            debugger.default_report_if(
+                f"Settled {settled_count}, seen {len(distances)}, "
+                f"{len(queue)} in queue, at distance {distance}, "
+                f"{len(targets)} targets reached"
+            )
+
+    return result
+
+
+def bfs(
+    initial_states: Iterable[StateT],
+    get_next_states: Callable[[StateT], Iterable[StateT]],
+    is_target: Optional[Callable[[StateT], bool]] = None,
+    max_distance: Optional[int] = None,
+    debugger: Debugger = Debugger(enabled=False),
+) -> SearchResult[StateT]:
+    """
+    Find the shortest distances from the initial states, when every step costs
+    1. If there is an `is_target`, the search stops as soon as a target is
+    reached. Any state further than `max_distance` is ignored.
+
+    >>> result = bfs([0], lambda state: [state + 1, state * 2],
+    ...              is_target=lambda state: state == 10)
+    >>> result.get_path(), result.target_distance
+    ([0, 1, 2, 4, 5, 10], 5)
+    >>> bfs([0], lambda state: [state + 1, state * 2], max_distance=3)\\
+    ...     .distances
+    {0: 0, 1: 1, 2: 2, 3: 3, 4: 3}
+    """
+    result: SearchResult[StateT] = SearchResult()
+    distances = result.distances
+    parents = result.parents
+    queue = deque()
+    for state in initial_states:
+        distances[state] = 0
+        parents[state] = []
+        if is_target and is_target(state):
+            result.targets.append(state)
+            return result
+        queue.append(state)
+    while debugger.step_if(queue):
+        state = queue.popleft()
+        next_distance = distances[state] + 1
+        if max_distance is not None and next_distance > max_distance:
+            continue
+        for next_state in get_next_states(state):
+            if next_state in distances:
+                continue
+            distances[next_state] = next_distance
+            parents[next_state] = [state]
+            if is_target and is_target(next_state):
+                result.targets.append(next_state)
+                return result
+            queue.append(next_state)
+        if debugger.should_report():
+            debugger.default_report_if(
+                f"Seen {len(distances)}, {len(queue)} in queue, at distance "
+                f"{next_distance - 1}"
+            )
+
+    return result
+
+
+def bidirectional_bfs(
+    initial_states: Iterable[StateT],
+    target_states: Iterable[StateT],
+    get_next_states: Callable[[StateT], Iterable[StateT]],
+    get_previous_states: Optional[Callable[[StateT], Iterable[StateT]]] = None,
+    debugger: Debugger = Debugger(enabled=False),
+) -> Optional[List[StateT]]:
+    """
+    Find a shortest path from the initial states to the target states, by
+    searching from both sides, and always expanding a whole level of the
+    smaller frontier, until they meet. If the moves are not reversible,
+    `get_previous_states` must give the states that can reach a state.
+
+    >>> bidirectional_bfs([0], [10], lambda state: [
+    ...     state - 1, state + 1, state - 3, state + 3])
+    [0, 1, 4, 7, 10]
+    >>> bidirectional_bfs(
+    ...     [0], [10], lambda state: [state + 1, state * 2],
+    ...     lambda state: [state - 1] + [state // 2] * (state % 2 == 0),
+    ... )
+    [0, 1, 2, 4, 5, 10]
+    >>> bidirectional_bfs([3], [3], lambda state: [])
+    [3]
+    >>> bidirectional_bfs([0], [10], lambda state: [state + 1] * (state < 5))
+    """
+    if get_previous_states is None:
+        get_previous_states = get_next_states
+    forward_parents: Dict[StateT, Optional[StateT]] = {
+        state: None
+        for state in initial_states
+    }
+    backward_parents: Dict[StateT, Optional[StateT]] = {
+        state: None
+        for state in target_states
+    }
+    meeting_states = forward_parents.keys() & backward_parents.keys()
+    forward_frontier = list(forward_parents)
+    backward_frontier = list(backward_parents)
+    distance = 0
+    while not meeting_states and debugger.step_if(
+            forward_frontier and backward_frontier):
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, other_parents, get_states = (
+                forward_frontier, forward_parents, backward_parents,
+                get_next_states)
+        else:
+            frontier, parents, other_parents, get_states = (
+                backward_frontier, backward_parents, forward_parents,
+                get_previous_states)
+        next_frontier = []
+        for state in frontier:
+            for next_state in get_states(state):
+                if next_state in parents:
+                    continue
+                parents[next_state] = state
+                if next_state in other_parents:
+                    meeting_states.add(next_state)
+                next_frontier.append(next_state)
+        frontier[:] = next_frontier
+        distance += 1
+        if debugger.should_report():
+            debugger.default_report_if(
+                f"Seen {len(forward_parents)} forward and "
+                f"{len(backward_parents)} backward, frontiers of "
+                f"{len(forward_frontier)} and {len(backward_frontier)}, at "
+                f"distance {distance}"
+            )
+
+    if not meeting_states:
+        return None
+    return min((
+        _get_bidirectional_path(forward_parents, backward_parents, state)
+        for state in meeting_states
+    ), key=len)
+
+
+def _get_bidirectional_path(
+    forward_parents: Dict[StateT, Optional[StateT]],
+    backward_parents: Dict[StateT, Optional[StateT]],
+    meeting_state: StateT,
+) -> List[StateT]:
+    path = []
+    state = meeting_state
+    while state is not None:
+        path.append(state)
+        state = forward_parents[state]
+    path.reverse()
+    state = backward_parents[meeting_state]
+    while state is not None:
+        path.append(state)
+        state = backward_parents[state]
+    return path
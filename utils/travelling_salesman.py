@@ -0,0 +1,107 @@
+import operator
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+__all__ = [
+    'held_karp',
+]
+
+
+def held_karp(
+    distances: Sequence[Sequence[Optional[int]]], start: Optional[int] = None,
+    return_to_start: bool = False, maximise: bool = False,
+) -> Tuple[int, List[int]]:
+    """
+    Find the shortest (or longest) path that visits every node exactly once,
+    from the all-pairs distance matrix, where `None` means there is no edge.
+
+    The path can be open, or (with `return_to_start`) a closed tour, and can
+    have a fixed start. It's a dynamic programming over the visited nodes and
+    the last node, so the tables have `2 ** n * n` entries, and are kept as
+    flat arrays.
+
+    >>> _distances = [
+    ...     [None, 464, 518],
+    ...     [464, None, 141],
+    ...     [518, 141, None],
+    ... ]
+    >>> held_karp(_distances)
+    (605, [2, 1, 0])
+    >>> held_karp(_distances, maximise=True)
+    (982, [2, 0, 1])
+    >>> held_karp(_distances, start=2)
+    (605, [2, 1, 0])
+    >>> held_karp(_distances, return_to_start=True)
+    (1123, [0, 2, 1, 0])
+    >>> held_karp([[None, 1], [None, None]])
+    (1, [0, 1])
+    >>> held_karp([[None, 1], [None, None]], return_to_start=True)
+    Traceback (most recent call last):
+    ...
+    Exception: There is no path through all 2 nodes
+    >>> held_karp([[None]], return_to_start=True)
+    (0, [0, 0])
+    """
+    node_count = len(distances)
+    if not node_count:
+        return 0, []
+    if return_to_start and start is None:
+        start = 0
+    is_better = operator.gt if maximise else operator.lt
+    no_parent = node_count
+    costs = array('q', bytes(8 * (node_count << node_count)))
+    parents = array('b', [-1]) * (node_count << node_count)
+    if start is None:
+        starts = range(node_count)
+    else:
+        starts = [start]
+    for node in starts:
+        parents[(1 << node) * node_count + node] = no_parent
+
+    for mask in range(1, 1 << node_count):
+        for last, row in enumerate(distances):
+            index = mask * node_count + last
+            if parents[index] == -1:
+                continue
+            cost = costs[index]
+            for next_node, distance in enumerate(row):
+                if distance is None or mask >> next_node & 1:
+                    continue
+                next_mask = mask | (1 << next_node)
+                next_index = next_mask * node_count + next_node
+                next_cost = cost + distance
+                if parents[next_index] == -1 \
+                        or is_better(next_cost, costs[next_index]):
+                    costs[next_index] = next_cost
+                    parents[next_index] = last
+
+    full_mask = (1 << node_count) - 1
+    best: Optional[Tuple[int, int]] = None
+    for last in range(node_count):
+        index = full_mask * node_count + last
+        if parents[index] == -1:
+            continue
+        cost = costs[index]
+        if return_to_start and last != start:
+            distance = distances[last][start]
+            if distance is None:
+                continue
+            cost += distance
+        if best is None or is_better(cost, best[0]):
+            best = cost, last
+    if best is None:
+        raise Exception(f"There is no path through all {node_count} nodes")
+
+    cost, last = best
+    path = []
+    mask = full_mask
+    while last != no_parent:
+        path.append(last)
+        previous = parents[mask * node_count + last]
+        mask ^= 1 << last
+        last = previous
+    path.reverse()
+    if return_to_start:
+        path.append(start)
+
+    return cost, path
@@ -2,10 +2,11 @@
 import re
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import Dict, List, get_type_hints, Generic, Type, Optional
+from typing import Dict, List, get_type_hints, Generic, Type, Optional, Tuple
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, PolymorphicParser, TV, get_type_argument_class
+from utils import BaseChallenge, Circuit, CircuitGate, PolymorphicParser, \
+    TV, get_type_argument_class
 
 
 class Challenge(BaseChallenge):
@@ -57,7 +58,7 @@ class Harness:
 
 
 class Value(PolymorphicParser, ABC, root=True):
-    def can_get_value(self, harness: Harness) -> bool:
+    def get_circuit_name(self) -> str:
         raise NotImplementedError()
 
     def get_value(self, harness: Harness) -> int:
@@ -96,8 +97,8 @@ class Wire(LValue, RValue):
         target, = match.groups()
         return cls(target)
 
-    def can_get_value(self, harness: Harness) -> bool:
-        return self.target in harness
+    def get_circuit_name(self) -> str:
+        return self.target
 
     def get_value(self, harness: Harness) -> int:
         return harness[self.target]
@@ -129,8 +130,15 @@ class Constant(LValue):
         value_str, = match.groups()
         return cls(int(value_str))
 
-    def can_get_value(self, harness: Harness) -> bool:
-        return True
+    def get_circuit_name(self) -> str:
+        """
+        Constants are sources in the circuit, and their names can't clash
+        with wire names
+
+        >>> Constant(123).get_circuit_name()
+        '123'
+        """
+        return str(self.value)
 
     def get_value(self, harness: Harness) -> int:
         return self.value
@@ -189,23 +197,39 @@ class ConnectionSet(Generic[ConnectionT, HarnessT]):
         if harness is None:
             harness_class = self.get_harness_class()
             harness = harness_class()
-        remaining = set(self.connections)
-        while remaining:
-            applicable = {
-                connection
-                for connection in remaining
-                if connection.can_apply(harness)
-            }
-            if not applicable:
-                raise Exception(
-                    f"Could not find any more applicable to harness {harness} "
-                    f"from {remaining}")
-            for connection in applicable:
-                connection.apply(harness)
-            remaining -= applicable
+        circuit = self.get_circuit(harness)
+        for name in circuit.gates:
+            harness[name] = circuit[name]
 
         return harness
 
+    def get_circuit(self, harness: Optional[HarnessT] = None) -> Circuit:
+        """
+        >>> _circuit = ConnectionSet.from_connections_text(
+        ...     "123 -> x\\n"
+        ...     "x AND y -> d\\n"
+        ...     "NOT d -> e\\n"
+        ... ).get_circuit(Harness({'y': 456}))
+        >>> _circuit['d'], _circuit['e']
+        (72, 65463)
+        >>> _circuit.set_values({'y': 1})
+        ['y', 'd', 'e']
+        >>> _circuit['e']
+        65534
+        """
+        values = {
+            _input.get_circuit_name(): _input.value
+            for connection in self.connections
+            for _input in connection.get_inputs()
+            if isinstance(_input, Constant)
+        }
+        if harness is not None:
+            values.update(harness.wires)
+        return Circuit(dict(
+            connection.get_gate()
+            for connection in self.connections
+        ), values)
+
 
 class Connection(PolymorphicParser, ABC, root=True):
     def get_input_names(self) -> List[str]:
@@ -222,11 +246,8 @@ class Connection(PolymorphicParser, ABC, root=True):
             for input_name in self.get_input_names()
         ]
 
-    def can_apply(self, harness: Harness) -> bool:
-        return all(
-            _input.can_get_value(harness)
-            for _input in self.get_inputs()
-        )
+    def get_gate(self) -> Tuple[str, CircuitGate]:
+        raise NotImplementedError()
 
     def apply(self, harness: Harness) -> Harness:
         raise NotImplementedError()
@@ -260,6 +281,11 @@ class UnaryConnection(Connection, ABC):
         )
         return harness
 
+    def get_gate(self) -> Tuple[str, CircuitGate]:
+        return self.destination.get_circuit_name(), (
+            self.apply_to_value, (self.source.get_circuit_name(),),
+        )
+
     def apply_to_value(self, value: int) -> int:
         raise NotImplementedError()
 
@@ -339,6 +365,12 @@ class BinaryConnection(Connection, ABC):
         )
         return harness
 
+    def get_gate(self) -> Tuple[str, CircuitGate]:
+        return self.destination.get_circuit_name(), (
+            self.apply_to_values,
+            (self.lhs.get_circuit_name(), self.rhs.get_circuit_name()),
+        )
+
     def apply_to_values(self, lhs: int, rhs: int) -> int:
         raise NotImplementedError()
 
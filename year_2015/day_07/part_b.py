@@ -11,18 +11,11 @@ class Challenge(BaseChallenge):
         14134
         """
         connection_set = part_a.ConnectionSet.from_connections_text(_input)
-        harness = connection_set.apply()
+        circuit = connection_set.get_circuit()
         if debugger:
-            print(harness.show())
-        new_harness = part_a.Harness({'b': harness['a']})
-        write_to_b, = [
-            connection
-            for connection in connection_set.connections
-            if connection.destination == part_a.Wire('b')
-        ]
-        connection_set.connections.remove(write_to_b)
-        connection_set.apply(new_harness)
-        return new_harness['a']
+            print(connection_set.apply().show())
+        circuit.set_values({'b': circuit['a']})
+        return circuit['a']
 
 
 Challenge.main()
@@ -2,10 +2,10 @@
 import re
 from dataclasses import dataclass, field
 from itertools import permutations
-from typing import Dict, Tuple, Iterable
+from typing import Dict, Tuple, Iterable, List, Optional
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, get_windows
+from utils import BaseChallenge, get_windows, held_karp
 
 
 class Challenge(BaseChallenge):
@@ -70,9 +70,35 @@ class Network:
         ...     "London to Belfast = 518\\n"
         ...     "Dublin to Belfast = 141\\n"
         ... ).get_shortest_trip()
-        ('Belfast', 'Dublin', 'London')
+        ('London', 'Dublin', 'Belfast')
         """
-        return min(self.get_all_trips(), key=self.get_trip_distance)
+        return self.get_optimal_trip()
+
+    def get_optimal_trip(self, maximise: bool = False) -> Iterable[str]:
+        nodes, distances = self.get_distance_matrix()
+        _, path = held_karp(distances, maximise=maximise)
+        return tuple(nodes[index] for index in path)
+
+    def get_distance_matrix(self,
+                            ) -> Tuple[List[str], List[List[Optional[int]]]]:
+        """
+        >>> Network.from_distances_text(
+        ...     "London to Dublin = 464\\n"
+        ...     "London to Belfast = 518\\n"
+        ...     "Dublin to Belfast = 141\\n"
+        ... ).get_distance_matrix()
+        (['Belfast', 'Dublin', 'London'],
+            [[None, 141, 518], [141, None, 464], [518, 464, None]])
+        """
+        nodes = sorted({
+            node
+            for edge in self.distances
+            for node in edge
+        })
+        return nodes, [
+            [self.distances.get((lhs, rhs)) for rhs in nodes]
+            for lhs in nodes
+        ]
 
     def get_all_trips(self) -> Iterable[Iterable[str]]:
         """
@@ -35,9 +35,9 @@ class NetworkExtended(part_a.Network):
         ...     "London to Belfast = 518\\n"
         ...     "Dublin to Belfast = 141\\n"
         ... ).get_longest_trip()
-        ('Belfast', 'London', 'Dublin')
+        ('Dublin', 'London', 'Belfast')
         """
-        return max(self.get_all_trips(), key=self.get_trip_distance)
+        return self.get_optimal_trip(maximise=True)
 
 
 Challenge.main()
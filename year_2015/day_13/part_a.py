@@ -6,7 +6,7 @@ from itertools import permutations
 from typing import Dict, Tuple, List, Iterable, Sized, Set
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, get_windows
+from utils import BaseChallenge, get_windows, held_karp
 
 
 class Challenge(BaseChallenge):
@@ -147,10 +147,19 @@ class AttendeeSet:
         ...     "David would gain 41 happiness units "
         ...     "by sitting next to Carol.\\n"
         ... ).get_happiest_arrangement()
-        ('Alice', 'Bob', 'Carol', 'David')
+        ('Alice', 'David', 'Carol', 'Bob')
         """
-        return max(self.get_all_arrangements(),
-                   key=self.get_arrangement_happiness)
+        attendees = sorted(self.get_attendees())
+        if len(attendees) < 3:
+            return tuple(attendees)
+        _, path = held_karp([
+            [
+                None if lhs == rhs else self.happiness_map[(lhs, rhs)]
+                for rhs in attendees
+            ]
+            for lhs in attendees
+        ], return_to_start=True, maximise=True)
+        return tuple(attendees[index] for index in path[:-1])
 
     def get_all_arrangements(self) -> Iterable[Tuple[str, ...]]:
         """
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
+from typing import Dict
+
 from aox.challenge import Debugger
-from utils import BaseChallenge
+from utils import BaseChallenge, RegisterMachineSpec
 
 
 class Challenge(BaseChallenge):
@@ -9,102 +11,32 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         170
         """
-        return simulate_program(0)
-
+        return run_program(_input, a=0)['b']
 
-def simulate_program(a: int) -> int:
-    b = 0
-    if a == 1:
-        value = get_constant_for_1()
-    elif a == 0:
-        value = get_constant_for_0()
-    else:
-        raise Exception(f"Cannot get constant for a='{a}'")
-    while value != 1:
-        b += 1
-        if value % 2 == 0:
-            value /= 2
-        else:
-            value = (value * 3) + 1
 
-    return b
+INSTRUCTION_SET = RegisterMachineSpec({
+    'hlf': ('r', "registers[a] //= 2"),
+    'tpl': ('r', "registers[a] *= 3"),
+    'inc': ('r', "registers[a] += 1"),
+    'jmp': ('i', "pc += a\ncontinue"),
+    'jie': ('ri', "if registers[a] % 2 == 0:\n    pc += b\n    continue"),
+    'jio': ('ri', "if registers[a] == 1:\n    pc += b\n    continue"),
+}, register_names='ab')
 
 
-def get_constant_for_0() -> int:
+def run_program(program_text: str, a: int = 0, b: int = 0) -> Dict[str, int]:
     """
-    >>> get_constant_for_0()
-    4591
+    >>> run_program(
+    ...     "inc a\\n"
+    ...     "jio a, +2\\n"
+    ...     "tpl a\\n"
+    ...     "inc a\\n"
+    ... )
+    {'a': 2, 'b': 0}
     """
-    return get_constant_for_program("""
-        inc a
-        inc a
-        tpl a
-        tpl a
-        tpl a
-        inc a
-        inc a
-        tpl a
-        inc a
-        inc a
-        tpl a
-        tpl a
-        tpl a
-        inc a
-    """, a=0)
-
-
-def get_constant_for_1() -> int:
-    """
-    >>> get_constant_for_1()
-    113383
-    """
-    return get_constant_for_program("""
-        tpl a
-        inc a
-        inc a
-        tpl a
-        inc a
-        inc a
-        tpl a
-        tpl a
-        inc a
-        inc a
-        tpl a
-        inc a
-        tpl a
-        inc a
-        tpl a
-        inc a
-        inc a
-        tpl a
-        inc a
-        tpl a
-        tpl a
-        inc a
-    """, a=1)
-
-
-def get_constant_for_program(program_text: str, a: int) -> int:
-    data = {
-        "a": a,
-    }
-
-    def increase_a():
-        data["a"] += 1
-
-    def triple_a():
-        data["a"] *= 3
-
-    instruction_mapping = {
-        "inc a": increase_a,
-        "tpl a": triple_a,
-    }
-
-    lines = filter(None, map(str.strip, program_text.splitlines()))
-    for line in lines:
-        instruction_mapping[line]()
-
-    return data["a"]
+    registers = [a, b]
+    INSTRUCTION_SET.run(INSTRUCTION_SET.parse_program(program_text), registers)
+    return dict(zip(INSTRUCTION_SET.register_names, registers))
 
 
 Challenge.main()
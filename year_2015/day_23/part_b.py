@@ -2,7 +2,7 @@
 from aox.challenge import Debugger
 from utils import BaseChallenge
 from year_2015.day_23 import part_a
-from year_2015.day_23.part_a import simulate_program
+from year_2015.day_23.part_a import run_program
 
 
 class Challenge(BaseChallenge):
@@ -13,7 +13,7 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         247
         """
-        return simulate_program(1)
+        return run_program(_input, a=1)['b']
 
 
 Challenge.main()
@@ -4,11 +4,12 @@ from abc import ABC
 from dataclasses import dataclass, field
 from functools import total_ordering
 from itertools import count, combinations
-from typing import Dict, Optional, Generic, List, Tuple, Type, Set
+from typing import Dict, Iterable, Optional, Generic, List, Tuple, Type, Set
 
+from aox.challenge import Debugger
 from aox.utils import Timer
 from utils import BaseChallenge, PolymorphicParser, Self, Cls, TV, \
-    get_type_argument_class
+    bidirectional_bfs, get_type_argument_class
 
 
 class Challenge(BaseChallenge):
@@ -22,7 +23,8 @@ class Challenge(BaseChallenge):
         building = Building.from_building_text(_input)
         if debug:
             print(building.show())
-        return building.get_smallest_solution_length(debug=debug)
+        return PackedBuildingSolver.from_building(building)\
+            .get_smallest_solution_length(debug=debug)
 
 
 BuildingT = TV['Building']
@@ -60,7 +62,7 @@ class BuildingSolver(Generic[BuildingT]):
                 break
             distance, current_building = stack.pop(0)
             next_buildings = self.get_next_states(current_building)
-            next_buildings -= set(previous_map)
+            next_buildings.difference_update(previous_map)
             next_distance = distance + 1
             for next_building in next_buildings:
                 previous_map[next_building] = current_building
@@ -211,6 +213,171 @@ class BuildingSolver(Generic[BuildingT]):
         ] + list(combinations(contents, 2))
 
 
+Pair = Tuple[int, int]
+
+
+@dataclass
+class PackedBuildingSolver:
+    """
+    A solver that packs each state into an int: the elevator floor, and the
+    generator and microchip floor of each pair. Since the pairs are
+    interchangeable, they are sorted, so that all equivalent states pack to
+    the same int. It then searches from both the start and the end, until
+    they meet.
+    """
+    floor_count: int
+    position: int
+    pairs: List[Pair]
+
+    @classmethod
+    def from_building(cls, building: 'Building') -> 'PackedBuildingSolver':
+        """
+        >>> PackedBuildingSolver.from_building(Building.from_building_text(
+        ...     "The first floor contains a hydrogen-compatible microchip and "
+        ...     "a lithium-compatible microchip.\\n"
+        ...     "The second floor contains a hydrogen generator.\\n"
+        ...     "The third floor contains a lithium generator.\\n"
+        ...     "The fourth floor contains nothing relevant.\\n"
+        ... ))
+        PackedBuildingSolver(floor_count=4, position=0, pairs=[(1, 0), (2, 0)])
+        """
+        floors = sorted(building.floors)
+        floor_indexes = {
+            floor: index
+            for index, floor in enumerate(floors)
+        }
+        generator_floors = {}
+        microchip_floors = {}
+        for floor, contents in building.floors.items():
+            for _object in contents:
+                if isinstance(_object, Generator):
+                    generator_floors[_object.type] = floor_indexes[floor]
+                else:
+                    microchip_floors[_object.type] = floor_indexes[floor]
+        if set(generator_floors) != set(microchip_floors):
+            raise Exception(
+                f"Expected a microchip for every generator, but got "
+                f"{sorted(set(generator_floors) ^ set(microchip_floors))} "
+                f"without a pair")
+        return cls(
+            floor_count=len(floors),
+            position=floor_indexes.get(building.position, 0),
+            pairs=sorted(
+                (generator_floors[_type], microchip_floors[_type])
+                for _type in generator_floors
+            ),
+        )
+
+    @property
+    def floor_bits(self) -> int:
+        return max(1, (self.floor_count - 1).bit_length())
+
+    def pack(self, position: int, pairs: List[Pair]) -> int:
+        """
+        >>> solver = PackedBuildingSolver(4, 0, [])
+        >>> solver.pack(1, [(2, 3), (0, 1)])
+        283
+        >>> solver.pack(1, [(0, 1), (2, 3)])
+        283
+        >>> solver.unpack(283, 2)
+        (1, [(0, 1), (2, 3)])
+        """
+        floor_bits = self.floor_bits
+        state = position
+        for generator, microchip in sorted(pairs):
+            state = (
+                (((state << floor_bits) | generator) << floor_bits)
+                | microchip
+            )
+        return state
+
+    def unpack(self, state: int, pair_count: int) -> Tuple[int, List[Pair]]:
+        floor_bits = self.floor_bits
+        mask = (1 << floor_bits) - 1
+        pairs = []
+        for _ in range(pair_count):
+            microchip = state & mask
+            state >>= floor_bits
+            generator = state & mask
+            state >>= floor_bits
+            pairs.append((generator, microchip))
+        pairs.reverse()
+        return state, pairs
+
+    def get_smallest_solution_length(self, debug: bool = False) -> int:
+        """
+        >>> PackedBuildingSolver.from_building(Building.from_building_text(
+        ...     "The first floor contains a hydrogen-compatible microchip and "
+        ...     "a lithium-compatible microchip.\\n"
+        ...     "The second floor contains a hydrogen generator.\\n"
+        ...     "The third floor contains a lithium generator.\\n"
+        ...     "The fourth floor contains nothing relevant.\\n"
+        ... )).get_smallest_solution_length()
+        11
+        """
+        top_floor = self.floor_count - 1
+        path = bidirectional_bfs(
+            [self.pack(self.position, self.pairs)],
+            [self.pack(top_floor, [(top_floor, top_floor)] * len(self.pairs))],
+            self.get_next_states,
+            debugger=Debugger(enabled=debug),
+        )
+        if path is None:
+            raise Exception("Cannot find a solution")
+        return len(path) - 1
+
+    def get_next_states(self, state: int) -> Iterable[int]:
+        """
+        >>> solver = PackedBuildingSolver(4, 0, [])
+        >>> def check(position, pairs):
+        ...     return sorted(
+        ...         solver.unpack(next_state, len(pairs))
+        ...         for next_state
+        ...         in solver.get_next_states(solver.pack(position, pairs))
+        ...     )
+        >>> solver.pairs = [(1, 0), (2, 0)]
+        >>> check(0, [(1, 0), (2, 0)])
+        [(1, [(1, 1), (2, 0)])]
+        >>> check(1, [(1, 1), (2, 0)])
+        [(0, [(1, 0), (2, 0)]), (2, [(2, 0), (2, 1)]), (2, [(2, 0), (2, 2)])]
+        """
+        position, pairs = self.unpack(state, len(self.pairs))
+        items = [
+            (index, side)
+            for index, pair in enumerate(pairs)
+            for side, floor in enumerate(pair)
+            if floor == position
+        ]
+        items_list = [
+            (item,)
+            for item in items
+        ] + list(combinations(items, 2))
+        for next_position in (position - 1, position + 1):
+            if not (0 <= next_position < self.floor_count):
+                continue
+            for items_to_move in items_list:
+                next_pairs = list(map(list, pairs))
+                for index, side in items_to_move:
+                    next_pairs[index][side] = next_position
+                next_pairs = list(map(tuple, next_pairs))
+                if not self.are_pairs_valid(next_pairs):
+                    continue
+                yield self.pack(next_position, next_pairs)
+
+    def are_pairs_valid(self, pairs: List[Pair]) -> bool:
+        """
+        >>> PackedBuildingSolver(4, 0, []).are_pairs_valid([(1, 0), (2, 0)])
+        True
+        >>> PackedBuildingSolver(4, 0, []).are_pairs_valid([(1, 0), (0, 1)])
+        False
+        """
+        generator_floors = {generator for generator, _ in pairs}
+        return all(
+            generator == microchip or microchip not in generator_floors
+            for generator, microchip in pairs
+        )
+
+
 ObjectT = TV['Object']
 
 
@@ -2,12 +2,13 @@
 import re
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Generic, Type, Iterable
+from typing import List, Optional, Dict, Generic, Type, Iterable, Tuple, \
+    Union
 
 from aox.utils import Timer
 
 from utils import BaseChallenge, PolymorphicParser, Self, Cls, TV, \
-    get_type_argument_class
+    get_type_argument_class, RegisterMachineSpec
 
 
 class Challenge(BaseChallenge):
@@ -47,6 +48,46 @@ class State:
     def jump(self, offset: int):
         self.program_counter += offset
 
+    def to_registers(self) -> List[int]:
+        """
+        >>> State({'b': 2}).to_registers()[:5]
+        [0, 2, 0, 0, 0]
+        """
+        registers = [0] * len(REGISTER_SLOTS)
+        for name, value in self.values.items():
+            registers[REGISTER_SLOTS[name]] = value
+        return registers
+
+    def update_from_registers(self, registers: List[int],
+                              names: Iterable[str]) -> 'State':
+        """
+        >>> State().update_from_registers([1, 2, 3, 4, 5, 6], 'ae')
+        State(values={'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5},
+            program_counter=0)
+        """
+        for name in set(self.values) | set(names):
+            self.values[name] = registers[REGISTER_SLOTS[name]]
+        return self
+
+
+ASSEMBUNNY = RegisterMachineSpec({
+    'cpy': ('vr', "registers[b] = {a}"),
+    'inc': ('r', "registers[a] += 1"),
+    'dec': ('r', "registers[a] -= 1"),
+    'jnz': ('vv', "if {a}:\n    pc += {b}\n    continue"),
+})
+
+# Registers are resolved to a slot in a list when decoding
+REGISTER_SLOTS = ASSEMBUNNY.register_slots
+
+OP_CPY = ASSEMBUNNY.op_codes['cpy']
+OP_INC = ASSEMBUNNY.op_codes['inc']
+OP_DEC = ASSEMBUNNY.op_codes['dec']
+OP_JNZ = ASSEMBUNNY.op_codes['jnz']
+
+# The op code, and the operands as `ASSEMBUNNY` decodes them
+DecodedInstruction = Tuple[Union[int, bool], ...]
+
 
 class Value(PolymorphicParser, ABC, root=True):
     """
@@ -64,6 +105,10 @@ class Value(PolymorphicParser, ABC, root=True):
     def to_text(self) -> str:
         raise NotImplementedError()
 
+    def decode(self) -> Tuple[bool, int]:
+        """Return whether it's a register, and its slot or value"""
+        raise NotImplementedError()
+
 
 class LValue(Value, ABC):
     pass
@@ -73,6 +118,10 @@ class RValue(Value, ABC):
     def set_value(self, state: State, value: int):
         raise NotImplementedError()
 
+    def get_slot(self) -> int:
+        """Return the register's slot"""
+        raise NotImplementedError()
+
 
 @Value.register
 @dataclass
@@ -110,6 +159,20 @@ class Register(LValue, RValue):
         """
         return self.target
 
+    def decode(self) -> Tuple[bool, int]:
+        """
+        >>> Register('c').decode()
+        (True, 2)
+        """
+        return True, self.get_slot()
+
+    def get_slot(self) -> int:
+        """
+        >>> Register('c').get_slot()
+        2
+        """
+        return REGISTER_SLOTS[self.target]
+
 
 @Value.register
 @dataclass
@@ -147,6 +210,13 @@ class Constant(LValue):
         """
         return str(self.value)
 
+    def decode(self) -> Tuple[bool, int]:
+        """
+        >>> Constant(-3).decode()
+        (False, -3)
+        """
+        return False, self.value
+
 
 InstructionT = TV['Instruction']
 
@@ -209,11 +279,67 @@ class InstructionSet(Generic[InstructionT]):
         ... )
         ({'a': 42}, 6)
         """
+        if not debug and self.can_decode():
+            return self.apply_fast(state)
         for state in self.apply_stream(state, debug=debug):
             pass
 
         return state
 
+    def can_decode(self) -> bool:
+        return all(
+            type(instruction).decode is not Instruction.decode
+            for instruction in self.instructions
+        )
+
+    def get_decoded_instructions(self) -> List[DecodedInstruction]:
+        return [
+            instruction.decode()
+            for instruction in self.instructions
+        ]
+
+    def get_register_names(self) -> Iterable[str]:
+        return {
+            value.target
+            for instruction in self.instructions
+            for value in vars(instruction).values()
+            if isinstance(value, Register)
+        }
+
+    def apply_fast(self, state: Optional[State] = None,
+                   max_step_count: Optional[int] = None) -> State:
+        """
+        Run the decoded instructions on a list of registers, without yielding
+        any intermediate states
+
+        >>> InstructionSet.from_instructions_text(
+        ...     "cpy 41 a\\n"
+        ...     "inc a\\n"
+        ...     "inc a\\n"
+        ...     "dec a\\n"
+        ...     "jnz a 2\\n"
+        ...     "dec a\\n"
+        ... ).apply_fast()
+        State(values={'a': 42, 'b': 0, 'c': 0, 'd': 0}, program_counter=6)
+        >>> InstructionSet.from_instructions_text(
+        ...     "cpy 3 e\\n"
+        ...     "dec e\\n"
+        ...     "jnz e -1\\n"
+        ... ).apply_fast(max_step_count=3)
+        State(values={'a': 0, 'b': 0, 'c': 0, 'd': 0, 'e': 2},
+            program_counter=1)
+        """
+        if state is None:
+            state = State()
+        registers = state.to_registers()
+        program_counter, _ = ASSEMBUNNY.run(
+            self.get_decoded_instructions(), registers,
+            state.program_counter, max_step_count)
+
+        state.program_counter = program_counter
+        return state.update_from_registers(
+            registers, self.get_register_names())
+
     def apply_stream(self, state: Optional[State] = None, debug: bool = False,
                      ) -> Iterable[State]:
         if state is None:
@@ -278,6 +404,9 @@ class Instruction(PolymorphicParser, ABC, root=True):
     def apply(self, state: State) -> State:
         raise NotImplementedError()
 
+    def decode(self) -> DecodedInstruction:
+        raise NotImplementedError()
+
 
 @Instruction.register
 @dataclass
@@ -348,6 +477,13 @@ class Cpy(Instruction):
         state.go_to_next()
         return state
 
+    def decode(self) -> DecodedInstruction:
+        """
+        >>> Cpy.parse("cpy 5 b").decode()
+        (0, False, 5, 1)
+        """
+        return (OP_CPY, *self.source.decode(), self.destination.get_slot())
+
 
 @Instruction.register
 @dataclass
@@ -407,6 +543,13 @@ class Inc(Instruction):
         state.go_to_next()
         return state
 
+    def decode(self) -> DecodedInstruction:
+        """
+        >>> Inc.parse("inc b").decode()
+        (1, 1)
+        """
+        return (OP_INC, self.register.get_slot())
+
 
 @Instruction.register
 @dataclass
@@ -466,6 +609,9 @@ class Dec(Instruction):
         state.go_to_next()
         return state
 
+    def decode(self) -> DecodedInstruction:
+        return (OP_DEC, self.register.get_slot())
+
 
 @Instruction.register
 @dataclass
@@ -570,6 +716,9 @@ class Jnz(Instruction):
         state.jump(self.offset.get_value(state))
         return state
 
+    def decode(self) -> DecodedInstruction:
+        return (OP_JNZ, *self.check.decode(), *self.offset.decode())
+
 
 Challenge.main()
 challenge = Challenge()
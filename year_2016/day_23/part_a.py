@@ -2,7 +2,8 @@
 import re
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import List, Optional, Iterable, get_type_hints, Type
+from typing import Callable, List, Optional, Iterable, get_type_hints, \
+    Type, Tuple
 
 from aox.challenge import Debugger
 
@@ -33,11 +34,88 @@ class StateExtended(part_12_a.State):
         field(default_factory=list)
 
 
+# `tgl` stops the run right after it, and sends the address to toggle, so
+# that the program can be decoded again. Disabled instructions are `nop`s.
+ASSEMBUNNY_WITH_TGL = part_12_a.ASSEMBUNNY.extend({
+    'tgl': ('v', "outbound.append(pc + {a})\npc += 1\nbreak"),
+    'nop': ('', "pass"),
+})
+
+OP_TGL = ASSEMBUNNY_WITH_TGL.op_codes['tgl']
+OP_NOP = ASSEMBUNNY_WITH_TGL.op_codes['nop']
+
+
+@dataclass
+class AddSuperinstruction:
+    """
+    Replaces `inc x, dec y, jnz y -2` with `x += y, y = 0`, and runs the
+    original first instruction if `y` is not positive
+
+    >>> registers = [1, 0, 5, 0]
+    >>> AddSuperinstruction(0, 2, lambda _registers, pc: pc + 1)(registers, 3)
+    6
+    >>> registers
+    [6, 0, 0, 0]
+    >>> AddSuperinstruction(0, 2, lambda _registers, pc: pc + 1)(registers, 3)
+    4
+    """
+    target: int
+    source: int
+    fallback: Callable[[List[int], int], int] = field(repr=False)
+
+    def __call__(self, registers: List[int], pc: int) -> int:
+        if registers[self.source] <= 0:
+            return self.fallback(registers, pc)
+        registers[self.target] += registers[self.source]
+        registers[self.source] = 0
+        return pc + 3
+
+
+@dataclass
+class MultiplySuperinstruction:
+    """
+    Replaces `cpy y z`, an add loop of `z` into `x`, and `dec w, jnz w -5`
+    with `x += y * w, z = 0, w = 0`, and runs the original first instruction
+    if `y` or `w` is not positive
+
+    >>> registers = [1, 3, 0, 4]
+    >>> MultiplySuperinstruction(
+    ...     0, True, 1, 2, 3, lambda _registers, pc: pc + 1)(registers, 0)
+    6
+    >>> registers
+    [13, 3, 0, 0]
+    """
+    target: int
+    factor_is_register: bool
+    factor: int
+    counter: int
+    outer_counter: int
+    fallback: Callable[[List[int], int], int] = field(repr=False)
+
+    def __call__(self, registers: List[int], pc: int) -> int:
+        factor = self.factor
+        if self.factor_is_register:
+            factor = registers[factor]
+        if factor <= 0 or registers[self.outer_counter] <= 0:
+            return self.fallback(registers, pc)
+        registers[self.target] += factor * registers[self.outer_counter]
+        registers[self.counter] = 0
+        registers[self.outer_counter] = 0
+        return pc + 6
+
+
 class InstructionSetExtended(part_12_a.InstructionSet['InstructionExtended']):
     def apply_extended(self, state: Optional[StateExtended] = None,
                        debugger: Debugger = Debugger(enabled=False),
+                       report_step_count: int = 10000000,
                        ) -> StateExtended:
         """
+        Run the decoded instructions on a list of registers, replacing add and
+        multiply loops with superinstructions. Every time a `tgl` changes an
+        instruction the program is optimised again, so that a loop that has
+        been changed is not treated as a superinstruction any more. With the
+        debugger enabled, it reports every `report_step_count` steps.
+
         >>> def check(instructions_text, state_values=None, program_counter=0):
         ...     _state = InstructionSetExtended\\
         ...         .from_instructions_text(instructions_text)\\
@@ -60,20 +138,200 @@ class InstructionSetExtended(part_12_a.InstructionSet['InstructionExtended']):
         ...     "dec a\\n"
         ... )
         ({'a': 3}, 7)
+        >>> check(
+        ...     "cpy b c\\n"
+        ...     "inc a\\n"
+        ...     "dec c\\n"
+        ...     "jnz c -2\\n"
+        ...     "dec d\\n"
+        ...     "jnz d -5\\n",
+        ...     {'a': 5, 'b': 10 ** 6, 'd': 10 ** 6},
+        ... )
+        ({'a': 1000000000005, 'b': 1000000}, 6)
+        >>> check(
+        ...     "cpy 2 b\\n"
+        ...     "tgl b\\n"
+        ...     "cpy 3 c\\n"
+        ...     "inc a\\n"
+        ...     "dec c\\n"
+        ...     "jnz c -2\\n"
+        ... )
+        ({'a': -3, 'b': 2}, 6)
         """
         if state is None:
             state = StateExtended()
-        state.instructions = list(self.instructions)
+        instructions = list(self.instructions)
+        registers = state.to_registers()
+        decoded_instructions = self.get_optimised_instructions(instructions)
+        program_counter = state.program_counter
+        toggled: List[int] = []
         debugger.reset()
-        while debugger.step_if(
-                0 <= state.program_counter < len(state.instructions)):
-            self.step(state)
-            if debugger.should_report():
-                debugger.default_report(
-                    f"values: {state.values}, pc: {state.program_counter}")
-
+        while 0 <= program_counter < len(decoded_instructions):
+            program_counter, step_count = ASSEMBUNNY_WITH_TGL.run(
+                decoded_instructions, registers, program_counter,
+                report_step_count if debugger else None, outbound=toggled)
+            debugger.step(step_count)
+            if toggled:
+                for index in toggled:
+                    if 0 <= index < len(instructions):
+                        instructions[index] = \
+                            instructions[program_counter - 1]\
+                            .reinterpret_instruction(instructions[index])
+                toggled.clear()
+                decoded_instructions = \
+                    self.get_optimised_instructions(instructions)
+            debugger.default_report_if(
+                f"registers: {registers[:4]}, pc: {program_counter}")
+
+        state.program_counter = program_counter
+        state.instructions = instructions
+        state.update_from_registers(registers, self.get_register_names())
         return state
 
+    def get_optimised_instructions(
+            self, instructions: List['InstructionExtended'],
+    ) -> List[tuple]:
+        """
+        >>> instruction_set = InstructionSetExtended.from_instructions_text(
+        ...     "cpy b c\\n"
+        ...     "inc a\\n"
+        ...     "dec c\\n"
+        ...     "jnz c -2\\n"
+        ...     "dec d\\n"
+        ...     "jnz d -5\\n"
+        ...     "dec d\\n"
+        ...     "inc c\\n"
+        ...     "jnz d -2\\n"
+        ... )
+        >>> instruction_set.get_optimised_instructions(
+        ...     instruction_set.instructions)
+        [(6, MultiplySuperinstruction(target=0, factor_is_register=True,
+            factor=1, counter=2, outer_counter=3)),
+         (6, AddSuperinstruction(target=0, source=2)),
+         (2, 2), (3, True, 2, False, -2), (2, 3), (3, True, 3, False, -5),
+         (6, AddSuperinstruction(target=2, source=3)),
+         (1, 2), (3, True, 3, False, -2)]
+        """
+        decoded_instructions = list(map(
+            self.decode_instruction, instructions))
+        for index in range(len(instructions)):
+            fallback = ASSEMBUNNY_WITH_TGL.get_instruction_runner(
+                decoded_instructions[index])
+            multiply = self.match_multiply_loop(instructions, index)
+            if multiply:
+                decoded_instructions[index] = (
+                    ASSEMBUNNY_WITH_TGL.call_op_code,
+                    MultiplySuperinstruction(*multiply, fallback),
+                )
+                continue
+            add = self.match_add_loop(instructions, index)
+            if add:
+                decoded_instructions[index] = (
+                    ASSEMBUNNY_WITH_TGL.call_op_code,
+                    AddSuperinstruction(*add, fallback),
+                )
+
+        return decoded_instructions
+
+    def decode_instruction(self, instruction: 'InstructionExtended',
+                           ) -> part_12_a.DecodedInstruction:
+        """
+        >>> InstructionSetExtended([]).decode_instruction(
+        ...     InstructionExtended.parse("tgl c"))
+        (4, True, 2)
+        >>> InstructionSetExtended([]).decode_instruction(
+        ...     InstructionExtended.parse("jnz 1 2").reinterpret_as(Cpy))
+        (5,)
+        """
+        if not instruction.enabled:
+            return ASSEMBUNNY_WITH_TGL.decode('nop', [])
+        return instruction.decode()
+
+    def match_add_loop(self, instructions: List['InstructionExtended'],
+                       index: int) -> Optional[Tuple[int, int]]:
+        """
+        Match `inc x, dec y, jnz y -2` (or with `inc` and `dec` swapped), and
+        return the slots of `x` and `y`
+
+        >>> def check(instructions_text, index=0):
+        ...     return InstructionSetExtended([]).match_add_loop(list(map(
+        ...         InstructionExtended.parse,
+        ...         instructions_text.splitlines())), index)
+        >>> check("inc a\\ndec c\\njnz c -2")
+        (0, 2)
+        >>> check("dec d\\ninc c\\njnz d -2")
+        (2, 3)
+        >>> check("inc a\\ndec c\\njnz c -2", 1)
+        >>> check("inc a\\ndec c\\njnz a -2")
+        >>> check("inc a\\ndec a\\njnz a -2")
+        >>> check("inc a\\ndec c\\njnz c -3")
+        """
+        block = instructions[index:index + 3]
+        if len(block) != 3 or not all(
+                instruction.enabled for instruction in block):
+            return None
+        first, second, jump = block
+        if isinstance(first, Inc) and isinstance(second, Dec):
+            increment, decrement = first, second
+        elif isinstance(first, Dec) and isinstance(second, Inc):
+            increment, decrement = second, first
+        else:
+            return None
+        if not isinstance(jump, Jnz) \
+                or jump.check != decrement.register \
+                or jump.offset != part_12_a.Constant(-2) \
+                or increment.register == decrement.register:
+            return None
+        _, target = increment.register.decode()
+        _, source = decrement.register.decode()
+        return target, source
+
+    def match_multiply_loop(self, instructions: List['InstructionExtended'],
+                            index: int,
+                            ) -> Optional[Tuple[int, bool, int, int, int]]:
+        """
+        Match `cpy y z`, an add loop of `z` into `x`, `dec w, jnz w -5`, and
+        return the slot of `x`, `y` (as a register or a constant), and the
+        slots of `z` and `w`
+
+        >>> def check(instructions_text, index=0):
+        ...     return InstructionSetExtended([]).match_multiply_loop(list(map(
+        ...         InstructionExtended.parse,
+        ...         instructions_text.splitlines())), index)
+        >>> check("cpy b c\\ninc a\\ndec c\\njnz c -2\\ndec d\\njnz d -5")
+        (0, True, 1, 2, 3)
+        >>> check("cpy 91 d\\ninc a\\ndec d\\njnz d -2\\ndec c\\njnz c -5")
+        (0, False, 91, 3, 2)
+        >>> check("cpy b c\\ninc a\\ndec c\\njnz c -2\\ndec a\\njnz a -5")
+        >>> check("cpy a c\\ninc a\\ndec c\\njnz c -2\\ndec d\\njnz d -5")
+        >>> check("cpy b d\\ninc a\\ndec c\\njnz c -2\\ndec d\\njnz d -5")
+        """
+        block = instructions[index:index + 6]
+        if len(block) != 6 or not all(
+                instruction.enabled for instruction in block):
+            return None
+        copy, _, _, _, decrement, jump = block
+        add = self.match_add_loop(instructions, index + 1)
+        if not add \
+                or not isinstance(copy, Cpy) \
+                or not isinstance(decrement, Dec) \
+                or not isinstance(jump, Jnz) \
+                or jump.check != decrement.register \
+                or jump.offset != part_12_a.Constant(-5):
+            return None
+        target, counter = add
+        factor_is_register, factor = copy.source.decode()
+        _, copy_destination = copy.destination.decode()
+        _, outer_counter = decrement.register.decode()
+        if copy_destination != counter:
+            return None
+        slots = [target, counter, outer_counter]
+        if factor_is_register:
+            slots.append(factor)
+        if len(set(slots)) != len(slots):
+            return None
+        return target, factor_is_register, factor, counter, outer_counter
+
     def step(self, state: Optional[StateExtended] = None) -> StateExtended:
         """
         >>> instruction_set = InstructionSetExtended.from_instructions_text(
@@ -231,6 +489,13 @@ class Tgl(InstructionExtended):
         offset_str, = match.groups()
         return cls(part_12_a.LValue.parse(offset_str))
 
+    def decode(self) -> part_12_a.DecodedInstruction:
+        """
+        >>> Tgl(part_12_a.Constant(-2)).decode()
+        (4, False, -2)
+        """
+        return (OP_TGL, *self.offset.decode())
+
     def apply(self, state: StateExtended) -> StateExtended:
         index = state.program_counter + self.offset.get_value(state)
         state.go_to_next()
@@ -248,9 +513,13 @@ class Tgl(InstructionExtended):
         >>> Tgl(part_12_a.Constant(0)).reinterpret_instruction(
         ...     Inc(part_12_a.Register('a')))
         Dec(register=Register(target='a'), enabled=True)
+        >>> Tgl(part_12_a.Constant(0)).reinterpret_instruction(
+        ...     InstructionExtended.parse("jnz 1 2"))
+        Cpy(source=Constant(value=1), destination=Constant(value=2),
+            enabled=False)
         """
-        return instruction.reinterpret(
-            self.REINTERPRET_MAP[type(instruction)].name)
+        return instruction.reinterpret_as(
+            self.REINTERPRET_MAP[type(instruction)])
 
 
 Tgl.REINTERPRET_MAP = {
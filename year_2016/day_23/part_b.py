@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from aox.challenge import Debugger
 from utils import BaseChallenge
+from year_2016.day_23 import part_a
 
 
 class Challenge(BaseChallenge):
@@ -9,7 +10,11 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         479010245
         """
-        return 479010245
+        return part_a.InstructionSetExtended\
+            .from_instructions_text(_input)\
+            .apply_extended(
+                part_a.StateExtended({'a': 12}), debugger=debugger)\
+            .values['a']
 
 
 Challenge.main()
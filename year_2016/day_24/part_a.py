@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
-import itertools
 import string
 from dataclasses import dataclass
-from typing import Set, Dict, Tuple, Optional, Iterable, TypeVar
+from typing import Set, Dict, Tuple, Optional, Iterable, TypeVar, List
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, min_and_max_tuples, \
-    all_possible_permutations, get_windows
+from utils import BaseChallenge, ContractedGraph, Point2D, \
+    min_and_max_tuples, all_possible_permutations, get_windows, held_karp, \
+    dijkstra
 
 
 class Challenge(BaseChallenge):
@@ -43,35 +43,40 @@ class Graph:
         ... }).get_minimum_step_count()
         14
         """
-        nodes = self.get_nodes()
+        nodes = sorted(self.get_nodes())
         if start not in nodes:
             raise Exception(f"Start {start} is not in nodes {nodes}")
-        other_nodes = set(nodes) - {start}
-        prefix = (start,)
-        if return_to_start:
-            suffix = prefix
-        else:
-            suffix = ()
-        visit_orders = (
-            prefix + permutation + suffix
-            for permutation in itertools.permutations(other_nodes)
-        )
-        min_distance = None
-        trip_distances_cache = {}
-        for visit_order in debugger.stepping(visit_orders):
-            distance = sum(
-                self.get_shortest_distance(
-                    node_a, node_b, nodes,
-                    trip_distances_cache=trip_distances_cache)
-                for node_a, node_b in get_windows(visit_order, 2)
-            )
-            if min_distance is None or distance < min_distance:
-                min_distance = distance
-            if debugger.should_report():
-                debugger.default_report(f"min distance: {min_distance}")
+        min_distance, _ = held_karp(
+            self.get_distance_matrix(nodes), start=nodes.index(start),
+            return_to_start=return_to_start)
 
         return min_distance
 
+    def get_distance_matrix(self, nodes: List[int]) -> List[List[int]]:
+        """
+        >>> Graph({
+        ...     (0, 1): 2, (1, 0): 2,
+        ...     (0, 4): 2, (4, 0): 2,
+        ...     (1, 2): 6, (2, 1): 6,
+        ...     (2, 3): 2, (3, 2): 2,
+        ...     (3, 4): 8, (4, 3): 8,
+        ... }).get_distance_matrix([0, 1, 2, 3, 4])
+        [[0, 2, 8, 10, 2], [2, 0, 6, 8, 4], [8, 6, 0, 2, 10],
+            [10, 8, 2, 0, 8], [2, 4, 10, 8, 0]]
+        """
+        neighbours: Dict[int, List[Tuple[int, int]]] = {}
+        for (node_a, node_b), distance in self.edges.items():
+            neighbours.setdefault(node_a, []).append((node_b, distance))
+        matrix = []
+        for node in nodes:
+            distances = dijkstra(
+                [node], lambda _node: neighbours.get(_node, [])).distances
+            matrix.append([
+                distances.get(other)
+                for other in nodes
+            ])
+        return matrix
+
     def get_shortest_distance(self, start: int, end: int,
                               nodes: Optional[Set[int]] = None,
                               trip_distances_cache:
@@ -347,14 +352,21 @@ class Layout:
         1 2   4
         2 2 4
         """
-        total_edges = {}
-        for location in self.locations:
-            edges, _ = self.traverse_layout(location)
-            for edge, distance in edges.items():
-                existing_distance = total_edges.get(edge)
-                if existing_distance is None or distance < existing_distance:
-                    total_edges[edge] = distance
-        return Graph(total_edges)
+        contracted_graph = ContractedGraph.from_grid(
+            self.locations.values(), self.spaces.__contains__,
+            include_junctions=False)
+        reverse_locations = self.get_reverse_locations()
+        locations = [
+            reverse_locations[node]
+            for node in contracted_graph.nodes
+        ]
+        edges = {}
+        for location, node_edges in zip(locations, contracted_graph.edges):
+            for index, distance, _ in node_edges:
+                edge = (location, locations[index])
+                if edge not in edges or distance < edges[edge]:
+                    edges[edge] = distance
+        return Graph(edges)
 
     def traverse_layout(self, start: int = 0,
                         ) -> Tuple[Dict[Tuple[int, int], int], Set[Point2D]]:
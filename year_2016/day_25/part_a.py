@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import re
 from abc import ABC
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from itertools import count
-from typing import List, Optional
+from typing import List, Optional, Iterable, Set, Tuple
 
 from aox.challenge import Debugger
 from utils import BaseChallenge
@@ -18,7 +19,7 @@ class Challenge(BaseChallenge):
         158
         """
         instruction_set = InstructionSetExtended.from_instructions_text(_input)
-        answer = get_offset_for_alternating_binary(2572)
+        answer = find_clock_signal_seed(_input)
         if debugger:
             print("0:")
             print(instruction_set.apply_until_output_length(
@@ -29,6 +30,54 @@ class Challenge(BaseChallenge):
         return answer
 
 
+def find_clock_signal_seed(instructions_text: str,
+                           workers: Optional[int] = None,
+                           chunk_size: int = 32) -> int:
+    """
+    Find the lowest value for `a` that makes the program send a clock signal,
+    optionally checking chunks of candidates across a pool of `workers`
+    processes
+
+    >>> find_clock_signal_seed(Challenge().input)
+    158
+    """
+    if not workers:
+        instruction_set = \
+            InstructionSetExtended.from_instructions_text(instructions_text)
+        for seed in count():
+            if instruction_set.check_clock_signal(StateExtended({'a': seed})):
+                return seed
+
+    with ProcessPoolExecutor(workers) as executor:
+        for start in count(0, workers * chunk_size):
+            chunks = [
+                range(chunk_start, chunk_start + chunk_size)
+                for chunk_start
+                in range(start, start + workers * chunk_size, chunk_size)
+            ]
+            chunk_results = executor.map(
+                check_clock_signal_seeds,
+                [instructions_text] * len(chunks), chunks)
+            for chunk, results in zip(chunks, chunk_results):
+                for seed, result in zip(chunk, results):
+                    if result:
+                        return seed
+
+
+def check_clock_signal_seeds(instructions_text: str, seeds: Iterable[int],
+                             ) -> List[bool]:
+    """
+    >>> check_clock_signal_seeds(Challenge().input, [157, 158, 159])
+    [False, True, False]
+    """
+    instruction_set = \
+        InstructionSetExtended.from_instructions_text(instructions_text)
+    return [
+        instruction_set.check_clock_signal(StateExtended({'a': seed}))
+        for seed in seeds
+    ]
+
+
 def get_offset_for_alternating_binary(threshold: int) -> int:
     """
     >>> get_offset_for_alternating_binary(2572)
@@ -51,6 +100,14 @@ def get_alternating_binary_higher_than(threshold: int) -> int:
             return candidate
 
 
+# `out` stops the run right after it, so that each output can be checked
+ASSEMBUNNY_WITH_OUT = part_12_a.ASSEMBUNNY.extend({
+    'out': ('v', "outbound.append({a})\npc += 1\nbreak"),
+})
+
+OP_OUT = ASSEMBUNNY_WITH_OUT.op_codes['out']
+
+
 @dataclass
 class StateExtended(part_12_a.State):
     output: List[int] = field(default_factory=list)
@@ -72,6 +129,76 @@ class InstructionSetExtended(part_12_a.InstructionSet['InstructionExtended']):
             if len(state.output) == output_length:
                 return state.output
 
+    def check_clock_signal(self, state: Optional[StateExtended] = None,
+                           max_step_count: int = 10000000) -> bool:
+        """
+        Run the decoded instructions, and check that the output is `0, 1, 0,
+        1, ...` forever. It stops at the first wrong output, and it proves the
+        signal is infinite by snapshotting the program counter and registers
+        at each `out`, until a snapshot repeats. If that doesn't happen within
+        `max_step_count` steps, it's not considered a clock signal.
+
+        >>> def check(instructions_text, state_values=None, **kwargs):
+        ...     return InstructionSetExtended\\
+        ...         .from_instructions_text(instructions_text)\\
+        ...         .check_clock_signal(
+        ...             StateExtended(state_values or {}), **kwargs)
+        >>> check("out 0\\nout 1\\njnz 1 -2")
+        True
+        >>> check("out 0\\nout 1\\nout 0")
+        False
+        >>> check("out 1\\nout 0\\njnz 1 -2")
+        False
+        >>> check("out 0\\nout 1\\nout 0\\nout 0\\njnz 1 -4")
+        False
+        >>> check("inc a\\njnz 1 -1", max_step_count=100)
+        False
+        >>> check("out 0\\ninc a\\njnz 1 -1", max_step_count=100)
+        False
+        >>> check(
+        ...     "cpy a b\\n"
+        ...     "out b\\n"
+        ...     "inc b\\n"
+        ...     "out b\\n"
+        ...     "dec b\\n"
+        ...     "jnz 1 -4\\n",
+        ...     {'a': 0})
+        True
+        >>> check(
+        ...     "cpy a b\\n"
+        ...     "out b\\n"
+        ...     "inc b\\n"
+        ...     "out b\\n"
+        ...     "dec b\\n"
+        ...     "jnz 1 -4\\n",
+        ...     {'a': 1})
+        False
+        """
+        if state is None:
+            state = StateExtended()
+        registers = state.to_registers()
+        decoded_instructions = self.get_decoded_instructions()
+        program_counter = state.program_counter
+        output: List[int] = []
+        expected = 0
+        snapshots: Set[Tuple[int, int, Tuple[int, ...]]] = set()
+        while max_step_count > 0:
+            program_counter, step_count = ASSEMBUNNY_WITH_OUT.run(
+                decoded_instructions, registers, program_counter,
+                max_step_count, outbound=output)
+            max_step_count -= step_count
+            if not output:
+                return False
+            if output.pop() != expected:
+                return False
+            snapshot = (program_counter, expected, tuple(registers))
+            if snapshot in snapshots:
+                return True
+            snapshots.add(snapshot)
+            expected = 1 - expected
+
+        return False
+
 
 class InstructionExtended(part_12_a.Instruction, ABC, root=True,
                           parse_root=part_12_a.Instruction):
@@ -105,6 +232,13 @@ class Out(part_12_a.Instruction):
 
         return cls(part_12_a.LValue.parse(content_str))
 
+    def decode(self) -> part_12_a.DecodedInstruction:
+        """
+        >>> Out.try_parse('out b').decode()
+        (4, True, 1)
+        """
+        return (OP_OUT, *self.content.decode())
+
     def apply(self, state: StateExtended) -> State:
         state.send(self.content.get_value(state))
         state.go_to_next()
@@ -18,6 +18,15 @@ class Challenge(utils.BaseChallenge):
         return Program.from_program_text(_input).step_and_get_first_value()
 
 
+OP_SND = 0
+OP_SET = 1
+OP_ADD = 2
+OP_MUL = 3
+OP_MOD = 4
+OP_RCV = 5
+OP_JGZ = 6
+
+
 class Program:
     instruction_class = NotImplemented
     registers_class = NotImplemented
@@ -31,6 +40,21 @@ class Program:
     def __init__(self, instructions):
         self.instructions = instructions
 
+    def get_decoded_instructions(self):
+        """
+        >>> Program.from_program_text(
+        ...     "set a 1\\n"
+        ...     "add a b\\n"
+        ...     "jgz a -1\\n"
+        ... ).get_decoded_instructions()
+        [(1, True, 0, False, 1), (2, True, 0, True, 1),
+            (6, True, 0, False, -1)]
+        """
+        return [
+            instruction.decode()
+            for instruction in self.instructions
+        ]
+
     def step_and_get_first_value(self, registers=None, count=None):
         """
         >>> Program.from_program_text(
@@ -124,6 +148,21 @@ class Registers:
 
         return value
 
+    @classmethod
+    def decode_rvalue(cls, register_or_value):
+        """
+        Return whether it's a register, and its slot or value
+
+        >>> Registers.decode_rvalue('c')
+        (True, 2)
+        >>> Registers.decode_rvalue(-5)
+        (False, -5)
+        """
+        if cls.is_register(register_or_value):
+            return True, string.ascii_lowercase.index(register_or_value)
+
+        return False, register_or_value
+
     def resolve(self, register_or_value):
         if self.is_register(register_or_value):
             register = register_or_value
@@ -199,6 +238,13 @@ class Instruction:
     def apply(self, registers):
         raise NotImplementedError()
 
+    def decode(self):
+        """
+        Return `(op_code, x_is_register, x, y_is_register, y)`, where `x` and
+        `y` are register slots or values
+        """
+        raise NotImplementedError()
+
 
 Program.instruction_class = Instruction
 
@@ -206,6 +252,7 @@ Program.instruction_class = Instruction
 @dataclass(init=False)
 class RValueInstruction(Instruction, ABC):
     rvalue: Union[str, int]
+    op_code = NotImplemented
     regex = NotImplemented
 
     @classmethod
@@ -224,10 +271,15 @@ class RValueInstruction(Instruction, ABC):
     def __init__(self, rvalue):
         self.rvalue = rvalue
 
+    def decode(self):
+        return (
+            self.op_code, *Registers.decode_rvalue(self.rvalue), False, 0)
+
 
 @Instruction.register
 class Sound(RValueInstruction):
     name = 'snd'
+    op_code = OP_SND
 
     regex = RValueInstruction.make_regex(name)
 
@@ -240,6 +292,7 @@ class RegisterRValueInstruction(Instruction, ABC):
     register: str
     rvalue: Union[str, int]
 
+    op_code = NotImplemented
     regex = NotImplemented
 
     @classmethod
@@ -259,10 +312,18 @@ class RegisterRValueInstruction(Instruction, ABC):
         self.register = register
         self.rvalue = rvalue
 
+    def decode(self):
+        return (
+            self.op_code,
+            *Registers.decode_rvalue(self.register),
+            *Registers.decode_rvalue(self.rvalue),
+        )
+
 
 @Instruction.register
 class SetRegister(RegisterRValueInstruction):
     name = 'set'
+    op_code = OP_SET
 
     regex = RegisterRValueInstruction.make_regex(name)
 
@@ -273,6 +334,7 @@ class SetRegister(RegisterRValueInstruction):
 @Instruction.register
 class Add(RegisterRValueInstruction):
     name = 'add'
+    op_code = OP_ADD
 
     regex = RegisterRValueInstruction.make_regex(name)
 
@@ -283,6 +345,7 @@ class Add(RegisterRValueInstruction):
 @Instruction.register
 class Mul(RegisterRValueInstruction):
     name = 'mul'
+    op_code = OP_MUL
 
     regex = RegisterRValueInstruction.make_regex(name)
 
@@ -293,6 +356,7 @@ class Mul(RegisterRValueInstruction):
 @Instruction.register
 class Mod(RegisterRValueInstruction):
     name = 'mod'
+    op_code = OP_MOD
 
     regex = RegisterRValueInstruction.make_regex(name)
 
@@ -303,6 +367,7 @@ class Mod(RegisterRValueInstruction):
 @dataclass(init=False)
 class RegisterInstruction(Instruction, ABC):
     register: str
+    op_code = NotImplemented
     regex = NotImplemented
 
     @classmethod
@@ -321,10 +386,15 @@ class RegisterInstruction(Instruction, ABC):
     def __init__(self, register):
         self.register = register
 
+    def decode(self):
+        return (
+            self.op_code, *Registers.decode_rvalue(self.register), False, 0)
+
 
 @Instruction.register
 class Recover(RegisterInstruction):
     name = 'rcv'
+    op_code = OP_RCV
 
     regex = RegisterInstruction.make_regex(name)
 
@@ -338,6 +408,7 @@ class RvalueRValueInstruction(Instruction, ABC):
     rvalue_a: Union[str, int]
     rvalue_b: Union[str, int]
 
+    op_code = NotImplemented
     regex = NotImplemented
 
     @classmethod
@@ -360,10 +431,18 @@ class RvalueRValueInstruction(Instruction, ABC):
         self.rvalue_a = rvalue_a
         self.rvalue_b = rvalue_b
 
+    def decode(self):
+        return (
+            self.op_code,
+            *Registers.decode_rvalue(self.rvalue_a),
+            *Registers.decode_rvalue(self.rvalue_b),
+        )
+
 
 @Instruction.register
 class Jgz(RvalueRValueInstruction):
     name = 'jgz'
+    op_code = OP_JGZ
 
     regex = RvalueRValueInstruction.make_regex(name)
 
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import itertools
+import string
 from abc import ABC
+from collections import deque
 
 import utils
 from year_2017.day_18 import part_a
@@ -15,7 +17,20 @@ class Challenge(utils.BaseChallenge):
         7493
         """
         return ProgramExtended.from_program_text(_input)\
-            .step_pair_and_get_sent_count()[1]
+            .run_pair_and_get_sent_count()[1]
+
+
+# The operations are in the same order as the op codes in part A
+DUET = utils.RegisterMachineSpec({
+    'snd': ('vv', "outbound.append({a})"),
+    'set': ('vv', "registers[a] = {b}"),
+    'add': ('vv', "registers[a] += {b}"),
+    'mul': ('vv', "registers[a] *= {b}"),
+    'mod': ('vv', "registers[a] %= {b}"),
+    'rcv': ('vv',
+            "if not inbound:\n    break\nregisters[a] = inbound.popleft()"),
+    'jgz': ('vv', "if {a} > 0:\n    pc += {b}\n    continue"),
+})
 
 
 class ProgramExtended(part_a.Program):
@@ -40,6 +55,99 @@ class ProgramExtended(part_a.Program):
 
         return counts
 
+    def run_pair_and_get_sent_count(self, initial_a=None, initial_b=None):
+        """
+        Run each program until it blocks on an empty queue, alternating
+        between them, until both are blocked or finished
+
+        >>> ProgramExtended.from_program_text(
+        ...     "snd 1\\n"
+        ...     "snd 2\\n"
+        ...     "snd p\\n"
+        ...     "rcv a\\n"
+        ...     "rcv b\\n"
+        ...     "rcv c\\n"
+        ...     "rcv d\\n"
+        ... ).run_pair_and_get_sent_count()
+        {0: 3, 1: 3}
+        >>> ProgramExtended.from_program_text(
+        ...     "set a 3\\n"
+        ...     "snd a\\n"
+        ...     "add a -1\\n"
+        ...     "jgz a -2\\n"
+        ...     "jgz p 2\\n"
+        ...     "rcv b\\n"
+        ... ).run_pair_and_get_sent_count()
+        {0: 3, 1: 3}
+        >>> program = ProgramExtended.from_program_text(
+        ...     Challenge().input)
+        >>> program.run_pair_and_get_sent_count({'p': 0}, {'p': 1}) \\
+        ...     == program.step_pair_and_get_sent_count()
+        True
+        """
+        if initial_a is None:
+            initial_a = {'p': 0}
+        if initial_b is None:
+            initial_b = {'p': 1}
+        decoded_instructions = self.get_decoded_instructions()
+        registers_list = []
+        for initial in (initial_a, initial_b):
+            registers = [0] * len(string.ascii_lowercase)
+            for name, value in initial.items():
+                _, slot = part_a.Registers.decode_rvalue(name)
+                registers[slot] = value
+            registers_list.append(registers)
+        queues = (deque(), deque())
+        instruction_pointers = [0, 0]
+        counts = {0: 0, 1: 0}
+        while True:
+            for index in (0, 1):
+                instruction_pointers[index], sent_count = \
+                    self.run_until_blocked(
+                        decoded_instructions, registers_list[index],
+                        instruction_pointers[index], queues[index],
+                        queues[1 - index])
+                counts[index] += sent_count
+            # Program 1 has just blocked, or finished, and if program 0 has
+            # finished or has nothing to receive, it can't make progress
+            # either
+            has_finished = not (
+                0 <= instruction_pointers[0] < len(decoded_instructions))
+            if has_finished or not queues[0]:
+                break
+
+        return counts
+
+    def run_until_blocked(self, decoded_instructions, registers,
+                          instruction_pointer, inbound_queue, outbound_queue):
+        """
+        Run the decoded instructions until they finish, or until they try to
+        receive from an empty queue, and return the instruction pointer and
+        the number of values sent
+
+        >>> _registers = [0] * 26
+        >>> inbound, outbound = deque([5]), deque()
+        >>> ProgramExtended([]).run_until_blocked(
+        ...     ProgramExtended.from_program_text(
+        ...         "rcv a\\n"
+        ...         "snd a\\n"
+        ...         "mul a 2\\n"
+        ...         "snd a\\n"
+        ...         "rcv b\\n"
+        ...     ).get_decoded_instructions(),
+        ...     _registers, 0, inbound, outbound)
+        (4, 2)
+        >>> _registers[:2], inbound, outbound
+        ([10, 0], deque([]), deque([5, 10]))
+        """
+        outbound_length = len(outbound_queue)
+        instruction_pointer, _ = DUET.run(
+            decoded_instructions, registers, instruction_pointer,
+            inbound=inbound_queue, outbound=outbound_queue)
+        sent_count = len(outbound_queue) - outbound_length
+
+        return instruction_pointer, sent_count
+
     def step_pair_and_stream(self, registers_a=None, registers_b=None,
                              count=None):
         """
@@ -149,6 +257,7 @@ ProgramExtended.instruction_class = InstructionExtended
 @InstructionExtended.override
 class Send(InstructionExtended, part_a.RValueInstruction):
     name = 'snd'
+    op_code = part_a.OP_SND
 
     regex = part_a.RValueInstruction.make_regex(name)
 
@@ -159,6 +268,7 @@ class Send(InstructionExtended, part_a.RValueInstruction):
 @InstructionExtended.override
 class Receive(InstructionExtended, part_a.RegisterInstruction):
     name = 'rcv'
+    op_code = part_a.OP_RCV
 
     regex = part_a.RegisterInstruction.make_regex(name)
 
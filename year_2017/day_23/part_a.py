@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import itertools
+import string
 from abc import ABC
 
 import utils
+from year_2017.day_18 import part_a as part_18_a
 from year_2017.day_18.part_a import RegisterRValueInstruction, \
-    RvalueRValueInstruction, Mul
-from year_2017.day_18.part_b import ProgramExtended, InstructionExtended
+    RvalueRValueInstruction
+from year_2017.day_18.part_b import ProgramExtended, InstructionExtended, \
+    DUET
 
 
 class Challenge(utils.BaseChallenge):
@@ -14,11 +17,59 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         3969
         """
-        return ProgramExtendedTwice.from_program_text(_input)\
-            .step_and_count_instructions().get(Mul, 0)
+        _, op_code_counts = ProgramExtendedTwice\
+            .from_program_text(_input)\
+            .run_fast()
+        return op_code_counts.get(part_18_a.OP_MUL, 0)
+
+
+COPROCESSOR = DUET.extend({
+    'sub': ('vv', "registers[a] -= {b}"),
+    'jnz': ('vv', "if {a}:\n    pc += {b}\n    continue"),
+})
+OP_SUB = COPROCESSOR.op_codes['sub']
+OP_JNZ = COPROCESSOR.op_codes['jnz']
+# `(OP_CALL, superinstruction)`, where the superinstruction is called with
+# the registers and the instruction pointer, and returns the next
+# instruction pointer
+OP_CALL = COPROCESSOR.call_op_code
 
 
 class ProgramExtendedTwice(ProgramExtended):
+    def run_fast(self, initial=None, decoded_instructions=None):
+        """
+        Run the decoded instructions on a list of registers, and return the
+        registers and how many times each op code was executed
+
+        >>> registers, op_code_counts = ProgramExtendedTwice.from_program_text(
+        ...     "set b 3\\n"
+        ...     "set c 4\\n"
+        ...     "mul a c\\n"
+        ...     "sub a -1\\n"
+        ...     "sub b 1\\n"
+        ...     "jnz b -3\\n"
+        ... ).run_fast({'a': 2})
+        >>> registers[:3], op_code_counts
+        ([149, 0, 4], {1: 2, 3: 3, 7: 6, 8: 3})
+        """
+        if initial is None:
+            initial = {}
+        if decoded_instructions is None:
+            decoded_instructions = self.get_decoded_instructions()
+        registers = [0] * len(string.ascii_lowercase)
+        for name, value in initial.items():
+            _, slot = part_18_a.Registers.decode_rvalue(name)
+            registers[slot] = value
+        op_code_counts = [0] * (OP_CALL + 1)
+        COPROCESSOR.run(
+            decoded_instructions, registers, op_code_counts=op_code_counts)
+
+        return registers, {
+            op_code: count
+            for op_code, count in enumerate(op_code_counts)
+            if count
+        }
+
     def step_and_count_instructions(self, registers=None, count=None):
         if count is None:
             steps = itertools.count()
@@ -51,6 +102,7 @@ ProgramExtendedTwice.instruction_class = InstructionExtendedTwice
 @InstructionExtendedTwice.register
 class Sub(InstructionExtendedTwice, RegisterRValueInstruction):
     name = 'sub'
+    op_code = OP_SUB
 
     regex = RegisterRValueInstruction.make_regex(name)
 
@@ -61,6 +113,7 @@ class Sub(InstructionExtendedTwice, RegisterRValueInstruction):
 @InstructionExtendedTwice.register
 class Jgz(RvalueRValueInstruction):
     name = 'jnz'
+    op_code = OP_JNZ
 
     regex = RvalueRValueInstruction.make_regex(name)
 
@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
-import itertools
-import math
-
 import utils
+from year_2017.day_18 import part_a as part_18_a
+from year_2017.day_23 import part_a
 
 
 class Challenge(utils.BaseChallenge):
@@ -11,25 +10,164 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         917
         """
-        return get_prime_count(range(106500, 123500 + 1, 17))
+        program = part_a.ProgramExtendedTwice.from_program_text(_input)
+        registers, _ = program.run_fast(
+            {'a': 1}, get_optimised_instructions(program))
+        _, h_slot = part_18_a.Registers.decode_rvalue('h')
+        return registers[h_slot]
+
+
+def get_optimised_instructions(program):
+    """
+    Decode the instructions, and replace the start of any recognised loops
+    with a superinstruction
+
+    >>> program = part_a.ProgramExtendedTwice.from_program_text(
+    ...     Challenge().input)
+    >>> [decoded[0] for decoded in get_optimised_instructions(program)][7:10]
+    [7, 9, 1]
+    """
+    decoded_instructions = program.get_decoded_instructions()
+    optimised_instructions = list(decoded_instructions)
+    for index in range(len(decoded_instructions)):
+        superinstruction = CompositeCheckSuperinstruction.try_match(
+            decoded_instructions, index)
+        if superinstruction:
+            optimised_instructions[index] = \
+                (part_a.OP_CALL, superinstruction)
+
+    return optimised_instructions
+
+
+class CompositeCheckSuperinstruction:
+    """
+    Replaces the nested loops that check whether `B` is composite, by trying
+    all pairs of factors, with a lookup in a prime sieve. Upper case names
+    in the pattern are registers, that must all be different.
+
+    If `B` is too small for the loops to terminate, it runs the original
+    instruction instead.
+    """
+    pattern = [
+        ('set', 'F', 1),
+        ('set', 'D', 2),
+        ('set', 'E', 2),
+        ('set', 'G', 'D'),
+        ('mul', 'G', 'E'),
+        ('sub', 'G', 'B'),
+        ('jnz', 'G', 2),
+        ('set', 'F', 0),
+        ('sub', 'E', -1),
+        ('set', 'G', 'E'),
+        ('sub', 'G', 'B'),
+        ('jnz', 'G', -8),
+        ('sub', 'D', -1),
+        ('set', 'G', 'D'),
+        ('sub', 'G', 'B'),
+        ('jnz', 'G', -13),
+    ]
+
+    @classmethod
+    def try_match(cls, decoded_instructions, index):
+        bindings = cls.match_pattern(
+            decoded_instructions[index:index + len(cls.pattern)], cls.pattern)
+        if not bindings:
+            return None
 
+        return cls(index, bindings, decoded_instructions[index])
+
+    @classmethod
+    def match_pattern(cls, decoded_instructions, pattern):
+        """
+        >>> CompositeCheckSuperinstruction.match_pattern(
+        ...     part_a.ProgramExtendedTwice.from_program_text(
+        ...         "set g d\\n"
+        ...         "sub g -1\\n"
+        ...     ).get_decoded_instructions(),
+        ...     [('set', 'X', 'Y'), ('sub', 'X', -1)])
+        {'X': 6, 'Y': 3}
+        >>> CompositeCheckSuperinstruction.match_pattern(
+        ...     part_a.ProgramExtendedTwice.from_program_text(
+        ...         "set g d\\n"
+        ...         "sub d -1\\n"
+        ...     ).get_decoded_instructions(),
+        ...     [('set', 'X', 'Y'), ('sub', 'X', -1)])
+        >>> CompositeCheckSuperinstruction.match_pattern(
+        ...     part_a.ProgramExtendedTwice.from_program_text(
+        ...         "set g g\\n"
+        ...     ).get_decoded_instructions(),
+        ...     [('set', 'X', 'Y')])
+        """
+        if len(decoded_instructions) != len(pattern):
+            return None
+        instruction_classes = \
+            part_a.InstructionExtendedTwice.instruction_classes
+        bindings = {}
+        for decoded, (name, *operands) in zip(decoded_instructions, pattern):
+            op_code, x_is_register, x, y_is_register, y = decoded
+            if op_code != instruction_classes[name].op_code:
+                return None
+            for operand, is_register, value \
+                    in zip(operands, (x_is_register, y_is_register), (x, y)):
+                if isinstance(operand, str):
+                    if not is_register:
+                        return None
+                    if bindings.setdefault(operand, value) != value:
+                        return None
+                elif is_register or operand != value:
+                    return None
+        if len(set(bindings.values())) != len(bindings):
+            return None
+
+        return bindings
+
+    def __init__(self, index, bindings, fallback):
+        self.index = index
+        self.bindings = bindings
+        self.fallback = fallback
+
+    def __call__(self, registers, instruction_pointer):
+        """
+        >>> program = part_a.ProgramExtendedTwice.from_program_text(
+        ...     Challenge().input)
+        >>> superinstruction = CompositeCheckSuperinstruction.try_match(
+        ...     program.get_decoded_instructions(), 8)
+        >>> superinstruction.bindings
+        {'F': 5, 'D': 3, 'E': 4, 'G': 6, 'B': 1}
+        >>> def check(b):
+        ...     _registers = [0, b, 0, 0, 0, 0, 0, 0]
+        ...     next_instruction_pointer = superinstruction(_registers, 8)
+        ...     return _registers, next_instruction_pointer
+        >>> check(9)
+        ([0, 9, 0, 9, 9, 0, 0, 0], 24)
+        >>> check(7)
+        ([0, 7, 0, 7, 7, 1, 0, 0], 24)
+        >>> check(2)
+        ([0, 2, 0, 0, 0, 1, 0, 0], 9)
+        """
+        b_value = registers[self.bindings['B']]
+        if b_value <= 2:
+            op_code, _, x, y_is_register, y = self.fallback
+            registers[x] = registers[y] if y_is_register else y
+            return instruction_pointer + 1
 
-def get_prime_count(numbers):
-    return sum(
-        1
-        for number in numbers
-        if not is_prime(number)
-    )
+        registers[self.bindings['F']] = 0 if is_composite(b_value) else 1
+        registers[self.bindings['D']] = b_value
+        registers[self.bindings['E']] = b_value
+        registers[self.bindings['G']] = 0
+        return instruction_pointer + len(self.pattern)
 
 
-def is_prime(number):
-    if number <= 1:
-        return False
-    return all(
-        number % divisor
-        for divisor
-        in itertools.islice(itertools.count(2), int(math.sqrt(number) - 1))
-    )
+def is_composite(number):
+    """
+    >>> [_number for _number in range(2, 20) if is_composite(_number)]
+    [4, 6, 8, 9, 10, 12, 14, 15, 16, 18]
+    """
+    prime_generator = utils.PrimeGenerator()
+    if number >= prime_generator.next_prime:
+        prime_generator.fill_until(
+            max(number, prime_generator.next_prime * 2))
+    return number not in prime_generator.primes_set
 
 
 Challenge.main()
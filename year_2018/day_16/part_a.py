@@ -229,6 +229,21 @@ class ThreeOperandsInstruction(Instruction, ABC):
         value_c = self.do_operation(value_a, value_b)
         return self.set_value(self.op_c, value_c, registers)
 
+    def decode(self):
+        """
+        Get the op code and operands for `ELFCODE`, so that a program can run
+        without checks and without rebuilding the registers on every step
+
+        >>> AddI(0, 5, 3).decode()
+        (1, 0, 5, 3)
+        >>> _registers = [10, 0, 0, 0]
+        >>> ELFCODE.run([AddI(0, 5, 3).decode()], _registers)
+        (1, 1)
+        >>> _registers
+        [10, 0, 0, 15]
+        """
+        return ELFCODE.decode(self.name, (self.op_a, self.op_b, self.op_c))
+
     def do_operation(self, lhs, rhs):
         raise NotImplementedError()
 
@@ -502,5 +517,48 @@ class EqRR(EqualToInstruction):
     op_type_b = Instruction.OP_TYPE_REGISTER
 
 
+ELFCODE = utils.RegisterMachineSpec({
+    'addr': ('rrr', "registers[c] = registers[a] + registers[b]"),
+    'addi': ('rir', "registers[c] = registers[a] + b"),
+    'mulr': ('rrr', "registers[c] = registers[a] * registers[b]"),
+    'muli': ('rir', "registers[c] = registers[a] * b"),
+    'banr': ('rrr', "registers[c] = registers[a] & registers[b]"),
+    'bani': ('rir', "registers[c] = registers[a] & b"),
+    'borr': ('rrr', "registers[c] = registers[a] | registers[b]"),
+    'bori': ('rir', "registers[c] = registers[a] | b"),
+    'setr': ('rir', "registers[c] = registers[a]"),
+    'seti': ('iir', "registers[c] = a"),
+    'gtir': ('irr', "registers[c] = 1 if a > registers[b] else 0"),
+    'gtri': ('rir', "registers[c] = 1 if registers[a] > b else 0"),
+    'gtrr': ('rrr', "registers[c] = 1 if registers[a] > registers[b] else 0"),
+    'eqir': ('irr', "registers[c] = 1 if a == registers[b] else 0"),
+    'eqri': ('rir', "registers[c] = 1 if registers[a] == b else 0"),
+    'eqrr': ('rrr',
+             "registers[c] = 1 if registers[a] == registers[b] else 0"),
+}, register_names=[])
+
+
+def check_operations():
+    """
+    The `ELFCODE` interpreter should agree with the checked instructions
+
+    >>> check_operations()
+    True
+    """
+    registers = (3, 7, 3, 12)
+    for name, instruction_class in Instruction.instruction_classes.items():
+        for a, b in [(0, 1), (1, 0), (0, 2), (2, 3)]:
+            instruction = instruction_class(a, b, 3)
+            expected = instruction.step(registers)
+            actual = list(registers)
+            ELFCODE.run([instruction.decode()], actual)
+            if tuple(actual) != expected:
+                raise Exception(
+                    f"Elfcode {name} with {a}, {b} gave {tuple(actual)} "
+                    f"instead of {expected}")
+
+    return True
+
+
 Challenge.main()
 challenge = Challenge()
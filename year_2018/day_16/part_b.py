@@ -46,12 +46,21 @@ class Program:
 
     def __init__(self, instructions):
         self.instructions = instructions
+        self.decoded_instructions = [
+            instruction.decode()
+            for instruction in instructions
+        ]
 
     def run(self, registers):
-        for instruction in self.instructions:
-            registers = instruction.step(registers)
+        """
+        >>> Program([part_a.SetI(3, 0, 1), part_a.AddR(0, 1, 0)])\\
+        ...     .run((2, 0, 0, 0))
+        (5, 3, 0, 0)
+        """
+        registers = list(registers)
+        part_a.ELFCODE.run(self.decoded_instructions, registers)
 
-        return registers
+        return tuple(registers)
 
 
 class SampleSetExtended(part_a.SampleSet):
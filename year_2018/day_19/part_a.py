@@ -14,7 +14,9 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         2640
         """
-        registers = Program.from_program_text(_input).run(debug=debug)
+        registers = Program.from_program_text(_input)\
+            .optimise()\
+            .run(debug=debug)
         return registers[0]
 
 
@@ -64,10 +66,18 @@ class Program:
         self.instructions = instructions
         self.instruction_pointer_register = instruction_pointer_register
         self.instruction_pointer = instruction_pointer
+        self.decoded_instructions = [
+            instruction.decode()
+            for instruction in instructions
+        ]
+        self.step_count = 0
 
     def run(self, registers=(0,) * 6, instruction_pointer=None, debug=False,
             report_count=1000000, report_only_changes=None):
         """
+        Run the program until it halts. Tracing every step, through
+        `iter_run`, only happens when debugging.
+
         >>> Program.from_program_text(
         ...     "#ip 0\\n"
         ...     "seti 5 0 1\\n"
@@ -80,6 +90,8 @@ class Program:
         ... ).run()
         (6, 5, 6, 0, 0, 9)
         """
+        if not debug:
+            return self.run_fast(registers, instruction_pointer)
         final_registers = registers
         for step, previous_registers, final_registers \
                 in self.iter_run(registers, instruction_pointer):
@@ -88,6 +100,152 @@ class Program:
 
         return final_registers
 
+    def optimise(self):
+        """
+        Replace any recognised loops with superinstructions, that compute the
+        result of the whole loop at once. The tracing `iter_run` still runs the
+        original instructions, and so does a superinstruction that can't
+        handle the registers (eg when X is 0 below).
+
+        >>> _program = Program.from_program_text(
+        ...     "#ip 5\\n"
+        ...     "seti 1 0 1\\n"
+        ...     "mulr 3 1 4\\n"
+        ...     "eqrr 4 2 4\\n"
+        ...     "addr 4 5 5\\n"
+        ...     "addi 5 1 5\\n"
+        ...     "addr 3 0 0\\n"
+        ...     "addi 1 1 1\\n"
+        ...     "gtrr 1 2 4\\n"
+        ...     "addr 5 4 5\\n"
+        ...     "seti 0 7 5\\n"
+        ... )
+        >>> _program.run_fast((0, 0, 12, 3, 0, 0))
+        (3, 13, 12, 3, 1, 9)
+        >>> _program.step_count
+        96
+        >>> _program.optimise().run_fast((0, 0, 12, 3, 0, 0), 0)
+        (3, 13, 12, 3, 1, 9)
+        >>> _program.step_count - 96
+        2
+        >>> _program.step_count = 0
+        >>> _program.run_fast((0, 0, 12, 0, 0, 0), 0)
+        (0, 13, 12, 0, 1, 9)
+        >>> _program.step_count
+        96
+        """
+        decoded_instructions = list(self.decoded_instructions)
+        for index in range(len(self.instructions)):
+            superinstruction = LoopSuperinstruction.try_match_any(
+                self.instructions, index, self.instruction_pointer_register,
+                part_a.ELFCODE.get_instruction_runner(
+                    self.instructions[index].decode()))
+            if superinstruction:
+                decoded_instructions[index] = \
+                    part_a.ELFCODE.call_op_code, superinstruction
+        self.decoded_instructions = decoded_instructions
+
+        return self
+
+    def run_fast(self, registers=(0,) * 6, instruction_pointer=None,
+                 max_step_count=None, stop_address=None):
+        """
+        Run on a mutable list of registers, with the instruction pointer
+        register updated in place. It stops when the program halts, after
+        `max_step_count` steps, or when it reaches the `stop_address`,
+        and the instruction pointer is kept so that it can be resumed.
+
+        >>> _program = Program.from_program_text(
+        ...     "#ip 0\\n"
+        ...     "seti 5 0 1\\n"
+        ...     "seti 6 0 2\\n"
+        ...     "addi 0 1 0\\n"
+        ...     "addr 1 2 3\\n"
+        ...     "setr 1 0 0\\n"
+        ...     "seti 8 0 4\\n"
+        ...     "seti 9 0 5\\n"
+        ... )
+        >>> _program.run_fast(max_step_count=3)
+        (3, 5, 6, 0, 0, 0)
+        >>> _program.instruction_pointer, _program.step_count
+        (4, 3)
+        >>> _program.run_fast((3, 5, 6, 0, 0, 0))
+        (6, 5, 6, 0, 0, 9)
+        >>> _program.instruction_pointer, _program.step_count
+        (7, 5)
+        >>> _program.run_fast(instruction_pointer=0, stop_address=4)
+        (3, 5, 6, 0, 0, 0)
+        >>> _program.instruction_pointer
+        4
+        """
+        if instruction_pointer is not None:
+            self.instruction_pointer = instruction_pointer
+        registers = list(registers)
+        self.instruction_pointer, step_count = part_a.ELFCODE.run(
+            self.decoded_instructions, registers, self.instruction_pointer,
+            max_step_count,
+            instruction_pointer_register=self.instruction_pointer_register,
+            stop_pc=stop_address)
+        self.step_count += step_count
+
+        return tuple(registers)
+
+    def iter_watched_values(self, address, register, registers=(0,) * 6,
+                            instruction_pointer=None):
+        """
+        Run the program, and lazily yield the value of the register every time
+        the address is about to run
+
+        >>> _program = Program.from_program_text(
+        ...     "#ip 0\\n"
+        ...     "seti 0 0 2\\n"
+        ...     "addi 1 3 1\\n"
+        ...     "bani 1 7 1\\n"
+        ...     "seti 0 0 0\\n"
+        ... )
+        >>> list(itertools.islice(_program.iter_watched_values(1, 1), 5))
+        [0, 3, 6, 1, 4]
+        """
+        while True:
+            registers = self.run_fast(
+                registers, instruction_pointer, stop_address=address)
+            instruction_pointer = self.instruction_pointer
+            if instruction_pointer != address:
+                break
+            yield registers[register]
+            registers = self.run_fast(
+                registers, max_step_count=1)
+            instruction_pointer = self.instruction_pointer
+
+    def find_watched_value_repeat(self, address, register,
+                                  registers=(0,) * 6):
+        """
+        Watch the values of the register at the address, and stop at the first
+        value that repeats. Returns the first value, the last distinct value
+        before the repeat, the repeated value, and how many distinct values
+        there were.
+
+        >>> Program.from_program_text(
+        ...     "#ip 0\\n"
+        ...     "seti 0 0 2\\n"
+        ...     "addi 1 3 1\\n"
+        ...     "bani 1 7 1\\n"
+        ...     "seti 0 0 0\\n"
+        ... ).find_watched_value_repeat(2, 1)
+        (3, 8, 3, 8)
+        """
+        seen = utils.CompactIntSet()
+        first_value = None
+        last_value = None
+        for value in self.iter_watched_values(address, register, registers):
+            if first_value is None:
+                first_value = value
+            if not seen.add(value):
+                return first_value, last_value, value, len(seen)
+            last_value = value
+
+        return first_value, last_value, None, len(seen)
+
     def iter_run(self, registers=(0,) * 6, instruction_pointer=None):
         if instruction_pointer is not None:
             self.instruction_pointer = instruction_pointer
@@ -221,6 +379,247 @@ class Program:
         )
 
 
+class LoopSuperinstruction:
+    """
+    A superinstruction replaces a whole loop, that starts with the
+    instructions in its `pattern`. In a pattern upper case names are
+    registers, that must all be different (`IP` is the instruction pointer
+    register), lower case names are constants, and `None` matches anything.
+    Constants in `jump_offsets` must be jumps back to the start of the
+    pattern, plus the offset.
+
+    It is called like a decoded operation, and if it can't handle the
+    registers it runs the original operation instead, so that the loop is
+    interpreted.
+    """
+    pattern = NotImplemented
+    jump_offsets = {}
+
+    superinstruction_classes = []
+
+    COMMUTATIVE_INSTRUCTION_NAMES = {'addr', 'mulr', 'banr', 'borr', 'eqrr'}
+
+    @classmethod
+    def register(cls, superinstruction_class):
+        cls.superinstruction_classes.append(superinstruction_class)
+        return superinstruction_class
+
+    @classmethod
+    def try_match_any(cls, instructions, index, instruction_pointer_register,
+                      fallback):
+        for superinstruction_class in cls.superinstruction_classes:
+            superinstruction = superinstruction_class.try_match(
+                instructions, index, instruction_pointer_register, fallback)
+            if superinstruction:
+                return superinstruction
+
+        return None
+
+    @classmethod
+    def try_match(cls, instructions, index, instruction_pointer_register,
+                  fallback):
+        bindings = cls.match_pattern(
+            instructions[index:index + len(cls.pattern)], cls.pattern,
+            {'IP': instruction_pointer_register})
+        if not bindings:
+            return None
+        for name, offset in cls.jump_offsets.items():
+            if bindings[name] + 1 != index + offset:
+                return None
+
+        return cls(index, bindings, fallback)
+
+    @classmethod
+    def match_pattern(cls, instructions, pattern, bindings):
+        """
+        >>> LoopSuperinstruction.match_pattern(
+        ...     [InstructionExtended.parse("mulr 3 1 4"),
+        ...      InstructionExtended.parse("addr 3 0 0")],
+        ...     [('mulr', 'X', 'Y', 'T'), ('addr', 'Y', 'A', 'A')], {})
+        {'X': 1, 'Y': 3, 'T': 4, 'A': 0}
+        >>> LoopSuperinstruction.match_pattern(
+        ...     [InstructionExtended.parse("mulr 3 1 3")],
+        ...     [('mulr', 'X', 'Y', 'T')], {})
+        """
+        if len(instructions) < len(pattern):
+            return None
+        if not pattern:
+            return bindings
+        instruction, *rest_instructions = instructions
+        (name, *operands), *rest_pattern = pattern
+        if instruction.name != name:
+            return None
+        values = [instruction.op_a, instruction.op_b, instruction.op_c]
+        values_options = [values]
+        if name in cls.COMMUTATIVE_INSTRUCTION_NAMES:
+            values_options.append([values[1], values[0], values[2]])
+        for values in values_options:
+            new_bindings = cls.bind_operands(operands, values, bindings)
+            if new_bindings is None:
+                continue
+            new_bindings = cls.match_pattern(
+                rest_instructions, rest_pattern, new_bindings)
+            if new_bindings is not None:
+                return new_bindings
+
+        return None
+
+    @classmethod
+    def bind_operands(cls, operands, values, bindings):
+        bindings = dict(bindings)
+        for operand, value in zip(operands, values):
+            if operand is None:
+                continue
+            if isinstance(operand, int):
+                if operand != value:
+                    return None
+            elif operand in bindings:
+                if bindings[operand] != value:
+                    return None
+            else:
+                if operand.isupper() and any(
+                        bound_value == value
+                        for bound_name, bound_value in bindings.items()
+                        if bound_name.isupper()):
+                    return None
+                bindings[operand] = value
+
+        return bindings
+
+    def __init__(self, start, bindings, fallback):
+        self.start = start
+        self.bindings = bindings
+        self.fallback = fallback
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.start}, {self.bindings})"
+
+    def __call__(self, registers, pc):
+        if not self.apply(registers):
+            self.fallback(registers, pc)
+
+    def apply(self, registers):
+        """
+        Update the registers, including the instruction pointer register, and
+        return `True`, or return `False` if the loop should be interpreted
+        """
+        raise NotImplementedError()
+
+    def jump_to(self, registers, address):
+        registers[self.bindings['IP']] = address - 1
+
+
+@LoopSuperinstruction.register
+class DivisorSumSuperinstruction(LoopSuperinstruction):
+    """
+    For each X from its current value up to N, for each Y from 1 to N, if X * Y
+    == N add X to A: it adds up all the divisors of N that are at least X
+    """
+    pattern = [
+        ('seti', 1, None, 'Y'),
+        ('mulr', 'X', 'Y', 'T'),
+        ('eqrr', 'T', 'N', 'T'),
+        ('addr', 'T', 'IP', 'IP'),
+        ('addi', 'IP', 1, 'IP'),
+        ('addr', 'X', 'A', 'A'),
+        ('addi', 'Y', 1, 'Y'),
+        ('gtrr', 'Y', 'N', 'T'),
+        ('addr', 'IP', 'T', 'IP'),
+        ('seti', 'inner_loop', None, 'IP'),
+        ('addi', 'X', 1, 'X'),
+        ('gtrr', 'X', 'N', 'T'),
+        ('addr', 'T', 'IP', 'IP'),
+        ('seti', 'outer_loop', None, 'IP'),
+    ]
+    jump_offsets = {'inner_loop': 1, 'outer_loop': 0}
+
+    def apply(self, registers):
+        x_register, y_register, n_register, a_register, t_register = (
+            self.bindings[name] for name in ('X', 'Y', 'N', 'A', 'T'))
+        x, n = registers[x_register], registers[n_register]
+        if x < 1 or n < 1:
+            return False
+        registers[a_register] += sum(
+            divisor
+            for divisor in utils.factorise(n)
+            if divisor >= x
+        )
+        registers[x_register] = max(x, n) + 1
+        registers[y_register] = n + 1
+        registers[t_register] = 1
+        self.jump_to(registers, self.start + len(self.pattern))
+
+        return True
+
+
+@LoopSuperinstruction.register
+class DivisorSearchSuperinstruction(LoopSuperinstruction):
+    """
+    For each Y from its current value up to N, if X * Y == N add X to A
+    """
+    pattern = [
+        ('mulr', 'X', 'Y', 'T'),
+        ('eqrr', 'T', 'N', 'T'),
+        ('addr', 'T', 'IP', 'IP'),
+        ('addi', 'IP', 1, 'IP'),
+        ('addr', 'X', 'A', 'A'),
+        ('addi', 'Y', 1, 'Y'),
+        ('gtrr', 'Y', 'N', 'T'),
+        ('addr', 'IP', 'T', 'IP'),
+        ('seti', 'loop', None, 'IP'),
+    ]
+    jump_offsets = {'loop': 0}
+
+    def apply(self, registers):
+        x_register, y_register, n_register, a_register, t_register = (
+            self.bindings[name] for name in ('X', 'Y', 'N', 'A', 'T'))
+        x, y, n = (
+            registers[x_register], registers[y_register],
+            registers[n_register])
+        if x < 1 or y < 0 or n < 0:
+            return False
+        last_y = max(y, n)
+        if n % x == 0 and y <= n // x <= last_y:
+            registers[a_register] += x
+        registers[y_register] = last_y + 1
+        registers[t_register] = 1
+        self.jump_to(registers, self.start + len(self.pattern))
+
+        return True
+
+
+@LoopSuperinstruction.register
+class DivisionSuperinstruction(LoopSuperinstruction):
+    """
+    Increment Q until (Q + 1) * k > C, which is C // k, and then jump to the
+    exit
+    """
+    pattern = [
+        ('addi', 'Q', 1, 'T'),
+        ('muli', 'T', 'k', 'T'),
+        ('gtrr', 'T', 'C', 'T'),
+        ('addr', 'T', 'IP', 'IP'),
+        ('addi', 'IP', 1, 'IP'),
+        ('seti', 'exit', None, 'IP'),
+        ('addi', 'Q', 1, 'Q'),
+        ('seti', 'loop', None, 'IP'),
+    ]
+    jump_offsets = {'loop': 0}
+
+    def apply(self, registers):
+        q_register, c_register, t_register = (
+            self.bindings[name] for name in ('Q', 'C', 'T'))
+        q, c, k = (
+            registers[q_register], registers[c_register], self.bindings['k'])
+        if q < 0 or c < 0 or k < 1:
+            return False
+        registers[q_register] = max(q, c // k)
+        registers[t_register] = 1
+        self.jump_to(registers, self.bindings['exit'] + 1)
+
+        return True
+
+
 class InstructionExtended(part_a.Instruction, ABC):
     instruction_classes = {}
 
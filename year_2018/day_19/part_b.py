@@ -1,51 +1,22 @@
 #!/usr/bin/env python3
-import functools
-import itertools
-
 import utils
+from year_2018.day_19 import part_a
 
 
 class Challenge(utils.BaseChallenge):
+    part_a_for_testing = part_a
+
     def solve(self, _input, debug=False):
         """
         >>> Challenge().default_solve()
         27024480
         """
-        # Analysing the code it finds adds up all the divisors of 10551432
-        # If we rewrite the instructions as Python code (with goto), and apply
-        # simplifications, it becomes obvious:
-        # a, b, c, d, e = 0, 0, 10551432, 1, 10550400
-        # while d <= c:
-        #     b = 1
-        #     while b <= c:
-        #         if b * d == c:
-        #             a += d
-        #         b += 1
-        #     d += 1
-        return sum(get_divisors(10551432))
-
-
-def get_divisors(number):
-    factors = factorise(number)
-    return {
-        functools.reduce(int.__mul__, parts, 1)
-        for parts_list in (
-            itertools.combinations(factors, count)
-            for count in range(len(factors) + 1)
-        )
-        for parts in parts_list
-    }
-
-
-def factorise(number):
-    """
-    >>> factorise(10551432)
-    [2, 2, 2, 3, 41, 10723]
-    """
-    if number != 10551432:
-        raise ValueError(f"Cannot factorise {number}")
-
-    return [2, 2, 2, 3, 41, 10723]
+        # The program adds up all the divisors of a large number, which the
+        # optimiser recognises and replaces with a superinstruction
+        registers = part_a.Program.from_program_text(_input)\
+            .optimise()\
+            .run((1, 0, 0, 0, 0, 0), debug=debug)
+        return registers[0]
 
 
 Challenge.main()
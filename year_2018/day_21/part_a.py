@@ -9,25 +9,35 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         11592302
         """
-        # By analysing the program, it only terminates when we pass in the
-        # following number as register a
-        return get_acceptable_a()
+        # The program only terminates when register a is equal to a value
+        # that it compares against, so the first such value halts it soonest
+        program = part_a.Program.from_program_text(_input).optimise()
+        return next(program.iter_watched_values(
+            *get_halting_comparison(program)))
 
 
-def get_acceptable_a(start=0):
+def get_halting_comparison(program):
     """
-    >>> get_acceptable_a()
-    11592302
+    Find the address and the register that is compared with register a
+
+    >>> get_halting_comparison(
+    ...     part_a.Program.from_program_text(Challenge().input))
+    (28, 1)
     """
-    c = start | 65536
-    b = 10605201
-    while True:
-        b = (((b + (c & 255)) & 16777215) * 65899) & 16777215
-        if c < 256:
-            break
-        c = c // 256
-
-    return b
+    comparisons = [
+        (address, instruction.op_a if instruction.op_b == 0
+         else instruction.op_b)
+        for address, instruction in enumerate(program.instructions)
+        if instruction.name == 'eqrr' and 0 in (
+            instruction.op_a, instruction.op_b)
+    ]
+    if len(comparisons) != 1:
+        raise Exception(
+            f"Expected a single comparison with register a, but got "
+            f"{len(comparisons)}")
+    comparison, = comparisons
+
+    return comparison
 
 
 class ProgramExtended(part_a.Program):
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import utils
+from year_2018.day_19.part_a import Program
 from year_2018.day_21 import part_a
 
 
@@ -11,19 +12,12 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         313035
         """
-        return get_last_acceptable_a()
-
-
-def get_last_acceptable_a(start=0):
-    value = start
-    previous_value = None
-    seen = set()
-    while value not in seen:
-        seen.add(value)
-        previous_value = value
-        value = part_a.get_acceptable_a(value)
-
-    return previous_value
+        # The values compared with register a eventually repeat, so the last
+        # new value before that halts it after the most instructions
+        program = Program.from_program_text(_input).optimise()
+        _, last_value, _, _ = program.find_watched_value_repeat(
+            *part_a.get_halting_comparison(program))
+        return last_value
 
 
 Challenge.main()
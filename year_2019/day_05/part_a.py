@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import itertools
+from collections import deque, Counter
+
 import utils
 from year_2019.day_02.part_a import parse_program, serialise_program
 
@@ -9,7 +12,7 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         12234644
         """
-        _, output_stream = get_program_result_and_output(_input, [1])
+        _, output_stream = get_machine_result_and_output(_input, [1])
 
         *test_outputs, diagnostic_code = output_stream
         if not test_outputs:
@@ -230,17 +233,21 @@ def handle_input(parameter_modes, program, program_counter, input_stream,
     >>> _program = [3, 0]
     >>> _program, handle_input("", _program, 0, [1], 0, [], 0)
     ([1, 0], (2, 1, 0))
+    >>> handle_input("", [3, 0], 0, [1], 1, [], 0)
+    Traceback (most recent call last):
+    ...
+    year_2019.day_05.part_a.InsufficientInputError: Insufficient input
     """
-    error = InsufficientInputError(
-        program, program_counter, input_stream, input_stream_counter,
-        output_stream, relative_base)
+    instruction_program_counter = program_counter
     program_counter += 1
     (pointer_1, ), _, program, program_counter = get_values(
         1, parameter_modes, program, program_counter, relative_base,
         force_parameter_modes={0: [MODE_POSITION, MODE_RELATIVE]})
 
     if input_stream_counter >= len(input_stream):
-        raise error
+        raise InsufficientInputError(
+            program, instruction_program_counter, input_stream,
+            input_stream_counter, output_stream, relative_base)
 
     program[pointer_1] = input_stream[input_stream_counter]
     input_stream_counter += 1
@@ -338,5 +345,1123 @@ def get_values(count, parameter_modes, program, program_counter, relative_base,
     return pointers, values, program, program_counter
 
 
+STATUS_HALTED = 'halted'
+STATUS_NEEDS_INPUT = 'needs-input'
+STATUS_OUTPUT = 'output'
+
+
+OP_CODE_ADD = 1
+OP_CODE_MULTIPLY = 2
+OP_CODE_INPUT = 3
+OP_CODE_OUTPUT = 4
+OP_CODE_JUMP_IF_TRUE = 5
+OP_CODE_JUMP_IF_FALSE = 6
+OP_CODE_LESS_THAN = 7
+OP_CODE_EQUAL = 8
+OP_CODE_ADJUST_RELATIVE_BASE = 9
+OP_CODE_HALT = 99
+
+
+# For each op code, which parameters are read and which are written to
+OP_CODE_PARAMETERS = {
+    OP_CODE_ADD: 'rrw',
+    OP_CODE_MULTIPLY: 'rrw',
+    OP_CODE_INPUT: 'w',
+    OP_CODE_OUTPUT: 'r',
+    OP_CODE_JUMP_IF_TRUE: 'rr',
+    OP_CODE_JUMP_IF_FALSE: 'rr',
+    OP_CODE_LESS_THAN: 'rrw',
+    OP_CODE_EQUAL: 'rrw',
+    OP_CODE_ADJUST_RELATIVE_BASE: 'r',
+    OP_CODE_HALT: '',
+}
+
+
+OP_CODE_NAMES = {
+    OP_CODE_ADD: 'add',
+    OP_CODE_MULTIPLY: 'mul',
+    OP_CODE_INPUT: 'in',
+    OP_CODE_OUTPUT: 'out',
+    OP_CODE_JUMP_IF_TRUE: 'jnz',
+    OP_CODE_JUMP_IF_FALSE: 'jz',
+    OP_CODE_LESS_THAN: 'lt',
+    OP_CODE_EQUAL: 'eq',
+    OP_CODE_ADJUST_RELATIVE_BASE: 'arb',
+    OP_CODE_HALT: 'halt',
+}
+
+
+def decode_instruction(instruction):
+    """
+    >>> decode_instruction(99)
+    (99, 0, 0, 0)
+    >>> decode_instruction(1)
+    (1, 0, 0, 0)
+    >>> decode_instruction(1001)
+    (1, 0, 1, 0)
+    >>> decode_instruction(11101)
+    (1, 1, 1, 1)
+    >>> decode_instruction(109)
+    (9, 1, 0, 0)
+    >>> decode_instruction(21202)
+    (2, 2, 1, 2)
+    """
+    modes, op_code = divmod(instruction, 100)
+    modes, mode_1 = divmod(modes, 10)
+    mode_3, mode_2 = divmod(modes, 10)
+    return op_code, mode_1, mode_2, mode_3
+
+
+def get_decoded_instructions():
+    """
+    Pre-decode every valid instruction, so that the machine only does a single
+    lookup per step, instead of parsing the modes every time
+
+    >>> _decoded = get_decoded_instructions()
+    >>> _decoded[1001]
+    (1, 0, 1, 0)
+    >>> _decoded[99]
+    (99, 0, 0, 0)
+    >>> 11101 in _decoded
+    False
+    >>> 103 in _decoded
+    False
+    >>> 203 in _decoded
+    True
+    >>> 4 in _decoded, 104 in _decoded, 204 in _decoded
+    (True, True, True)
+    """
+    decoded_instructions = {}
+    for op_code, parameters in OP_CODE_PARAMETERS.items():
+        modes_per_parameter = [
+            (MODE_POSITION, MODE_IMMEDIATE, MODE_RELATIVE)
+            if parameter == 'r' else
+            (MODE_POSITION, MODE_RELATIVE)
+            for parameter in parameters
+        ]
+        for modes in itertools.product(*modes_per_parameter):
+            instruction = op_code + sum(
+                int(mode) * 10 ** (index + 2)
+                for index, mode in enumerate(modes)
+            )
+            decoded_instructions[instruction] = \
+                decode_instruction(instruction)
+
+    return decoded_instructions
+
+
+DECODED_INSTRUCTIONS = get_decoded_instructions()
+
+
+class NegativeAddressError(Exception):
+    def __init__(self, address):
+        super().__init__(address)
+        self.address = address
+
+
+class IntcodeMachine:
+    """
+    An Intcode engine that keeps its memory as a list of ints, and can be paused
+    when it needs input or when it produces output, and resumed in place.
+
+    The plain interpreter doesn't count the instructions it runs, to keep its
+    loop tight: `instruction_count` is only kept when running with a profiler,
+    or translated, where it's counted once per block.
+
+    >>> _machine = IntcodeMachine.from_text("3,9,8,9,10,9,4,9,99,-1,8")
+    >>> _machine.run_until_input()
+    'needs-input'
+    >>> _machine.add_input(8)
+    >>> _machine.run_until_input()
+    'halted'
+    >>> _machine.take_output()
+    [1]
+    >>> _machine = IntcodeMachine.from_text("104,1,104,2,99")
+    >>> _machine.run_until_output(), _machine.take_output()
+    ('output', [1])
+    >>> _machine.run_until_output(), _machine.take_output()
+    ('output', [2])
+    >>> _machine.run_until_output(), _machine.take_output()
+    ('halted', [])
+    """
+
+    @classmethod
+    def from_text(cls, program_text, substitutions=None, input_stream=(),
+                  compiled=False, profiler=None):
+        """
+        If `compiled` is set, it will try to run the program translated to
+        Python, and fall back to the interpreter if it can't. If a `profiler`
+        is passed, it will always interpret, and record every instruction.
+
+        >>> IntcodeMachine.from_text("1,0,0,0,99", {1: 4}).memory
+        [1, 4, 0, 0, 99]
+        >>> IntcodeMachine.from_text("104,1,99", compiled=True)\\
+        ...     .compiled_program is not None
+        True
+        """
+        memory = parse_program(program_text)
+        if substitutions:
+            for position, substitution in substitutions.items():
+                memory[position] = substitution
+        if compiled:
+            compiled_program = CompiledIntcodeProgram.get_for_memory(memory)
+        else:
+            compiled_program = None
+        return cls(
+            memory, input_stream=input_stream,
+            compiled_program=compiled_program, profiler=profiler)
+
+    def __init__(self, memory, program_counter=0, relative_base=0,
+                 input_stream=(), compiled_program=None, profiler=None):
+        self.memory = memory
+        self.program_counter = program_counter
+        self.relative_base = relative_base
+        self.input_stream = deque(input_stream)
+        self.output_stream = []
+        self.halted = False
+        self.instruction_count = 0
+        self.compiled_program = compiled_program
+        self.profiler = profiler
+
+    def fork(self):
+        """
+        Create an independent copy of the machine, so that a search can branch
+        from any state, without replaying the inputs from the start. Intcode
+        memories are only a few thousand ints, so copying the list in one go is
+        cheaper than going through pages on every access.
+
+        >>> _machine = IntcodeMachine.from_text("3,9,1001,9,1,9,4,9,99,0")
+        >>> _machine.run_until_input()
+        'needs-input'
+        >>> _fork = _machine.fork()
+        >>> _machine.add_input(5)
+        >>> _fork.add_input(10)
+        >>> _machine.run_until_input(), _machine.take_output()
+        ('halted', [6])
+        >>> _fork.run_until_input(), _fork.take_output()
+        ('halted', [11])
+        >>> _machine.memory[9], _fork.memory[9]
+        (6, 11)
+        """
+        cls = type(self)
+        machine = cls(
+            list(self.memory), self.program_counter, self.relative_base,
+            input_stream=self.input_stream,
+            compiled_program=self.compiled_program)
+        machine.output_stream = list(self.output_stream)
+        machine.halted = self.halted
+        machine.instruction_count = self.instruction_count
+        return machine
+
+    def serialise(self):
+        """
+        >>> _machine = IntcodeMachine.from_text("1,9,10,3,2,3,11,0,99,30,40,50")
+        >>> _machine.run_until_input()
+        'halted'
+        >>> _machine.serialise()
+        '3500,9,10,70,2,3,11,0,99,30,40,50'
+        """
+        return serialise_program(self.memory)
+
+    def add_input(self, value):
+        self.input_stream.append(value)
+
+    def extend_input(self, values):
+        self.input_stream.extend(values)
+
+    def take_output(self):
+        output_stream = self.output_stream
+        self.output_stream = []
+        return output_stream
+
+    def run_until_input(self):
+        """
+        Run until the machine either halts, or needs input that is not
+        available
+
+        >>> IntcodeMachine.from_text("1101,100,-1,4,0").run_until_input()
+        'halted'
+        >>> IntcodeMachine.from_text("3,0,99").run_until_input()
+        'needs-input'
+        >>> _machine = IntcodeMachine.from_text("2,4,4,5,99,0")
+        >>> _machine.run_until_input(), _machine.memory
+        ('halted', [2, 4, 4, 5, 99, 9801])
+        >>> _machine = IntcodeMachine.from_text("109,4,21101,3,4,7,99")
+        >>> _machine.run_until_input(), _machine.memory
+        ('halted', [109, 4, 21101, 3, 4, 7, 99, 0, 0, 0, 0, 7, 0, 0])
+        >>> IntcodeMachine.from_text("11101,1,1,0,99").run_until_input()
+        Traceback (most recent call last):
+        ...
+        Exception: Unknown instruction 11101 at 0
+        """
+        return self.run(stop_on_output=False)
+
+    def run_until_output(self):
+        """
+        Run until the machine either halts, needs input that is not available,
+        or produces an output
+
+        >>> _machine = IntcodeMachine.from_text(
+        ...     '109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99')
+        >>> _machine.run_until_output(), _machine.output_stream
+        ('output', [109])
+        >>> _machine.run_until_output(), _machine.output_stream
+        ('output', [109, 1])
+        """
+        return self.run(stop_on_output=True)
+
+    def run_compiled(self, stop_on_output):
+        """
+        Run the translated program, and return `fallback` if the rest needs
+        to be interpreted. After a fallback the translation is dropped, as the
+        interpreter might change the code that it was translated from.
+
+        >>> _machine = IntcodeMachine.from_text(
+        ...     "109,4,21101,3,4,7,104,5,99", compiled=True)
+        >>> _machine.run_until_input(), _machine.take_output()
+        ('halted', [5])
+        >>> _machine.memory[:12], _machine.instruction_count
+        ([109, 4, 21101, 3, 4, 7, 104, 5, 99, 0, 0, 7], 4)
+        >>> _machine = IntcodeMachine.from_text(
+        ...     "109,3,21101,2,2,0,99", compiled=True)
+        >>> _machine.run_until_input(), _machine.memory[:7]
+        ('halted', [109, 3, 21101, 4, 2, 0, 99])
+        >>> _machine.compiled_program
+        >>> _machine = IntcodeMachine.from_text(
+        ...     "109,-5,204,0,99", compiled=True)
+        >>> _machine.run_until_input()
+        Traceback (most recent call last):
+        ...
+        Exception: Negative address -5 at 2
+        >>> _machine.compiled_program, _machine.instruction_count
+        (None, 1)
+        """
+        status, self.program_counter, self.relative_base, count = \
+            self.compiled_program.function(
+                self.memory, self.program_counter, self.relative_base,
+                self.input_stream, self.output_stream, stop_on_output)
+        self.instruction_count += count
+        if status == STATUS_HALTED:
+            self.halted = True
+        elif status in (STATUS_FALLBACK, STATUS_CODE_MODIFIED):
+            # The interpreter doesn't guard the code, so the translation can't
+            # be trusted after it has run
+            self.compiled_program = None
+            return STATUS_FALLBACK
+        return status
+
+    def run_profiled(self, stop_on_output):
+        """
+        A slower main loop, that reports every instruction to the profiler. It
+        always interprets, so that every address is accounted for.
+
+        >>> _machine = IntcodeMachine.from_text(
+        ...     "3,9,1001,9,1,9,4,9,99,0", profiler=IntcodeProfiler())
+        >>> _machine.run_until_input()
+        'needs-input'
+        >>> _machine.add_input(5)
+        >>> _machine.run_until_input(), _machine.take_output()
+        ('halted', [6])
+        >>> _machine.instruction_count, _machine.profiler.address_counts
+        (4, Counter({0: 1, 2: 1, 6: 1, 8: 1}))
+        >>> _machine = IntcodeMachine.from_text(
+        ...     "109,4,21101,3,4,7,99", profiler=IntcodeProfiler())
+        >>> _machine.run_until_input(), _machine.memory
+        ('halted', [109, 4, 21101, 3, 4, 7, 99, 0, 0, 0, 0, 7, 0, 0])
+        """
+        profiler = self.profiler
+        memory = self.memory
+        while True:
+            program_counter = self.program_counter
+            if program_counter >= len(memory):
+                memory.extend([0] * len(memory))
+                continue
+            try:
+                decoded = DECODED_INSTRUCTIONS[memory[program_counter]]
+            except KeyError:
+                raise Exception(
+                    f"Unknown instruction {memory[program_counter]} at "
+                    f"{program_counter}")
+            op_code = decoded[0]
+            parameter_count = len(OP_CODE_PARAMETERS[op_code])
+            addresses = []
+            for index, mode in enumerate(decoded[1:1 + parameter_count]):
+                address = program_counter + 1 + index
+                if address >= len(memory):
+                    break
+                if mode == 0:
+                    address = memory[address]
+                elif mode == 2:
+                    address = self.relative_base + memory[address]
+                if address < 0:
+                    raise Exception(
+                        f"Negative address {address} at {program_counter}")
+                if address >= len(memory):
+                    break
+                addresses.append(address)
+            if len(addresses) < parameter_count:
+                memory.extend([0] * len(memory))
+                continue
+
+            if op_code == OP_CODE_INPUT and not self.input_stream:
+                return STATUS_NEEDS_INPUT
+            profiler.record(program_counter, op_code)
+            self.instruction_count += 1
+            self.program_counter += 1 + parameter_count
+            if op_code == OP_CODE_HALT:
+                self.program_counter = program_counter
+                self.halted = True
+                return STATUS_HALTED
+            values = [memory[address] for address in addresses]
+            if op_code == OP_CODE_ADD:
+                memory[addresses[2]] = values[0] + values[1]
+            elif op_code == OP_CODE_MULTIPLY:
+                memory[addresses[2]] = values[0] * values[1]
+            elif op_code == OP_CODE_LESS_THAN:
+                memory[addresses[2]] = 1 if values[0] < values[1] else 0
+            elif op_code == OP_CODE_EQUAL:
+                memory[addresses[2]] = 1 if values[0] == values[1] else 0
+            elif op_code == OP_CODE_INPUT:
+                memory[addresses[0]] = self.input_stream.popleft()
+            elif op_code == OP_CODE_OUTPUT:
+                self.output_stream.append(values[0])
+                if stop_on_output:
+                    return STATUS_OUTPUT
+            elif op_code == OP_CODE_ADJUST_RELATIVE_BASE:
+                self.relative_base += values[0]
+            else:
+                taken = bool(values[0]) == (op_code == OP_CODE_JUMP_IF_TRUE)
+                profiler.record_branch(program_counter, values[1], taken)
+                if taken:
+                    if values[1] < 0:
+                        raise Exception(
+                            f"Negative address {values[1]} at "
+                            f"{program_counter}")
+                    self.program_counter = values[1]
+
+    def run(self, stop_on_output=False):
+        """
+        The main loop: it keeps the state in local variables, and only stores
+        it back when it pauses. If the memory needs to grow, it does so and
+        retries the instruction, as the state only changes at the end of each
+        instruction. Negative addresses are an error, instead of wrapping
+        around to the end of the memory.
+
+        >>> IntcodeMachine.from_text("109,-5,204,0,99").run_until_input()
+        Traceback (most recent call last):
+        ...
+        Exception: Negative address -5 at 2
+        >>> IntcodeMachine.from_text("1,-1,0,0,99").run_until_input()
+        Traceback (most recent call last):
+        ...
+        Exception: Negative address -1 at 0
+        >>> IntcodeMachine.from_text("1105,1,-3,99").run_until_input()
+        Traceback (most recent call last):
+        ...
+        Exception: Negative address -3 at 0
+        """
+        if self.halted:
+            return STATUS_HALTED
+        if self.profiler is not None:
+            return self.run_profiled(stop_on_output)
+        if self.compiled_program is not None:
+            status = self.run_compiled(stop_on_output)
+            if status != STATUS_FALLBACK:
+                return status
+        memory = self.memory
+        program_counter = self.program_counter
+        relative_base = self.relative_base
+        input_stream = self.input_stream
+        output_stream = self.output_stream
+        decoded_instructions = DECODED_INSTRUCTIONS
+
+        while True:
+            try:
+                while True:
+                    op_code, mode_1, mode_2, mode_3 = \
+                        decoded_instructions[memory[program_counter]]
+
+                    if op_code == 99:  # halt
+                        self.program_counter = program_counter
+                        self.relative_base = relative_base
+                        self.halted = True
+                        return STATUS_HALTED
+
+                    value_1 = memory[program_counter + 1]
+                    if op_code == 3:  # input
+                        if not input_stream:
+                            self.program_counter = program_counter
+                            self.relative_base = relative_base
+                            return STATUS_NEEDS_INPUT
+                        if mode_1 == 2:
+                            value_1 += relative_base
+                        if value_1 < 0:
+                            raise NegativeAddressError(value_1)
+                        memory[value_1] = input_stream[0]
+                        input_stream.popleft()
+                        program_counter += 2
+                        continue
+
+                    if mode_1 == 0:
+                        if value_1 < 0:
+                            raise NegativeAddressError(value_1)
+                        value_1 = memory[value_1]
+                    elif mode_1 == 2:
+                        value_1 += relative_base
+                        if value_1 < 0:
+                            raise NegativeAddressError(value_1)
+                        value_1 = memory[value_1]
+
+                    if op_code == 4:  # output
+                        output_stream.append(value_1)
+                        program_counter += 2
+                        if stop_on_output:
+                            self.program_counter = program_counter
+                            self.relative_base = relative_base
+                            return STATUS_OUTPUT
+                        continue
+                    if op_code == 9:  # adjust relative base
+                        relative_base += value_1
+                        program_counter += 2
+                        continue
+
+                    value_2 = memory[program_counter + 2]
+                    if mode_2 == 0:
+                        if value_2 < 0:
+                            raise NegativeAddressError(value_2)
+                        value_2 = memory[value_2]
+                    elif mode_2 == 2:
+                        value_2 += relative_base
+                        if value_2 < 0:
+                            raise NegativeAddressError(value_2)
+                        value_2 = memory[value_2]
+
+                    if op_code == 5:  # jump if true
+                        if value_1:
+                            if value_2 < 0:
+                                raise NegativeAddressError(value_2)
+                            program_counter = value_2
+                        else:
+                            program_counter += 3
+                        continue
+                    if op_code == 6:  # jump if false
+                        if not value_1:
+                            if value_2 < 0:
+                                raise NegativeAddressError(value_2)
+                            program_counter = value_2
+                        else:
+                            program_counter += 3
+                        continue
+
+                    pointer_3 = memory[program_counter + 3]
+                    if mode_3 == 2:
+                        pointer_3 += relative_base
+                    if pointer_3 < 0:
+                        raise NegativeAddressError(pointer_3)
+                    if op_code == 1:  # add
+                        memory[pointer_3] = value_1 + value_2
+                    elif op_code == 2:  # multiply
+                        memory[pointer_3] = value_1 * value_2
+                    elif op_code == 7:  # less than
+                        memory[pointer_3] = 1 if value_1 < value_2 else 0
+                    else:
+                        memory[pointer_3] = 1 if value_1 == value_2 else 0
+                    program_counter += 4
+            except IndexError:
+                memory.extend([0] * len(memory))
+            except NegativeAddressError as e:
+                raise Exception(
+                    f"Negative address {e.address} at {program_counter}")
+            except KeyError:
+                raise Exception(
+                    f"Unknown instruction {memory[program_counter]} at "
+                    f"{program_counter}")
+
+
+class IntcodeProfiler:
+    """
+    Counts how many times each address and each op code runs, and how many
+    times each branch is taken or not. A taken jump backwards is treated as a
+    loop, from its target to the jump.
+
+    >>> _profiler = IntcodeProfiler()
+    >>> _machine = IntcodeMachine.from_text(
+    ...     "1101,0,3,14,1001,14,-1,14,1005,14,4,104,0,99,0",
+    ...     profiler=_profiler)
+    >>> _machine.run_until_input()
+    'halted'
+    >>> _profiler.op_code_counts
+    Counter({1: 4, 5: 3, 4: 1, 99: 1})
+    >>> _profiler.branch_counts
+    {8: [2, 1]}
+    >>> _profiler.get_hot_loops()
+    [(4, 8, 2, 6)]
+    >>> print(_profiler.get_report())
+    9 instructions
+    Op codes: add x4, jnz x3, out x1, halt x1
+    Hottest addresses: 4 x3, 8 x3, 0 x1, 11 x1, 13 x1
+    Branches: 8 taken 2/3
+    Loops: 4-8 x2 (6 instructions)
+    """
+
+    def __init__(self):
+        self.address_counts = Counter()
+        self.op_code_counts = Counter()
+        self.branch_counts = {}
+        self.loop_counts = Counter()
+
+    def record(self, address, op_code):
+        self.address_counts[address] += 1
+        self.op_code_counts[op_code] += 1
+
+    def record_branch(self, address, target, taken):
+        counts = self.branch_counts.setdefault(address, [0, 0])
+        if taken:
+            counts[0] += 1
+            if target <= address:
+                self.loop_counts[(target, address)] += 1
+        else:
+            counts[1] += 1
+
+    def get_hot_loops(self, count=5):
+        """
+        Return the loops that ran the most instructions, as
+        `(start, end, iterations, instruction_count)`
+        """
+        loops = [
+            (start, end, iterations, sum(
+                address_count
+                for address, address_count in self.address_counts.items()
+                if start <= address <= end
+            ))
+            for (start, end), iterations in self.loop_counts.items()
+        ]
+        return sorted(loops, key=lambda loop: loop[3], reverse=True)[:count]
+
+    def get_report(self, count=5):
+        op_codes_str = ", ".join(
+            f"{OP_CODE_NAMES[op_code]} x{op_code_count}"
+            for op_code, op_code_count in self.op_code_counts.most_common()
+        )
+        addresses_str = ", ".join(
+            f"{address} x{address_count}"
+            for address, address_count
+            in self.address_counts.most_common(count)
+        )
+        hottest_branches = sorted(
+            self.branch_counts.items(), key=lambda item: sum(item[1]),
+            reverse=True)[:count]
+        branches_str = ", ".join(
+            f"{address} taken {taken}/{taken + not_taken}"
+            for address, (taken, not_taken) in hottest_branches
+        )
+        loops_str = ", ".join(
+            f"{start}-{end} x{iterations} ({instruction_count} instructions)"
+            for start, end, iterations, instruction_count
+            in self.get_hot_loops(count)
+        )
+        return "\n".join([
+            f"{sum(self.op_code_counts.values())} instructions",
+            f"Op codes: {op_codes_str}",
+            f"Hottest addresses: {addresses_str}",
+            f"Branches: {branches_str}",
+            f"Loops: {loops_str}",
+        ])
+
+
+STATUS_FALLBACK = 'fallback'
+STATUS_CODE_MODIFIED = 'code-modified'
+
+
+def disassemble_program(memory, entry_point=0):
+    """
+    Statically find all the instructions that are reachable from the entry
+    point, by following jumps to constant addresses. The address after an
+    unconditional jump is only considered code if it appears as a constant
+    somewhere, as function calls push their return address like that.
+
+    >>> _instructions, _block_starts = disassemble_program(
+    ...     [3, 9, 1005, 9, 8, 104, 0, 99, 104, 1, 99])
+    >>> sorted(_instructions)
+    [0, 2, 5, 7, 8, 10]
+    >>> sorted(_block_starts)
+    [0, 5, 7, 8, 10]
+    >>> _instructions, _block_starts = disassemble_program(
+    ...     [21101, 7, 0, 0, 1105, 1, 9, 104, 1, 2105, 1, 0])
+    >>> sorted(_instructions)
+    [0, 4, 7, 9]
+    >>> sorted(_block_starts)
+    [0, 7, 9]
+    """
+    instructions = {}
+    block_starts = {entry_point}
+    constants = set()
+    addresses_after_jumps = set()
+    addresses_to_visit = [entry_point]
+    visited = set()
+    while addresses_to_visit:
+        address = addresses_to_visit.pop()
+        visited.add(address)
+        while address not in instructions and 0 <= address < len(memory):
+            decoded = DECODED_INSTRUCTIONS.get(memory[address])
+            if decoded is None:
+                break
+            op_code, mode_1, mode_2, _ = decoded
+            parameter_count = len(OP_CODE_PARAMETERS[op_code])
+            if address + parameter_count >= len(memory):
+                break
+            instructions[address] = decoded
+            constants.update(
+                memory[address + 1 + index]
+                for index, mode in enumerate(decoded[1:1 + parameter_count])
+                if mode == 1
+            )
+            next_address = address + 1 + parameter_count
+            if op_code == OP_CODE_HALT:
+                break
+            if op_code == OP_CODE_INPUT:
+                block_starts.add(address)
+            elif op_code == OP_CODE_OUTPUT:
+                block_starts.add(next_address)
+            elif op_code in (OP_CODE_JUMP_IF_TRUE, OP_CODE_JUMP_IF_FALSE):
+                block_starts.add(next_address)
+                if mode_2 == 1:
+                    target = memory[address + 2]
+                    block_starts.add(target)
+                    addresses_to_visit.append(target)
+                always_jumps = mode_1 == 1 and bool(memory[address + 1]) \
+                    == (op_code == OP_CODE_JUMP_IF_TRUE)
+                if always_jumps:
+                    addresses_after_jumps.add(next_address)
+                    break
+            address = next_address
+        if not addresses_to_visit:
+            addresses_to_visit.extend(
+                (addresses_after_jumps & constants) - visited)
+
+    return instructions, block_starts & set(instructions)
+
+
+class CompiledIntcodeProgram:
+    """
+    An ahead-of-time translation of an Intcode program to a Python function.
+    Each basic block becomes straight-line code, and it continues straight
+    into the blocks that follow it unconditionally. Other jumps go through a
+    bisecting dispatch on the program counter.
+
+    Intcode programs often write to the parameters of their own instructions
+    (eg to index arrays). Those parameters are read from memory when the
+    instruction runs, instead of being baked in. Instructions that are
+    overwritten (eg when their address is used as scratch space after they
+    have run) are checked before they run. Any other write to the code region
+    is detected, and returns `code-modified` so that the machine can fall back
+    to the interpreter. Any jump to an address that was not found
+    statically, or a negative address, also falls back to the interpreter.
+
+    The memory is grown up front to cover the constant addresses. Relative
+    addresses are bounds checked once for each stretch of a block that keeps
+    the same relative base, and pointers that are read from memory are
+    checked before they are used.
+
+    >>> _compiled = CompiledIntcodeProgram.from_memory(
+    ...     parse_program("3,9,8,9,10,9,4,9,99,-1,8"))
+    >>> _memory = parse_program("3,9,8,9,10,9,4,9,99,-1,8")
+    >>> _output = []
+    >>> _compiled.function(_memory, 0, 0, deque(), _output, False)
+    ('needs-input', 0, 0, 0)
+    >>> _compiled.function(_memory, 0, 0, deque([8]), _output, False), _output
+    (('halted', 8, 0, 4), [1])
+    >>> _compiled = CompiledIntcodeProgram.from_memory(
+    ...     parse_program("3,9,1001,9,1,7,104,0,99,0"))
+    >>> _memory = parse_program("3,9,1001,9,1,7,104,0,99,0")
+    >>> _output = []
+    >>> _compiled.function(_memory, 0, 0, deque([4]), _output, False), _output
+    (('halted', 8, 0, 4), [5])
+    >>> CompiledIntcodeProgram.get_for_memory(parse_program("104,1,99")) \\
+    ...     is CompiledIntcodeProgram.get_for_memory(parse_program("104,1,99"))
+    True
+    """
+    cache = {}
+    max_cache_size = 8
+
+    @classmethod
+    def get_for_memory(cls, memory):
+        """
+        Reuse the translation of the same program, keeping only the most
+        recently used ones
+
+        >>> CompiledIntcodeProgram.cache.clear()
+        >>> for _value in range(20):
+        ...     _ = CompiledIntcodeProgram.get_for_memory([104, _value, 99])
+        >>> len(CompiledIntcodeProgram.cache)
+        8
+        >>> sorted(_key[1] for _key in CompiledIntcodeProgram.cache)
+        [12, 13, 14, 15, 16, 17, 18, 19]
+        """
+        key = tuple(memory)
+        compiled = cls.cache.pop(key, None)
+        if compiled is None:
+            compiled = cls.from_memory(memory)
+            if len(cls.cache) >= cls.max_cache_size:
+                del cls.cache[next(iter(cls.cache))]
+        cls.cache[key] = compiled
+        return compiled
+
+    @classmethod
+    def from_memory(cls, memory, max_inlined_instructions=32):
+        instructions, block_starts = disassemble_program(memory)
+        code_addresses = {
+            address + offset
+            for address, (op_code, _, _, _) in instructions.items()
+            for offset in range(1 + len(OP_CODE_PARAMETERS[op_code]))
+        }
+        written_code_addresses = {
+            memory[address + 1 + index]
+            for address, decoded in instructions.items()
+            for index, parameter
+            in enumerate(OP_CODE_PARAMETERS[decoded[0]])
+            if parameter == 'w' and decoded[1 + index] == 0
+        } & code_addresses
+        modified_instructions = written_code_addresses & set(instructions)
+        dynamic_parameters = written_code_addresses - modified_instructions
+        block_starts |= modified_instructions
+        compiler = IntcodeCompiler(
+            memory, instructions, block_starts, dynamic_parameters,
+            modified_instructions, code_addresses - dynamic_parameters,
+            max_inlined_instructions)
+        source = compiler.get_source()
+        namespace = {
+            'CODE_ADDRESSES': frozenset(code_addresses - dynamic_parameters),
+        }
+        exec(compile(source, '<intcode>', 'exec'), namespace)
+        return cls(namespace['run'], frozenset(block_starts), source)
+
+    def __init__(self, function, block_starts, source):
+        self.function = function
+        self.block_starts = block_starts
+        self.source = source
+
+
+class IntcodeCompiler:
+    """
+    Generates the source for `CompiledIntcodeProgram`. The function it creates
+    returns `(status, program_counter, relative_base, instruction_count)`.
+    """
+
+    def __init__(self, memory, instructions, block_starts, dynamic_parameters,
+                 modified_instructions, guarded_addresses,
+                 max_inlined_instructions):
+        self.memory = memory
+        self.instructions = instructions
+        self.block_starts = block_starts
+        self.dynamic_parameters = dynamic_parameters
+        self.modified_instructions = modified_instructions
+        self.code_end = max(guarded_addresses, default=-1) + 1
+        self.max_inlined_instructions = max_inlined_instructions
+        self.lines = []
+
+    def get_source(self):
+        self.lines = []
+        self.emit(0, "def run(memory, pc, rb, input_stream, output_stream, "
+                     "stop_on_output):")
+        self.emit(1, "count = 0")
+        max_static_address = max(self.get_static_pointers(), default=-1)
+        if max_static_address >= 0:
+            self.emit(1, f"if len(memory) <= {max_static_address}:")
+            self.emit(2, f"memory.extend([0] * "
+                         f"({max_static_address + 1} - len(memory)))")
+        self.emit(1, "while True:")
+        self.emit_dispatch(2, sorted(self.block_starts))
+        self.emit(2, f"return {STATUS_FALLBACK!r}, pc, rb, count")
+
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, indent, line):
+        self.lines.append(f"{'    ' * indent}{line}")
+
+    def get_parameter_addresses(self, address, mode):
+        """
+        The addresses of the parameters of the instruction, that have the
+        mode, and are not modified by the program
+        """
+        decoded = self.instructions[address]
+        return [
+            address + 1 + index
+            for index in range(len(OP_CODE_PARAMETERS[decoded[0]]))
+            if decoded[1 + index] == mode
+            and address + 1 + index not in self.dynamic_parameters
+        ]
+
+    def get_static_pointers(self, addresses=None):
+        if addresses is None:
+            addresses = self.instructions
+        return [
+            self.memory[parameter_address]
+            for address in addresses
+            for parameter_address
+            in self.get_parameter_addresses(address, 0)
+        ]
+
+    def emit_fallback(self, indent, state):
+        address, remaining = state
+        self.emit(indent, f"return {STATUS_FALLBACK!r}, {address}, rb, "
+                          f"count - {remaining}")
+
+    def emit_relative_bounds_check(self, indent, block, index):
+        """
+        Check the relative addresses up to, and including, the next
+        instruction that changes the relative base
+        """
+        offsets = []
+        for address in block[index:]:
+            offsets.extend(
+                self.memory[parameter_address]
+                for parameter_address
+                in self.get_parameter_addresses(address, 2)
+            )
+            if self.instructions[address][0] == OP_CODE_ADJUST_RELATIVE_BASE:
+                break
+        if not offsets:
+            return
+        self.emit(indent, f"if rb + {min(offsets)} < 0:")
+        self.emit_fallback(indent + 1, (block[index], len(block) - index))
+        self.emit(indent, f"if rb + {max(offsets)} >= len(memory):")
+        self.emit(indent + 1, f"memory.extend([0] * "
+                              f"(rb + {max(offsets) + 1} - len(memory)))")
+
+    def emit_pointer(self, indent, name, mode, parameter, state):
+        """Check a pointer that is only known when running"""
+        if mode == 0:
+            self.emit(indent, f"{name} = {parameter}")
+        else:
+            self.emit(indent, f"{name} = rb + {parameter}")
+        self.emit(indent, f"if {name} < 0:")
+        self.emit_fallback(indent + 1, state)
+        self.emit(indent, f"if {name} >= len(memory):")
+        self.emit(indent + 1, f"memory.extend([0] * "
+                              f"({name} + 1 - len(memory)))")
+
+    def emit_dispatch(self, indent, starts):
+        if len(starts) <= 3:
+            for start in starts:
+                self.emit(indent, f"if pc == {start}:")
+                self.emit_block(indent + 1, start, {start},
+                                self.max_inlined_instructions)
+            return
+        middle = len(starts) // 2
+        self.emit(indent, f"if pc < {starts[middle]}:")
+        self.emit_dispatch(indent + 1, starts[:middle])
+        self.emit(indent, "else:")
+        self.emit_dispatch(indent + 1, starts[middle:])
+
+    def get_block(self, start):
+        block = []
+        address = start
+        while address in self.instructions:
+            if block and address in self.block_starts:
+                break
+            block.append(address)
+            op_code = self.instructions[address][0]
+            address += 1 + len(OP_CODE_PARAMETERS[op_code])
+            if op_code in (OP_CODE_HALT, OP_CODE_OUTPUT,
+                           OP_CODE_JUMP_IF_TRUE, OP_CODE_JUMP_IF_FALSE):
+                break
+
+        return block, address
+
+    def can_inline(self, address, inlined, budget):
+        if address not in self.block_starts or address in inlined:
+            return False
+        block, _ = self.get_block(address)
+        return 0 < len(block) <= budget
+
+    def emit_continue(self, indent, address, inlined, budget):
+        if self.can_inline(address, inlined, budget):
+            self.emit_block(indent, address, inlined | {address}, budget)
+        elif address in self.block_starts:
+            self.emit(indent, f"pc = {address}")
+            self.emit(indent, "continue")
+        else:
+            self.emit(indent, f"return {STATUS_FALLBACK!r}, {address}, rb, "
+                              f"count")
+
+    def emit_block(self, indent, start, inlined, budget):
+        block, next_address = self.get_block(start)
+        if not block:
+            self.emit(indent, f"return {STATUS_FALLBACK!r}, {start}, rb, "
+                              f"count")
+            return
+        budget -= len(block)
+        if start in self.modified_instructions:
+            self.emit(indent, f"if memory[{start}] != {self.memory[start]}:")
+            self.emit(indent + 1, f"return {STATUS_CODE_MODIFIED!r}, "
+                                  f"{start}, rb, count")
+        if self.instructions[start][0] == OP_CODE_INPUT:
+            self.emit(indent, "if not input_stream:")
+            self.emit(indent + 1, f"return {STATUS_NEEDS_INPUT!r}, {start}, "
+                                  f"rb, count")
+        self.emit(indent, f"count += {len(block)}")
+        for index, address in enumerate(block):
+            remaining = len(block) - index
+            if index == 0 or self.instructions[block[index - 1]][0] \
+                    == OP_CODE_ADJUST_RELATIVE_BASE:
+                self.emit_relative_bounds_check(indent, block, index)
+            if self.emit_instruction(
+                    indent, address, (address, remaining), inlined, budget):
+                return
+        self.emit_continue(indent, next_address, inlined, budget)
+
+    def get_parameter(self, address, index):
+        parameter_address = address + 1 + index
+        if parameter_address in self.dynamic_parameters:
+            return f"memory[{parameter_address}]"
+        return str(self.memory[parameter_address])
+
+    def read(self, indent, address, index, state):
+        mode = self.instructions[address][1 + index]
+        parameter = self.get_parameter(address, index)
+        if mode == 1:
+            return parameter
+        if address + 1 + index in self.dynamic_parameters:
+            pointer = f"pointer_{index + 1}"
+            self.emit_pointer(indent, pointer, mode, parameter, state)
+            return f"memory[{pointer}]"
+        if mode == 0:
+            return f"memory[{parameter}]"
+        return f"memory[rb + {parameter}]"
+
+    def write(self, indent, address, index, expression, state):
+        mode = self.instructions[address][1 + index]
+        parameter = self.get_parameter(address, index)
+        parameter_address = address + 1 + index
+        is_dynamic = parameter_address in self.dynamic_parameters
+        if mode == 0 and not is_dynamic:
+            self.emit(indent, f"memory[{parameter}] = {expression}")
+            return
+        _, remaining = state
+        next_address = parameter_address + 1
+        if is_dynamic:
+            self.emit_pointer(indent, "address", mode, parameter, state)
+        else:
+            self.emit(indent, f"address = rb + {parameter}")
+        self.emit(indent, f"if address < {self.code_end} "
+                          f"and address in CODE_ADDRESSES:")
+        self.emit(indent + 1, f"memory[address] = {expression}")
+        self.emit(indent + 1, f"return {STATUS_CODE_MODIFIED!r}, "
+                              f"{next_address}, rb, count - {remaining - 1}")
+        self.emit(indent, f"memory[address] = {expression}")
+
+    def emit_instruction(self, indent, address, state, inlined, budget):
+        """Return `True` if the instruction changed the flow"""
+        op_code, mode_1, _, _ = self.instructions[address]
+        next_address = address + 1 + len(OP_CODE_PARAMETERS[op_code])
+        if min(self.get_static_pointers([address]), default=0) < 0:
+            self.emit_fallback(indent, state)
+            return True
+        if op_code in (OP_CODE_ADD, OP_CODE_MULTIPLY, OP_CODE_LESS_THAN,
+                       OP_CODE_EQUAL):
+            operand_1 = self.read(indent, address, 0, state)
+            operand_2 = self.read(indent, address, 1, state)
+            expression = {
+                OP_CODE_ADD: f"{operand_1} + {operand_2}",
+                OP_CODE_MULTIPLY: f"{operand_1} * {operand_2}",
+                OP_CODE_LESS_THAN: f"1 if {operand_1} < {operand_2} else 0",
+                OP_CODE_EQUAL: f"1 if {operand_1} == {operand_2} else 0",
+            }[op_code]
+            self.write(indent, address, 2, expression, state)
+        elif op_code == OP_CODE_INPUT:
+            self.write(indent, address, 0, "input_stream[0]", state)
+            self.emit(indent, "input_stream.popleft()")
+        elif op_code == OP_CODE_OUTPUT:
+            self.emit(indent, f"output_stream.append("
+                              f"{self.read(indent, address, 0, state)})")
+            self.emit(indent, "if stop_on_output:")
+            self.emit(indent + 1, f"return {STATUS_OUTPUT!r}, "
+                                  f"{next_address}, rb, count")
+            self.emit_continue(indent, next_address, inlined, budget)
+            return True
+        elif op_code == OP_CODE_ADJUST_RELATIVE_BASE:
+            self.emit(
+                indent, f"rb += {self.read(indent, address, 0, state)}")
+        elif op_code in (OP_CODE_JUMP_IF_TRUE, OP_CODE_JUMP_IF_FALSE):
+            condition = self.read(indent, address, 0, state)
+            if op_code == OP_CODE_JUMP_IF_FALSE:
+                condition = f"not {condition}"
+            target = self.read(indent, address, 1, state)
+            constant_condition = \
+                mode_1 == 1 and address + 1 not in self.dynamic_parameters
+            constant_target = self.instructions[address][2] == 1 \
+                and address + 2 not in self.dynamic_parameters
+            if constant_condition:
+                jumps = bool(self.memory[address + 1]) \
+                    == (op_code == OP_CODE_JUMP_IF_TRUE)
+                if not jumps:
+                    self.emit_continue(indent, next_address, inlined, budget)
+                elif constant_target:
+                    self.emit_continue(
+                        indent, self.memory[address + 2], inlined, budget)
+                else:
+                    self.emit(indent, f"pc = {target}")
+                    self.emit(indent, "continue")
+                return True
+            self.emit(indent, f"if {condition}:")
+            if constant_target:
+                self.emit_continue(
+                    indent + 1, self.memory[address + 2], inlined, 0)
+            else:
+                self.emit(indent + 1, f"pc = {target}")
+                self.emit(indent + 1, "continue")
+            self.emit_continue(indent, next_address, inlined, budget)
+            return True
+        elif op_code == OP_CODE_HALT:
+            self.emit(indent, f"return {STATUS_HALTED!r}, {address}, rb, "
+                              f"count")
+            return True
+        else:
+            raise Exception(f"Unknown op code {op_code}")
+
+        return False
+
+
+def get_machine_result_and_output(program_text, input_stream,
+                                  substitutions=None, error=None,
+                                  compiled=False, profiler=None):
+    """
+    A drop-in replacement for `get_program_result_and_output`, that runs on
+    `IntcodeMachine`
+
+    >>> get_machine_result_and_output("1,9,10,3,2,3,11,0,99,30,40,50", [])
+    (3500, [])
+    >>> get_machine_result_and_output("3,5,4,5,99,255", [60])
+    (3, [60])
+    >>> get_machine_result_and_output("1,0,0,0,99", [], {1: 4})
+    (100, [])
+    >>> try:
+    ...     get_machine_result_and_output("3,0,3,1,4,1,99", [5])
+    ... except InsufficientInputError as e:
+    ...     _error = e
+    >>> get_machine_result_and_output(None, [5, 7], error=_error)
+    (5, [7])
+    >>> get_machine_result_and_output("3,5,4,5,99,255", [60], compiled=True)
+    (3, [60])
+    """
+    if error:
+        machine = IntcodeMachine(
+            error.program, error.program_counter, error.relative_base,
+            input_stream=input_stream[error.input_stream_counter:],
+            profiler=profiler)
+    else:
+        machine = IntcodeMachine.from_text(
+            program_text, substitutions, input_stream=input_stream,
+            compiled=compiled, profiler=profiler)
+    status = machine.run_until_input()
+    if status == STATUS_NEEDS_INPUT:
+        raise InsufficientInputError(
+            machine.memory, machine.program_counter, input_stream,
+            len(input_stream), machine.output_stream, machine.relative_base)
+
+    return machine.memory[0], machine.output_stream
+
+
 Challenge.main()
 challenge = Challenge()
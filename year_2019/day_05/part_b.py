@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 import utils
 
-from year_2019.day_05.part_a import get_program_result_and_output, OP_HANDLERS,\
-    get_values, MODE_POSITION, run_program_extended, MODE_RELATIVE
+from year_2019.day_05.part_a import OP_HANDLERS, get_values, MODE_POSITION, \
+    run_program_extended, MODE_RELATIVE, get_machine_result_and_output
 
 
 class Challenge(utils.BaseChallenge):
@@ -139,9 +139,8 @@ def get_program_result_and_output_extended(
         ',1105,1,46,98,99', [9])[1]
     [1001]
     """
-    return get_program_result_and_output(
-        program_text, input_stream, substitutions=substitutions,
-        op_handlers=OP_HANDLERS_EXTENDED, error=error)
+    return get_machine_result_and_output(
+        program_text, input_stream, substitutions=substitutions, error=error)
 
 
 @register_op_handler_extended(5)
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 import itertools
+from collections import deque
 
 import utils
 
-from year_2019.day_05.part_a import InsufficientInputError
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_02.part_a import parse_program
+from year_2019.day_05.part_a import IntcodeMachine, IntcodeProfiler, \
+    STATUS_HALTED
 
 
 class Challenge(utils.BaseChallenge):
@@ -32,13 +34,15 @@ def get_max_amplifier_chain_result(program_text, phase_inputs=tuple(range(5)),
     65210
     """
     phase_sequences = itertools.permutations(phase_inputs)
+    program = parse_program(program_text)
     return max(
-        get_amplifier_chain_result(program_text, phase_sequence, initial_input)
+        get_amplifier_chain_result(program, phase_sequence, initial_input)
         for phase_sequence in phase_sequences
     )
 
 
-def get_amplifier_chain_result(program_text, phase_sequence, initial_input=0):
+def get_amplifier_chain_result(program_text_or_program, phase_sequence,
+                               initial_input=0):
     """
     >>> get_amplifier_chain_result(\
         '3,15,3,16,1002,16,10,16,1,16,15,15,4,15,99,0,0', [4, 3, 2, 1, 0])
@@ -52,30 +56,136 @@ def get_amplifier_chain_result(program_text, phase_sequence, initial_input=0):
         ',31,31,1,32,31,31,4,31,99,0,0,0', [1, 0, 4, 3, 2])
     65210
     """
-    keep_looping = True
-    inputs = [
-        [phase]
-        for phase in phase_sequence
-    ]
-    errors = [
-        None
-        for _ in phase_sequence
-    ]
-    value = initial_input
-    while keep_looping:
-        keep_looping = False
-        for index, (error, _input) in enumerate(zip(errors, inputs)):
-            _input.append(value)
-            try:
-                _, (value,) = get_program_result_and_output_extended(
-                    program_text, _input, error=error)
-                errors[index] = None
-            except InsufficientInputError as e:
-                errors[index] = e
-                value = e.output_stream[-1]
-                keep_looping = True
-
-    return value
+    chain = AmplifierChain.from_program(
+        program_text_or_program, [[phase] for phase in phase_sequence])
+    chain.send(0, [initial_input])
+    chain.run_until_quiescent()
+
+    return chain.last_output
+
+
+class IntcodeNetwork:
+    """
+    Runs a group of machines that send their output to each other. Only the
+    machines that can make progress are resumed: a machine that is blocked on
+    input is only resumed after something is sent to it.
+
+    If `idle_input` is set, a machine that is blocked on an empty mailbox gets
+    it once, and if it still produces no output it is considered idle, until
+    something is sent to it. The network is quiescent when all machines are
+    either idle or halted.
+
+    Sub-classes need to implement `route_output`, and can override
+    `on_quiescent` to wake up the network. With `profile` set, each machine
+    gets a profiler, so that it counts its instructions.
+
+    >>> class Echo(IntcodeNetwork):
+    ...     received = ()
+    ...     def route_output(self, address, output):
+    ...         if address == 0:
+    ...             self.send(1, output)
+    ...         else:
+    ...             self.received += tuple(output)
+    >>> _network = Echo.from_program(
+    ...     "3,9,1001,9,1,9,4,9,99,0", [[5], []], profile=True)
+    >>> _network.run()
+    >>> _network.received
+    (7,)
+    >>> _network.instruction_counts
+    [4, 4]
+    """
+
+    @classmethod
+    def from_program(cls, program_text_or_program, inputs, idle_input=None,
+                     profile=False):
+        if isinstance(program_text_or_program, str):
+            program = parse_program(program_text_or_program)
+        else:
+            program = program_text_or_program
+        return cls([
+            IntcodeMachine(
+                list(program), input_stream=_input,
+                profiler=IntcodeProfiler() if profile else None)
+            for _input in inputs
+        ], idle_input=idle_input)
+
+    def __init__(self, machines, idle_input=None):
+        self.machines = machines
+        self.idle_input = idle_input
+        self.runnable = deque(range(len(machines)))
+        self.is_runnable = [True] * len(machines)
+        self.stopped = False
+
+    @property
+    def instruction_counts(self):
+        return [machine.instruction_count for machine in self.machines]
+
+    def send(self, address, values):
+        self.machines[address].extend_input(values)
+        self.wake(address)
+
+    def wake(self, address):
+        if not self.is_runnable[address]:
+            self.is_runnable[address] = True
+            self.runnable.append(address)
+
+    def stop(self):
+        self.stopped = True
+
+    def route_output(self, address, output):
+        raise NotImplementedError()
+
+    def on_quiescent(self):
+        """
+        Called when no machine can make progress: return `True` if some
+        machine was woken up and the network should keep running
+        """
+        return False
+
+    def run(self):
+        while not self.stopped:
+            self.run_until_quiescent()
+            if self.stopped or not self.on_quiescent():
+                break
+
+    def run_until_quiescent(self):
+        machines = self.machines
+        runnable = self.runnable
+        is_runnable = self.is_runnable
+        idle_input = self.idle_input
+        while runnable and not self.stopped:
+            address = runnable.popleft()
+            is_runnable[address] = False
+            machine = machines[address]
+            if machine.halted:
+                continue
+            polled = idle_input is not None and not machine.input_stream
+            if polled:
+                machine.add_input(idle_input)
+            status = machine.run_until_input()
+            output = machine.take_output()
+            if output:
+                self.route_output(address, output)
+            if status == STATUS_HALTED or idle_input is None:
+                continue
+            if output or not polled:
+                self.wake(address)
+
+
+class AmplifierChain(IntcodeNetwork):
+    """
+    Each amplifier sends its output to the next one, and the last one back to
+    the first one
+    """
+    last_output = None
+
+    def route_output(self, address, output):
+        last_address = len(self.machines) - 1
+        if address == last_address:
+            self.last_output = output[-1]
+            self.send(0, output)
+        else:
+            self.send(address + 1, output)
 
 
 Challenge.main()
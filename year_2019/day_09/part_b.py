@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 import utils
+from aox.challenge import Debugger
 
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_05.part_a import IntcodeProfiler, \
+    get_machine_result_and_output
 import year_2019.day_09.part_a
 
 
 class Challenge(utils.BaseChallenge):
-    def solve(self, _input, debug=False):
+    def solve(self, _input, debugger: Debugger):
         """
         >>> Challenge().default_solve()
         50894
         """
-        _, output_stream = get_program_result_and_output_extended(_input, [2])
+        if debugger:
+            profiler = IntcodeProfiler()
+        else:
+            profiler = None
+        _, output_stream = get_machine_result_and_output(
+            _input, [2], profiler=profiler)
+        if profiler:
+            debugger.report(profiler.get_report())
 
         coordinates, = output_stream
         return coordinates
@@ -3,8 +3,7 @@ from collections import defaultdict
 
 import utils
 
-from year_2019.day_05.part_a import InsufficientInputError
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_05.part_a import IntcodeMachine, STATUS_HALTED
 
 
 DIRECTION_UP = 'up'
@@ -58,23 +57,16 @@ def paint_panels(program_text, initial_paint=None):
     paint_map = defaultdict(lambda: 0)
     if initial_paint:
         paint_map.update(initial_paint)
-    error = None
-    input_stream = []
+    machine = IntcodeMachine.from_text(program_text)
     while True:
         paint = paint_map[position]
-        input_stream.append(paint)
+        machine.add_input(paint)
         # print(
-        #     f"In {position}, facing {direction}, paint is {paint}, input is "
-        #     f"{input_stream}, counter is "
-        #     f"{error.input_stream_counter if error else 0}")
-        try:
-            _, output = get_program_result_and_output_extended(
-                program_text, input_stream, error=error)
+        #     f"In {position}, facing {direction}, paint is {paint}")
+        if machine.run_until_input() == STATUS_HALTED:
             # print("Finished")
             break
-        except InsufficientInputError as e:
-            error = e
-        new_output = error.output_stream
+        new_output = machine.take_output()
         # print(new_output)
         if len(new_output) != 2:
             raise Exception(
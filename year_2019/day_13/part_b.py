@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 import utils
 
-from year_2019.day_05.part_a import InsufficientInputError
-from year_2019.day_05.part_b import get_program_result_and_output_extended
-from year_2019.day_12.part_a import sign
+from utils import sign
+from year_2019.day_05.part_a import IntcodeMachine, STATUS_HALTED
 from year_2019.day_13.part_a import fill_game, TILE_EMPTY, TILE_WALL,\
     TILE_BLOCK, TILE_PADDLE, TILE_BALL
 
@@ -24,20 +23,14 @@ class Challenge(utils.BaseChallenge):
 def play_game(program_text=None, interactive=False):
     if program_text is None:
         program_text = Challenge().input
-    error = None
-    input_stream = []
+    machine = IntcodeMachine.from_text(program_text, substitutions={0: 2})
     game = {}
     while True:
-        try:
-            _, output = get_program_result_and_output_extended(
-                program_text, input_stream, substitutions={0: 2}, error=error)
-            fill_game(output, game)
+        status = machine.run_until_input()
+        fill_game(machine.take_output(), game)
+        if status == STATUS_HALTED:
             # print("Finished")
             break
-        except InsufficientInputError as e:
-            error = e
-        new_output = error.output_stream
-        fill_game(new_output, game)
         tiles_positions = get_game_tile_positions(game)
         paddle_position, _ = tiles_positions[TILE_PADDLE]
         ball_position, _ = tiles_positions[TILE_BALL]
@@ -66,7 +59,7 @@ def play_game(program_text=None, interactive=False):
                 paddle_input = int(user_input)
         else:
             paddle_input = suggestion
-        input_stream.append(paddle_input)
+        machine.add_input(paddle_input)
 
     return game
 
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
+from collections import deque
+
 import click
 
 import utils
-from year_2019.day_05.part_a import InsufficientInputError
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_05.part_a import IntcodeMachine, STATUS_HALTED
 
 
 class Challenge(utils.BaseChallenge):
@@ -12,7 +13,7 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         236
         """
-        return get_minimum_distance_to_oxygen(play_game(_input))
+        return get_minimum_distance_to_oxygen(explore_game(_input))
 
     def play(self):
         _game = play_game(interactive=True)
@@ -25,28 +26,36 @@ class Challenge(utils.BaseChallenge):
             print("Couldn't discover everything")
 
 
-def run_interactive_program(program_text, endless=False):
-    error = None
-    input_stream = []
+def run_interactive_program(program_text, endless=False, compiled=False,
+                            profiler=None):
+    """
+    A coroutine that runs the program until it needs input, and yields the
+    output so far. The machine is paused and resumed in place, without
+    restarting the program.
+
+    >>> _program = run_interactive_program("3,9,1001,9,1,9,4,9,99,0")
+    >>> _program.send(None)
+    (False, [])
+    >>> _program.send(5)
+    (True, [6])
+    """
+    machine = IntcodeMachine.from_text(
+        program_text, compiled=compiled, profiler=profiler)
 
     while True:
-        try:
-            _, output = get_program_result_and_output_extended(
-                program_text, input_stream, error=error)
+        if machine.run_until_input() == STATUS_HALTED:
             if endless:
                 raise Exception("Endless interactive program exited")
-            yield True, output
+            yield True, machine.take_output()
             break
-        except InsufficientInputError as e:
-            error = e
 
-        next_input_or_inputs = yield False, error.output_stream
+        next_input_or_inputs = yield False, machine.take_output()
         if isinstance(next_input_or_inputs, int):
             next_input = next_input_or_inputs
-            next_inputs = [next_input]
+            machine.add_input(next_input)
         else:
             next_inputs = next_input_or_inputs
-        input_stream.extend(next_inputs)
+            machine.extend_input(next_inputs)
 
 
 def run_interactive_game(program_text):
@@ -162,6 +171,31 @@ def play_game(program_text=None, interactive=False):
     return game
 
 
+def explore_game(program_text):
+    """
+    Discover the whole map with a BFS, by forking the droid at every position
+    it reaches, instead of walking a single droid back and forth
+    """
+    game = fill_game(None, None, False, game=None)
+    queue = deque([((0, 0), IntcodeMachine.from_text(program_text))])
+    while queue:
+        position, machine = queue.popleft()
+        machine.run_until_input()
+        for command in COMMANDS_MOVE:
+            next_position = apply_offset(position, command)
+            if next_position in game["map"]:
+                continue
+            next_machine = machine.fork()
+            next_machine.add_input(command)
+            next_machine.run_until_input()
+            game["position"] = position
+            fill_game(command, next_machine.take_output(), True, game=game)
+            if game["position"] == next_position:
+                queue.append((next_position, next_machine))
+
+    return game
+
+
 def get_neighbour_positions(position):
     neighbour_positions = [
         (apply_offset(position, move_command), move_command)
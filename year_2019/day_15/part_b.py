@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import utils
 
-from year_2019.day_15.part_a import get_minimum_distances, play_game
+from year_2019.day_15.part_a import get_minimum_distances, explore_game
 
 
 class Challenge(utils.BaseChallenge):
@@ -10,7 +10,7 @@ class Challenge(utils.BaseChallenge):
         >>> Challenge().default_solve()
         368
         """
-        game = play_game(_input)
+        game = explore_game(_input)
         minimum_distances = get_minimum_distances(game, game["oxygen_location"])
         return max(minimum_distances.values())
 
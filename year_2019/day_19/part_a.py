@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
+from concurrent.futures import ProcessPoolExecutor
+
 import utils
 
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_02.part_a import parse_program
+from year_2019.day_05.part_a import IntcodeMachine, \
+    CompiledIntcodeProgram, get_machine_result_and_output
 import year_2019.day_09.part_a
 
 
@@ -16,7 +20,16 @@ class Challenge(utils.BaseChallenge):
         return sum(point for line in scan for point in line)
 
 
-def scan_area(program_text, width_or_xs, height_or_ys):
+def scan_area(program_text, width_or_xs, height_or_ys, workers=None):
+    """
+    >>> print(show_scan(scan_area(Challenge().input, 6, 6)))
+    100000
+    000000
+    000000
+    000000
+    000100
+    000010
+    """
     if isinstance(width_or_xs, int):
         width = width_or_xs
         xs = range(width)
@@ -27,22 +40,82 @@ def scan_area(program_text, width_or_xs, height_or_ys):
         ys = range(height)
     else:
         ys = height_or_ys
+    xs = list(xs)
+    points = [(x, y) for y in ys for x in xs]
+    values = BeamProbe(program_text).probe_many(points, workers=workers)
     return [
-        [
-            get_scan_point(program_text, x, y)
-            for x in xs
-        ]
-        for y in ys
+        values[start:start + len(xs)]
+        for start in range(0, len(values), len(xs))
     ]
 
 
 def get_scan_point(program_text, x, y):
-    _, output = get_program_result_and_output_extended(program_text, [x, y])
+    _, output = get_machine_result_and_output(
+        program_text, [x, y], compiled=True)
     point, = output
 
     return point
 
 
+class BeamProbe:
+    """
+    Probes the tractor beam by parsing and translating the program once, and
+    running each query on a fresh copy of the pristine memory
+
+    >>> _probe = BeamProbe(Challenge().input)
+    >>> _probe.probe(0, 0), _probe.probe(1, 0)
+    (1, 0)
+    >>> _probe.probe_many([(0, 0), (1, 0)])
+    [1, 0]
+    """
+
+    def __init__(self, program_text):
+        self.program_text = program_text
+        self.memory = parse_program(program_text)
+        self.compiled_program = \
+            CompiledIntcodeProgram.get_for_memory(self.memory)
+
+    def probe(self, x, y):
+        machine = IntcodeMachine(
+            list(self.memory), input_stream=[x, y],
+            compiled_program=self.compiled_program)
+        machine.run_until_input()
+        point, = machine.output_stream
+
+        return point
+
+    def probe_many(self, points, workers=None, chunk_size=500):
+        """
+        Probe all the points, optionally across a pool of `workers`
+        processes, each of which parses and translates the program once
+        """
+        if not workers:
+            return [self.probe(x, y) for x, y in points]
+
+        chunks = [
+            points[start:start + chunk_size]
+            for start in range(0, len(points), chunk_size)
+        ]
+        with ProcessPoolExecutor(workers) as executor:
+            chunk_values = executor.map(
+                probe_points, [self.program_text] * len(chunks), chunks)
+            return [
+                value
+                for values in chunk_values
+                for value in values
+            ]
+
+
+def probe_points(program_text, points):
+    """
+    Probe a chunk of points in a worker
+
+    >>> probe_points(Challenge().input, [(0, 0), (3, 4), (4, 4), (4, 5)])
+    [1, 1, 0, 1]
+    """
+    return BeamProbe(program_text).probe_many(points)
+
+
 def show_scan(scan):
     return "\n".join(
         "".join(
@@ -4,7 +4,7 @@ from typing import Iterable
 
 import utils
 
-from year_2019.day_19.part_a import get_scan_point
+from year_2019.day_19.part_a import BeamProbe
 
 
 class Challenge(utils.BaseChallenge):
@@ -14,7 +14,7 @@ class Challenge(utils.BaseChallenge):
         7621042
         """
         scan = DynamicScan(_input)
-        common_corner = find_square(scan, 100, 100, 2000)
+        common_corner = find_square_by_edges(scan, 100, 2000)
         if not common_corner:
             raise Exception("Could not find common corner")
 
@@ -24,6 +24,84 @@ class Challenge(utils.BaseChallenge):
         return solution
 
 
+def find_square_by_edges(scan, size, count):
+    """
+    Follow the left edge of the beam, one probe or so per row, and check if
+    the top-right corner of a square with its bottom-left corner on the edge
+    is also in the beam. The rows near the origin can have gaps, so a row is
+    scanned across the whole width of the area until the edge is found, and
+    the edge is only tracked from the rows that have it.
+
+    >>> find_square_by_edges(DictScan.from_print(
+    ...     "#.........................................\\n"
+    ...     ".#........................................\\n"
+    ...     "..##......................................\\n"
+    ...     "...###....................................\\n"
+    ...     "....###...................................\\n"
+    ...     ".....####.................................\\n"
+    ...     "......#####...............................\\n"
+    ...     "......######..............................\\n"
+    ...     ".......#######............................\\n"
+    ...     "........########..........................\\n"
+    ...     ".........#########........................\\n"
+    ...     "..........#########.......................\\n"
+    ...     "...........##########.....................\\n"
+    ...     "...........############...................\\n"
+    ...     "............############..................\\n"
+    ...     ".............#############................\\n"
+    ...     "..............##############..............\\n"
+    ...     "...............###############............\\n"
+    ...     "................###############...........\\n"
+    ...     "................#################.........\\n"
+    ...     ".................##################.......\\n"
+    ...     "..................##################......\\n"
+    ...     "...................###################....\\n"
+    ...     "....................####################..\\n"
+    ...     ".....................###################..\\n"
+    ...     ".....................###################..\\n"
+    ...     "......................##################..\\n"
+    ...     ".......................#################..\\n"
+    ...     "........................################..\\n"
+    ...     ".........................###############..\\n"
+    ...     "..........................##############..\\n"
+    ...     "..........................##############..\\n"
+    ...     "...........................#############..\\n"
+    ...     "............................############..\\n"
+    ...     ".............................###########..\\n"
+    ... ), 10, 34)
+    (25, 20)
+    >>> find_square_by_edges(DictScan.from_print(
+    ...     "#.........\\n"
+    ...     "..........\\n"
+    ...     "..........\\n"
+    ...     ".....#....\\n"
+    ...     "......##..\\n"
+    ...     "......###.\\n"
+    ...     ".......###\\n"
+    ... ), 2, 7)
+    (6, 4)
+    >>> find_square_by_edges(DictScan.from_print(
+    ...     "#.........\\n"
+    ...     "..........\\n"
+    ...     "..........\\n"
+    ...     ".....#....\\n"
+    ... ), 2, 4)
+    """
+    start_x = 0
+    for y in range(count):
+        for x in range(start_x, count):
+            if scan[(x, y)]:
+                start_x = x
+                break
+        else:
+            continue
+        top_y = y - size + 1
+        if top_y >= 0 and scan[(start_x + size - 1, top_y)]:
+            return start_x, top_y
+
+    return None
+
+
 def find_square(scan, width, height, count):
     """
     >>> find_square(DictScan.from_print(
@@ -360,10 +438,10 @@ class DictScan(Scan):
 
 class DynamicScan(Scan):
     def __init__(self, program_text):
-        self.program_text = program_text
+        self.probe = BeamProbe(program_text)
 
     def get_scan_point(self, x, y):
-        return get_scan_point(self.program_text, x, y)
+        return self.probe.probe(x, y)
 
 
 Challenge.main()
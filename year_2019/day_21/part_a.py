@@ -3,7 +3,7 @@ from abc import ABC
 
 import utils
 
-from year_2019.day_05.part_b import get_program_result_and_output_extended
+from year_2019.day_05.part_a import get_machine_result_and_output
 import year_2019.day_09.part_a
 
 
@@ -18,8 +18,8 @@ class Challenge(utils.BaseChallenge):
 
 def run_spring_robot(script, program_text, running=False):
     input_stream = script.as_input_stream(running=running)
-    _, output = get_program_result_and_output_extended(
-        program_text, input_stream)
+    _, output = get_machine_result_and_output(
+        program_text, input_stream, compiled=True)
     if not output:
         raise Exception("No output")
     if output[-1] <= 255:
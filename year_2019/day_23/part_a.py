@@ -1,66 +1,56 @@
 #!/usr/bin/env python3
-from collections import defaultdict
-
 import utils
+from aox.challenge import Debugger
 
-from year_2019.day_15.part_a import run_interactive_program
-import year_2019.day_09.part_a
+from year_2019.day_07.part_a import IntcodeNetwork
 
 
 class Challenge(utils.BaseChallenge):
-    def solve(self, _input, debug=False):
+    def solve(self, _input, debugger: Debugger):
         """
         >>> Challenge().default_solve()
         15969
         """
-        return run_network(_input, manage_output_first_to_255)
-
+        return run_network(_input, Network, debugger=debugger)
 
-def run_network(_input, manage_output_func):
-    computers = [
-        run_interactive_program(_input, endless=True)
-        for _ in range(50)
-    ]
 
-    queues = defaultdict(list)
+def run_network(_input, network_class, count=50,
+                debugger: Debugger = Debugger(enabled=False)):
+    network = network_class.from_program(
+        _input, [[address] for address in range(count)], idle_input=-1,
+        profile=bool(debugger))
+    network.run()
+    debugger.default_report_if(
+        f"Instruction counts: {network.instruction_counts}")
 
-    for address, computer in enumerate(computers):
-        _, first_output = computer.send(None)
-        manage_output_func(address, first_output, queues)
-        _, second_output = computer.send(address)
-        manage_output_func(address, second_output, queues)
+    if network.result is None:
+        raise Exception("Got empty result")
 
-    finished, result = False, None
-    while not finished:
-        for address, computer in enumerate(computers):
-            queue = queues[address]
-            if queue:
-                next_input = queue.pop(0)
-            else:
-                next_input = -1
-            _, computer_output = computer.send(next_input)
-            finished, result = manage_output_func(
-                address, computer_output, queues)
-            if finished:
-                break
+    return network.result
 
-    if result is None:
-        raise Exception("Got empty result")
 
-    return result
+class Network(IntcodeNetwork):
+    """
+    Computers send each other packets of (x, y), and stop at the first packet
+    sent to 255
+    """
+    NAT_ADDRESS = 255
 
+    result = None
 
-def manage_output_first_to_255(from_address, output, queues):
-    if not output:
-        return False, None
-    # print(from_address, output)
-    while output:
-        (to_address, x, y), output = output[:3], output[3:]
-        if to_address == 255:
-            return True, y
-        queues[to_address].append((x, y))
+    def route_output(self, address, output):
+        for index in range(0, len(output), 3):
+            to_address, x, y = output[index:index + 3]
+            if to_address == self.NAT_ADDRESS:
+                self.handle_nat_packet(x, y)
+                if self.stopped:
+                    break
+            else:
+                self.send(to_address, (x, y))
 
-    return False, None
+    def handle_nat_packet(self, x, y):
+        self.result = y
+        self.stop()
 
 
 Challenge.main()
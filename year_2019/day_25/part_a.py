@@ -2,18 +2,26 @@
 import itertools
 
 import utils
+from aox.challenge import Debugger
 
+from year_2019.day_05.part_a import IntcodeProfiler
 from year_2019.day_15.part_a import run_interactive_program
 import year_2019.day_09.part_a
 
 
 class Challenge(utils.BaseChallenge):
-    def solve(self, _input, debug=False):
+    def solve(self, _input, debugger: Debugger):
         """
         >>> Challenge().default_solve()
         8401920
         """
-        password = play_game(_input)
+        if debugger:
+            profiler = IntcodeProfiler()
+        else:
+            profiler = None
+        password = play_game(_input, profiler=profiler)
+        if profiler:
+            debugger.report(profiler.get_report())
         if not password:
             raise Exception("Could not find password")
 
@@ -23,7 +31,7 @@ class Challenge(utils.BaseChallenge):
         play_game(self.input, interactive=True)
 
 
-def play_game(program_text, interactive=False):
+def play_game(program_text, interactive=False, profiler=None):
     if interactive:
         interactive_print = print
     else:
@@ -44,7 +52,8 @@ def play_game(program_text, interactive=False):
         "too_heavy": set(),
     }
 
-    program = run_interactive_program(program_text)
+    program = run_interactive_program(
+        program_text, compiled=True, profiler=profiler)
     last_room_name = None
     last_input_text = None
     _, output = program.send(None)
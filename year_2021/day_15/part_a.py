@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 from dataclasses import dataclass
 from itertools import chain
-from typing import Generic, List, Union, Type, Iterable, Dict
+from typing import Generic, List, Union, Type, Iterable, Dict, Tuple
 
 from aox.challenge import Debugger
 from utils import BaseChallenge, Point2D, TV, get_type_argument_class, \
-    min_and_max_tuples
+    min_and_max_tuples, dijkstra
 
 
 class Challenge(BaseChallenge):
@@ -172,40 +172,28 @@ class CavernMeasurer(Generic[CavernMeasurerStateT]):
     def measure_distances(
         self, debugger: Debugger = Debugger(enabled=False),
     ) -> None:
-        while debugger.step_if(self.stack):
-            should_report = debugger.should_report()
-            debugger.default_report_if(
-                f"Seen {len(self.distances)}, {len(self.stack)} in stack, "
-                f"target risk is {self.distances.get(self.target)}"
-            )
-            if should_report:
-                debugger.report(str(self))
-            state = self.stack.pop(0)
-            if state.distance > self.distances[state.position]:
-                continue
+        state_class = self.get_state_class()
+        target = self.target
 
+        def get_next_positions(
+            position: Point2D,
+        ) -> Iterable[Tuple[Point2D, int]]:
+            # noinspection PyArgumentList
+            state = state_class(position=position, distance=0)
             for next_state in state.get_next_states(self):
-                self.visit_state(next_state)
+                yield next_state.position, next_state.distance
+
+        result = dijkstra(
+            [state.position for state in self.stack],
+            get_next_positions,
+            is_target=lambda position: position == target,
+            debugger=debugger,
+        )
+        self.distances.update(result.distances)
+        self.stack = []
         if debugger.enabled:
             debugger.report(str(self))
 
-    def visit_state(self, state: CavernMeasurerStateT) -> bool:
-        if not self.visit_for_distance(state):
-            return False
-
-        self.stack.append(state)
-
-        return True
-
-    def visit_for_distance(self, state: CavernMeasurerStateT) -> bool:
-        if state.position in self.distances \
-                and state.distance >= self.distances[state.position]:
-            return False
-
-        self.distances[state.position] = state.distance
-
-        return True
-
 
 @dataclass
 class CavernMeasurerState:
@@ -1,11 +1,10 @@
 #!/usr/bin/env python3
 import re
 from operator import add, mul, mod
-from pathlib import Path
 from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, iterable_length, product
+from utils import BaseChallenge, product
 
 
 class Challenge(BaseChallenge):
@@ -14,37 +13,347 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         53999995829399
         """
-        return find_maximum_valid_input(debugger=debugger)
+        return find_valid_input(_input, maximise=True, debugger=debugger)
 
 
 InputList = List[int]
 State = List[int]
+# The divisor of `z`, the offset that the input is checked against, and the
+# offset that is added to the input, in each block
+MonadParameters = Tuple[int, int, int]
+# `(name, register, value_is_register, register_or_value)`
+AluInstruction = Tuple[str, int, bool, int]
+
+
+def find_valid_input(
+    program_text: str, maximise: bool,
+    debugger: Debugger = Debugger(enabled=False),
+) -> int:
+    """
+    Solve the digit constraints directly, if the program has the standard
+    MONAD blocks, otherwise search for the input
+
+    >>> find_valid_input(Challenge().input, maximise=True)
+    53999995829399
+    >>> find_valid_input(Challenge().input, maximise=False)
+    11721151118175
+    >>> find_valid_input("inp w\\nadd z w\\ninp w\\nmul z -1\\nadd z w",
+    ...                  maximise=False)
+    11
+    """
+    parameters = parse_monad_parameters(program_text)
+    valid_input = None
+    if parameters is not None:
+        valid_input = solve_monad_constraints(parameters, maximise)
+    if valid_input is None:
+        if debugger:
+            debugger.default_report(
+                "Program is not a standard MONAD, searching instead")
+        if maximise:
+            digits = range(9, 0, -1)
+        else:
+            digits = range(1, 10)
+        valid_input = search_valid_input(
+            parse_alu_blocks(program_text), digits, debugger=debugger)
+    if valid_input is None:
+        raise Exception("Could not find a valid input")
+
+    return valid_input
+
+
+MONAD_BLOCK_TEMPLATE = [
+    "inp w",
+    "mul x 0",
+    "add x z",
+    "mod x 26",
+    "div z {}",
+    "add x {}",
+    "eql x w",
+    "eql x 0",
+    "mul y 0",
+    "add y 25",
+    "mul y x",
+    "add y 1",
+    "mul z y",
+    "mul y 0",
+    "add y w",
+    "add y {}",
+    "mul y x",
+    "add z y",
+]
+
+
+def parse_monad_parameters(
+    program_text: str,
+) -> Optional[List[MonadParameters]]:
+    """
+    >>> parse_monad_parameters(Challenge().input)[:6]
+    [(1, 15, 13), (1, 10, 16), (1, 12, 2), (1, 10, 8), (1, 14, 11),
+        (26, -11, 6)]
+    >>> parse_monad_parameters("inp w\\nadd z w")
+    """
+    lines = list(filter(None, map(str.strip, program_text.splitlines())))
+    block_length = len(MONAD_BLOCK_TEMPLATE)
+    if not lines or len(lines) % block_length:
+        return None
+    parameters = []
+    for start in range(0, len(lines), block_length):
+        values = []
+        block_lines = lines[start:start + block_length]
+        for line, template_line in zip(block_lines, MONAD_BLOCK_TEMPLATE):
+            if "{}" not in template_line:
+                if line != template_line:
+                    return None
+                continue
+            prefix = template_line[:-len("{}")]
+            if not line.startswith(prefix):
+                return None
+            try:
+                values.append(int(line[len(prefix):]))
+            except ValueError:
+                return None
+        divisor, check_offset, add_offset = values
+        parameters.append((divisor, check_offset, add_offset))
+
+    return parameters
+
+
+def solve_monad_constraints(
+    parameters: List[MonadParameters], maximise: bool,
+) -> Optional[int]:
+    """
+    Each block either pushes `input + add_offset` as a base-26 digit of `z`,
+    or pops the last one, and pushes again unless `input` matches it plus
+    `check_offset`. For `z` to end up 0 every pop must match, which pairs up
+    the inputs, and each pair can be solved independently.
+
+    >>> solve_monad_constraints([(1, 10, 3), (26, -5, 0)], maximise=True)
+    97
+    >>> solve_monad_constraints([(1, 10, 3), (26, -5, 0)], maximise=False)
+    31
+    >>> solve_monad_constraints([(1, 10, 3), (26, -15, 0)], maximise=True)
+    >>> solve_monad_constraints([(1, 5, 3), (26, -5, 0)], maximise=True)
+    >>> solve_monad_constraints([(1, 10, 3), (1, 10, 3)], maximise=True)
+    """
+    digits: List[Optional[int]] = [None] * len(parameters)
+    stack: List[Tuple[int, int]] = []
+    for index, (divisor, check_offset, add_offset) in enumerate(parameters):
+        if divisor == 1:
+            # The pushed value must be a base-26 digit, and the check must
+            # never pass, since there is nothing to compare against
+            if not (0 <= add_offset and 9 + add_offset < 26) \
+                    or 1 <= check_offset + 25 and check_offset <= 9:
+                return None
+            stack.append((index, add_offset))
+        elif divisor == 26:
+            if not stack:
+                return None
+            push_index, push_add_offset = stack.pop()
+            difference = push_add_offset + check_offset
+            if maximise:
+                push_digit = min(9, 9 - difference)
+            else:
+                push_digit = max(1, 1 - difference)
+            digit = push_digit + difference
+            if not (1 <= push_digit <= 9 and 1 <= digit <= 9):
+                return None
+            digits[push_index] = push_digit
+            digits[index] = digit
+        else:
+            return None
+    if stack:
+        return None
+
+    return int("".join(map(str, digits)))
+
+
+ALU_REGISTERS = "wxyz"
+
+
+def parse_alu_blocks(program_text: str) -> List[List[AluInstruction]]:
+    """
+    >>> parse_alu_blocks("inp w\\nadd z w\\ninp x\\nmul z -1")
+    [[('inp', 0, False, 0), ('add', 3, True, 0)],
+        [('inp', 1, False, 0), ('mul', 3, False, -1)]]
+    """
+    blocks: List[List[AluInstruction]] = []
+    for line in filter(None, map(str.strip, program_text.splitlines())):
+        name, register_name, *rest = line.split()
+        register = ALU_REGISTERS.index(register_name)
+        if rest:
+            argument, = rest
+            if argument in ALU_REGISTERS:
+                instruction = \
+                    (name, register, True, ALU_REGISTERS.index(argument))
+            else:
+                instruction = (name, register, False, int(argument))
+        else:
+            instruction = (name, register, False, 0)
+        if name == "inp":
+            blocks.append([])
+        elif not blocks:
+            raise Exception("Expected the program to start with 'inp'")
+        blocks[-1].append(instruction)
+
+    return blocks
+
+
+def get_live_registers(blocks: List[List[AluInstruction]]) -> List[List[int]]:
+    """
+    Find which registers each block's behaviour depends on, either because it
+    reads them before writing them, or because a later block does, and they
+    pass through. `z` is always live at the end.
+
+    >>> get_live_registers(parse_alu_blocks(Challenge().input))[:2]
+    [[3], [3]]
+    >>> get_live_registers(parse_alu_blocks(
+    ...     "inp w\\nadd y w\\ninp w\\nadd z y\\nmul x 0\\nadd z x"))
+    [[2, 3], [2, 3]]
+    """
+    live = {ALU_REGISTERS.index("z")}
+    live_per_block = []
+    for block in reversed(blocks):
+        read_first = set()
+        written = set()
+        for name, register, value_is_register, value in block:
+            if name == "inp" or (name == "mul" and not value_is_register
+                                 and value == 0):
+                written.add(register)
+                continue
+            if register not in written:
+                read_first.add(register)
+            if value_is_register and value not in written:
+                read_first.add(value)
+            written.add(register)
+        live = read_first | (live - written)
+        live_per_block.append(sorted(live))
+
+    return list(reversed(live_per_block))
+
+
+def run_alu_block(
+    block: List[AluInstruction], registers: Tuple[int, ...], digit: int,
+) -> Tuple[int, ...]:
+    """
+    >>> run_alu_block(parse_alu_blocks(Challenge().input)[0], (0, 0, 0, 0), 9)
+    (9, 1, 22, 22)
+    >>> run_alu_block(parse_alu_blocks("inp w\\ndiv w -2\\nmod z 3")[0],
+    ...               (0, 0, 0, -7), 7)
+    (-3, 0, 0, 2)
+    """
+    values = list(registers)
+    for name, register, value_is_register, value in block:
+        if value_is_register:
+            value = values[value]
+        if name == "inp":
+            values[register] = digit
+        elif name == "add":
+            values[register] += value
+        elif name == "mul":
+            values[register] *= value
+        elif name == "div":
+            quotient = abs(values[register]) // abs(value)
+            if (values[register] < 0) != (value < 0):
+                quotient = -quotient
+            values[register] = quotient
+        elif name == "mod":
+            values[register] %= value
+        elif name == "eql":
+            values[register] = 1 if values[register] == value else 0
+        else:
+            raise Exception(f"Unknown instruction '{name}'")
+
+    return tuple(values)
+
+
+def search_valid_input(
+    blocks: List[List[AluInstruction]], digits: Iterable[int],
+    debugger: Debugger = Debugger(enabled=False),
+) -> Optional[int]:
+    """
+    Search depth-first for the first valid input, in the order of `digits`,
+    remembering which states, made up of just the live registers, before
+    each block cannot lead to a valid input
+
+    >>> blocks = parse_alu_blocks(
+    ...     "inp w\\nadd z w\\ninp w\\nmul z -1\\nadd z w")
+    >>> search_valid_input(blocks, range(9, 0, -1))
+    99
+    >>> search_valid_input(blocks, range(1, 10))
+    11
+    >>> search_valid_input(parse_alu_blocks(
+    ...     "inp w\\nadd z w\\ninp w\\nadd z w\\nmod z 2\\nadd z 1"),
+    ...     range(1, 10))
+    """
+    digits = list(digits)
+    live_registers = get_live_registers(blocks)
+    dead_states = set()
+
+    def search(index: int, registers: Tuple[int, ...]) -> Optional[InputList]:
+        if index == len(blocks):
+            if registers[ALU_REGISTERS.index("z")] == 0:
+                return []
+            return None
+        state = (index, tuple(
+            registers[register]
+            for register in live_registers[index]
+        ))
+        if state in dead_states:
+            return None
+        for digit in digits:
+            rest = search(index + 1, run_alu_block(
+                blocks[index], registers, digit))
+            if rest is not None:
+                return [digit] + rest
+        dead_states.add(state)
+        if debugger.should_report():
+            debugger.default_report(
+                f"{len(dead_states)} dead states, at block {index}")
+        return None
+
+    valid_input = search(0, (0, 0, 0, 0))
+    if valid_input is None:
+        return None
+
+    return int("".join(map(str, valid_input)))
 
 
 def find_maximum_valid_input(
+    parameters: List[MonadParameters],
     debugger: Debugger = Debugger(enabled=False),
 ) -> int:
-    return find_first_valid_input(range(9, 0, -1), debugger=debugger)
+    return find_first_valid_input(
+        parameters, range(9, 0, -1), debugger=debugger)
 
 
 def find_first_valid_input(
-    digits: Iterable[int], debugger: Debugger = Debugger(enabled=False),
+    parameters: List[MonadParameters], digits: Iterable[int],
+    debugger: Debugger = Debugger(enabled=False),
 ) -> int:
+    divisors = [divisor for divisor, _, _ in parameters]
+    max_states = [
+        product(divisors[index + 1:])
+        for index in range(len(divisors))
+    ]
+
     def get_next_chains(
         _chains: Iterable[Tuple[InputList, int]], _index: int,
     ) -> Iterable[Tuple[InputList, int]]:
         for previous_inputs, previous_state in debugger.stepping(_chains):
             if debugger.should_report():
+                state = run_program_optimised(
+                    parameters, previous_inputs, True)
+                state_list = run_program_optimised_list(
+                    parameters, previous_inputs, True)
                 debugger.default_report(
                     f"Looking at {''.join(map(str, previous_inputs))}, giving "
-                    f"{run_program_optimised(previous_inputs, True)}/"
-                    f"{run_program_optimised_list(previous_inputs, True)}",
+                    f"{state}/{state_list}",
                 )
             for next_input in digits:
                 state = get_program_optimised_state(
-                    previous_state, _index, next_input,
+                    parameters, previous_state, _index, next_input,
                 )
-                if state >= AAC[_index]:
+                if state >= max_states[_index]:
                     continue
                 yield previous_inputs + [next_input], state
 
@@ -52,7 +361,7 @@ def find_first_valid_input(
         ([], 0)
         for _ in range(1)
     )
-    for index in range(14):
+    for index in range(len(parameters)):
         chains = get_next_chains(chains, index)
 
     valid_inputs = (
@@ -63,26 +372,21 @@ def find_first_valid_input(
 
     valid_input = next(iter(valid_inputs), None)
     if valid_input is None:
-        raise Exception(f"Could not a valid input")
+        raise Exception("Could not find a valid input")
 
     return int("".join(map(str, valid_input)))
 
 
-AA = [1, 1, 1, 1, 1, 26, 1, 26, 26, 1, 26, 26, 26, 26]
-AAC = [product(AA[i + 1:]) for i in range(len(AA))]
-AA2 = [a == 26 for a in AA]
-AA2C = [iterable_length(filter(None, AA2[i + 1:])) for i in range(len(AA2))]
-BB = [15, 10, 12, 10, 14, -11, 10, -16, -9, 11, -8, -8, -10, -9]
-CC = [13, 16, 2, 8, 11, 6, 12, 2, 2, 15, 1, 10, 14, 10]
-
-
 def run_program_optimised_list(
-    inp: List[int], allow_partial_input: bool = False,
+    parameters: List[MonadParameters], inp: List[int],
+    allow_partial_input: bool = False,
 ) -> List[int]:
     """
-    >>> run_program_optimised_list([9] * 14)
+    >>> _parameters = parse_monad_parameters(Challenge().input)
+    >>> run_program_optimised_list(_parameters, [9] * 14)
     [22, 25, 11, 17, 19]
-    >>> run_program_optimised_list([5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    >>> run_program_optimised_list(
+    ...     _parameters, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     []
     """
     if not allow_partial_input:
@@ -90,33 +394,38 @@ def run_program_optimised_list(
 
     state = []
     for i in range(len(inp)):
-        state = get_program_optimised_list_state(state, i, inp[i])
+        state = get_program_optimised_list_state(parameters, state, i, inp[i])
 
     return state
 
 
 def get_program_optimised_list_state(
-    previous: List[int], index: int, next_input: int,
+    parameters: List[MonadParameters], previous: List[int], index: int,
+    next_input: int,
 ) -> List[int]:
+    divisor, check_offset, add_offset = parameters[index]
     zz = list(previous)
-    must_match = (zz[-1] if zz else 0) + BB[index]
-    if AA2[index]:
+    must_match = (zz[-1] if zz else 0) + check_offset
+    if divisor == 26:
         if zz:
             zz.pop()
     if next_input != must_match:
-        zz.append(next_input + CC[index])
+        zz.append(next_input + add_offset)
         if zz == [0]:
             zz = []
     return zz
 
 
 def run_program_optimised(
-    inp: List[int], allow_partial_input: bool = False,
+    parameters: List[MonadParameters], inp: List[int],
+    allow_partial_input: bool = False,
 ) -> int:
     """
-    >>> run_program_optimised([9] * 14)
+    >>> _parameters = parse_monad_parameters(Challenge().input)
+    >>> run_program_optimised(_parameters, [9] * 14)
     10500769
-    >>> run_program_optimised([5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    >>> run_program_optimised(
+    ...     _parameters, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     0
     """
     if not allow_partial_input:
@@ -124,19 +433,21 @@ def run_program_optimised(
 
     state = 0
     for i in range(len(inp)):
-        state = get_program_optimised_state(state, i, inp[i])
+        state = get_program_optimised_state(parameters, state, i, inp[i])
 
     return state
 
 
 def get_program_optimised_state(
-    previous: int, index: int, next_input: int,
+    parameters: List[MonadParameters], previous: int, index: int,
+    next_input: int,
 ) -> int:
+    divisor, check_offset, add_offset = parameters[index]
     z = previous
-    must_match = z % 26 + BB[index]
-    z //= AA[index]
+    must_match = z % 26 + check_offset
+    z //= divisor
     if next_input != must_match:
-        z = z * 26 + next_input + CC[index]
+        z = z * 26 + next_input + add_offset
 
     return z
 
@@ -160,28 +471,31 @@ def check_input(inp: List[int]) -> None:
 
 
 def run_program_loop_python_simplified(
-    inp: List[int], allow_partial_input: bool = False,
+    parameters: List[MonadParameters], inp: List[int],
+    allow_partial_input: bool = False,
 ) -> int:
     """
-    >>> run_program_loop_python_simplified([9] * 14)
+    >>> _parameters = parse_monad_parameters(Challenge().input)
+    >>> run_program_loop_python_simplified(_parameters, [9] * 14)
     10500769
     >>> run_program_loop_python_simplified(
-    ...     [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    ...     _parameters, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     0
     """
     if not allow_partial_input:
         check_input(inp)
 
-    _, variables = run_raw_program_loop_python_simplified(inp)
+    _, variables = run_raw_program_loop_python_simplified(parameters, inp)
 
     return variables["z"]
 
 
 def run_raw_program_loop_python_simplified(
-    inputs: List[int],
+    parameters: List[MonadParameters], inputs: List[int],
 ) -> Tuple[bool, Dict[str, int]]:
     """
-    >>> run_raw_program_loop_python_simplified([9] * 14)
+    >>> run_raw_program_loop_python_simplified(
+    ...     parse_monad_parameters(Challenge().input), [9] * 14)
     (True, {'x': 1, 'y': 19, 'z': 10500769, 'w': 9, ...})
     """
     vs: Dict[str, int]
@@ -191,9 +505,13 @@ def run_raw_program_loop_python_simplified(
         "a": None, "b": None, "c": None,
     }
 
-    iterable_inputs_and_abc = iter(zip(inputs, AA, BB, CC))
+    iterable_inputs_and_abc = (
+        (_input, divisor, check_offset, add_offset)
+        for _input, (divisor, check_offset, add_offset)
+        in zip(inputs, parameters)
+    )
 
-    for _ in range(14):
+    for _ in range(len(parameters)):
         try:
             vs["w"], vs["a"], vs["b"], vs["c"] = next(iterable_inputs_and_abc)
         except StopIteration:
@@ -217,27 +535,31 @@ def run_raw_program_loop_python_simplified(
 
 
 def run_program_loop_python(
-    inp: List[int], allow_partial_input: bool = False,
+    parameters: List[MonadParameters], inp: List[int],
+    allow_partial_input: bool = False,
 ) -> int:
     """
-    >>> run_program_loop_python([9] * 14)
+    >>> _parameters = parse_monad_parameters(Challenge().input)
+    >>> run_program_loop_python(_parameters, [9] * 14)
     10500769
-    >>> run_program_loop_python([5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    >>> run_program_loop_python(
+    ...     _parameters, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     0
     """
     if not allow_partial_input:
         check_input(inp)
 
-    _, variables = run_raw_program_loop_python(inp)
+    _, variables = run_raw_program_loop_python(parameters, inp)
 
     return variables["z"]
 
 
 def run_raw_program_loop_python(
-    inputs: List[int],
+    parameters: List[MonadParameters], inputs: List[int],
 ) -> Tuple[bool, Dict[str, int]]:
     """
-    >>> run_raw_program_loop_python([9] * 14)
+    >>> run_raw_program_loop_python(
+    ...     parse_monad_parameters(Challenge().input), [9] * 14)
     (True, {'x': 1, 'y': 19, 'z': 10500769, 'w': 9, ...})
     """
     vs = variables = {
@@ -245,9 +567,13 @@ def run_raw_program_loop_python(
         "a": None, "b": None, "c": None,
     }
 
-    iterable_inputs_and_abc = iter(zip(inputs, AA, BB, CC))
+    iterable_inputs_and_abc = (
+        (_input, divisor, check_offset, add_offset)
+        for _input, (divisor, check_offset, add_offset)
+        in zip(inputs, parameters)
+    )
 
-    for _ in range(14):
+    for _ in range(len(parameters)):
         try:
             vs["w"], vs["a"], vs["b"], vs["c"] = next(iterable_inputs_and_abc)
         except StopIteration:
@@ -275,25 +601,31 @@ def run_raw_program_loop_python(
 
 
 def run_program_loop(
-    inp: List[int], allow_partial_input: bool = False,
+    parameters: List[MonadParameters], inp: List[int],
+    allow_partial_input: bool = False,
 ) -> int:
     """
-    >>> run_program_loop([9] * 14)
+    >>> _parameters = parse_monad_parameters(Challenge().input)
+    >>> run_program_loop(_parameters, [9] * 14)
     10500769
-    >>> run_program_loop([5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    >>> run_program_loop(
+    ...     _parameters, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     0
     """
     if not allow_partial_input:
         check_input(inp)
 
-    _, variables = run_raw_program_loop(inp)
+    _, variables = run_raw_program_loop(parameters, inp)
 
     return variables["z"]
 
 
-def run_raw_program_loop(inputs: List[int]) -> Tuple[bool, Dict[str, int]]:
+def run_raw_program_loop(
+    parameters: List[MonadParameters], inputs: List[int],
+) -> Tuple[bool, Dict[str, int]]:
     """
-    >>> run_raw_program_loop([9] * 14)
+    >>> run_raw_program_loop(
+    ...     parse_monad_parameters(Challenge().input), [9] * 14)
     (True, {'x': 1, 'y': 19, 'z': 10500769, 'w': 9, ...})
     """
     program_text = """
@@ -321,7 +653,11 @@ def run_raw_program_loop(inputs: List[int]) -> Tuple[bool, Dict[str, int]]:
         "a": None, "b": None, "c": None,
     }
 
-    iterable_inputs_and_abc = iter(zip(inputs, AA, BB, CC))
+    iterable_inputs_and_abc = (
+        (_input, divisor, check_offset, add_offset)
+        for _input, (divisor, check_offset, add_offset)
+        in zip(inputs, parameters)
+    )
 
     # noinspection DuplicatedCode
     def make_parser(
@@ -398,7 +734,7 @@ def run_raw_program_loop(inputs: List[int]) -> Tuple[bool, Dict[str, int]]:
     ]
 
     # noinspection DuplicatedCode
-    for _ in range(14):
+    for _ in range(len(parameters)):
         # noinspection DuplicatedCode
         lines = filter(None, map(str.strip, program_text.splitlines()))
         for line in lines:
@@ -416,26 +752,28 @@ def run_raw_program_loop(inputs: List[int]) -> Tuple[bool, Dict[str, int]]:
 
 
 def run_program(
-    inp: List[int], allow_partial_input: bool = False,
+    program_text: str, inp: List[int], allow_partial_input: bool = False,
 ) -> int:
     """
-    >>> run_program([5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
+    >>> run_program(
+    ...     Challenge().input, [5, 3, 9, 9, 9, 9, 9, 5, 8, 2, 9, 3, 9, 9])
     0
     """
     if not allow_partial_input:
         check_input(inp)
 
-    _, variables = run_raw_program(inp)
+    _, variables = run_raw_program(program_text, inp)
 
     return variables["z"]
 
 
-def run_raw_program(inputs: List[int]) -> Tuple[bool, Dict[str, int]]:
+def run_raw_program(
+    program_text: str, inputs: List[int],
+) -> Tuple[bool, Dict[str, int]]:
     """
-    >>> run_raw_program([9] * 14)
+    >>> run_raw_program(Challenge().input, [9] * 14)
     (True, {'x': 1, 'y': 19, 'z': 10500769, 'w': 9})
     """
-    program_text = (Path(__file__).parent / 'input.txt').read_text()
     variables = {"x": 0, "y": 0, "z": 0, "w": 0}
 
     iterable_inputs = iter(inputs)
@@ -3,7 +3,7 @@ from typing import Union
 
 from aox.challenge import Debugger
 from utils import BaseChallenge
-from year_2021.day_24.part_a import find_first_valid_input
+from year_2021.day_24.part_a import find_valid_input
 
 
 class Challenge(BaseChallenge):
@@ -12,13 +12,7 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         11721151118175
         """
-        return find_minimum_valid_input(debugger=debugger)
-
-
-def find_minimum_valid_input(
-    debugger: Debugger = Debugger(enabled=False),
-) -> int:
-    return find_first_valid_input(range(1, 9), debugger=debugger)
+        return find_valid_input(_input, maximise=False, debugger=debugger)
 
 
 Challenge.main()
@@ -5,7 +5,7 @@ from itertools import groupby
 from typing import ClassVar, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, min_and_max_tuples
+from utils import BaseChallenge, Point2D, min_and_max_tuples, bfs
 
 
 class Challenge(BaseChallenge):
@@ -199,30 +199,37 @@ class Valley:
         """
         if target is None:
             target = Point2D(self.width -  2, self.height - 1)
-        queue: List[Tuple[List[Optional[Direction]], Valley]] = [([], self)]
-        seen_by_step_count: Dict[int, Set[Point2D]] = {0: {self.position}}
-        just_blizzards_cache: Dict[int, Valley] = {}
-        while debugger.step_if(queue):
-            path, valley = queue.pop(0)
-            step_count = len(path)
-            if step_count not in just_blizzards_cache:
-                just_blizzards_cache[step_count] = valley.step_blizzards()
-            for direction, next_valley in valley.get_next_moves(just_blizzards=just_blizzards_cache[step_count]):
-                next_path = path + [direction]
-                if next_valley.position == target:
-                    return next_path, next_valley
-                seen = seen_by_step_count.setdefault(len(next_path), set())
-                if next_valley.position in seen:
-                    continue
-                seen.add(next_valley.position)
-                queue.append((next_path, next_valley))
-            if debugger.should_report():
-                debugger.default_report_if(
-                    f"Seen {sum(map(len, seen_by_step_count.values()))} valleys, "
-                    f"{len(queue)} remaining, "
-                    f"{step_count} current path length",
-                )
-        raise Exception("Could not find exit")
+        blizzards_by_step_count: List[Valley] = [self]
+
+        def get_next_states(state: Tuple[int, Point2D]) -> Iterable[Tuple[int, Point2D]]:
+            step_count, position = state
+            if step_count + 1 == len(blizzards_by_step_count):
+                blizzards_by_step_count.append(blizzards_by_step_count[-1].step_blizzards())
+            valley = blizzards_by_step_count[step_count].move_to(position)
+            for _, next_valley in valley.get_next_moves(just_blizzards=blizzards_by_step_count[step_count + 1]):
+                yield step_count + 1, next_valley.position
+
+        result = bfs(
+            [(0, self.position)],
+            get_next_states,
+            is_target=lambda state: state[1] == target,
+            debugger=debugger,
+        )
+        if result.target is None:
+            raise Exception("Could not find exit")
+        direction_by_offset = {
+            offset: direction
+            for direction, offset in Blizzard.OFFSET_BY_DIRECTION.items()
+        }
+        positions = [position for _, position in result.get_path()]
+        path = [
+            direction_by_offset[next_position.difference(position)]
+            if next_position != position else
+            None
+            for position, next_position in zip(positions, positions[1:])
+        ]
+        end_step_count, end_position = result.target
+        return path, blizzards_by_step_count[end_step_count].move_to(end_position)
 
     def get_next_moves(self, just_blizzards: Optional["Valley"]=None) -> Iterable[Tuple[Optional[Direction], "Valley"]]:
         """
@@ -185,17 +185,17 @@ class Pool:
         ... ''')
         >>> _path = _pool.find_minimum_heat_loss_path()[0]
         >>> print(_pool.show_with_path(_path))
-        2>13432311323
-        3v>>>53535623
-        3255v>>654254
-        344658v>>5452
-        45466578v7536
-        14385987v>454
-        445787698v766
-        363787797v653
-        465496798v>87
-        4564679986v53
-        1224686865v>3
+        2>>34^>>>1323
+        32v>>>35v5623
+        32552456v>>54
+        3446585845v52
+        4546657867v>6
+        14385987984v4
+        44578769877v6
+        36378779796v>
+        465496798688v
+        456467998645v
+        12246868655<v
         25465488877v5
         43226746555v>
         """
@@ -333,42 +333,37 @@ class PoolSearch:
         25465488877v5
         43226746555v>
         """
-        best_heat_loss = self.best_heat_loss
-        target = self.target
-        max_heat_loss = self.max_heat_loss
-        best_state = self.best_state
-
-        stack: List[SearchState] = SearchState.initial_for_pool_and_point(self.pool, self.start)
-        best_heat_loss.update({
-            state.key: 0
-            for state in stack
-        })
-        while debugger.step_if(stack):
-            state = stack.pop(0)
-            next_states = state.get_next_states()
-            for next_state in next_states:
-                heat_loss = next_state.get_heat_loss(best_heat_loss)
-                if heat_loss >= max_heat_loss:
-                    continue
-                if heat_loss >= best_heat_loss.get(next_state.key, heat_loss + 1):
-                    continue
-                best_heat_loss[next_state.key] = heat_loss
-                if next_state.position == target:
-                    if heat_loss < max_heat_loss:
-                        max_heat_loss = heat_loss
-                        best_state = next_state
-                    continue
-                stack.append(next_state)
-            if debugger.should_report():
-                debugger.default_report_if(
-                    f"{len(stack)} items left, "
-                    f"{len(best_heat_loss)} visited, "
-                    f"{max_heat_loss if best_state else 'No'} best heat loss"
-                )
-        self.max_heat_loss = max_heat_loss
-        self.best_state = best_state
+        result = utils.dijkstra(
+            [state.key for state in SearchState.initial_for_pool_and_point(self.pool, self.start)],
+            self.get_next_state_keys,
+            is_target=self.is_target,
+            heuristic=self.get_min_heat_loss_to_target,
+            debugger=debugger,
+        )
+        self.best_heat_loss.update(result.distances)
+        if result.target is not None:
+            self.max_heat_loss = result.target_distance
+            self.best_state = SearchState.from_raw_path(self.pool, result.get_path())[-1]
         return self
 
+    def get_next_state_keys(self, key: StateKey) -> Iterable[Tuple[StateKey, int]]:
+        position, direction = key
+        state = SearchState(pool=self.pool, parent=None, position=position, direction=direction)
+        for next_state in state.get_next_states():
+            yield next_state.key, next_state.get_heat_loss_between(position, next_state.position)
+
+    def is_target(self, key: StateKey) -> bool:
+        position, _ = key
+        return position == self.target
+
+    def get_min_heat_loss_to_target(self, key: StateKey) -> int:
+        """
+        Every point loses at least 1 heat, so the Manhattan distance is an
+        admissible heuristic
+        """
+        position, _ = key
+        return position.manhattan_distance(self.target)
+
 
 @dataclass
 class SearchState:
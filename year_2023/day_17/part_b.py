@@ -10,7 +10,7 @@ class Challenge(BaseChallenge):
     def solve(self, _input: str, debugger: Debugger) -> Union[str, int]:
         """
         >>> Challenge().default_solve()
-        42
+        1268
         """
         return PoolExtended.from_map(_input).find_minimum_heat_loss(debugger=debugger)
 
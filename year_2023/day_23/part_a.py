@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 import string
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import pyperclip
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, Direction, min_and_max_tuples
+from utils import BaseChallenge, ContractedGraph, Point2D, Direction, min_and_max_tuples
 
 
 class Challenge(BaseChallenge):
@@ -16,7 +17,7 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         2130
         """
-        return len(Island.from_text(_input).get_longest_path(debugger=debugger)) - 1
+        return Island.from_text(_input).get_longest_hike_length(debugger=debugger)
 
     def play(self):
         island = Island.from_text(self.input)
@@ -136,6 +137,35 @@ class Island:
             raise Exception(f"Expected 1 point on bottom row ({self.boundaries}) but got {len(bottom_row_points)} ({bottom_row_points})")
         return bottom_row_points[0]
 
+    def get_contracted_graph(self, use_slopes: bool = True) -> ContractedGraph[Point2D]:
+        """
+        >>> _graph = Island.from_text(EXAMPLE_INPUT).get_contracted_graph()
+        >>> len(_graph), _graph.nodes[:2]
+        (9, [Point2D(x=1, y=0), Point2D(x=21, y=22)])
+        >>> _graph.edges[0]
+        [(2, 15, 0)]
+        >>> sum(map(len, _graph.edges))
+        12
+        >>> sum(map(len, Island.from_text(EXAMPLE_INPUT).get_contracted_graph(use_slopes=False).edges))
+        24
+        """
+        def get_neighbours(point: Point2D) -> Iterable[Point2D]:
+            slope = self.slopes.get(point) if use_slopes else None
+            if slope is not None:
+                return [point.offset(slope.offset)]
+            return point.get_manhattan_neighbours()
+
+        return ContractedGraph.from_grid([self.start_point, self.end_point], self.points.__contains__, get_neighbours)
+
+    def get_longest_hike_length(self, use_slopes: bool = True, workers: Optional[int] = None, debugger: Debugger = Debugger(enabled=False)) -> int:
+        """
+        >>> Island.from_text(EXAMPLE_INPUT).get_longest_hike_length()
+        94
+        >>> Island.from_text(EXAMPLE_INPUT).get_longest_hike_length(use_slopes=False)
+        154
+        """
+        return HikeGraph.from_contracted_graph(self.get_contracted_graph(use_slopes=use_slopes)).get_longest_length(workers=workers, debugger=debugger)
+
     def get_longest_path(self, start: Optional[Point2D] = None, end: Optional[Point2D] = None, path_graph: Optional[Dict[Point2D, List[List[Point2D]]]] = None, paths: Optional[List[List[Point2D]]] = None, debugger: Debugger = Debugger(enabled=False)) -> List[Point2D]:
         """
         >>> _island = Island.from_text(EXAMPLE_INPUT)
@@ -345,6 +375,149 @@ class Island:
         return path, list(next_positions)
 
 
+HikeState = Tuple[int, int, int, int]
+
+
+@dataclass
+class HikeGraph:
+    """
+    The contracted trails, with each node's neighbours as `(neighbour, length)`
+    pairs, shortest first so that the depth-first search tries the longest
+    first, for searching for the longest hike with the visited nodes as a
+    bitmask
+    """
+    neighbours: List[List[Tuple[int, int]]]
+    best_entry_lengths: List[int]
+    start: int
+    end: int
+
+    @classmethod
+    def from_contracted_graph(cls, graph: ContractedGraph[Point2D], start: int = 0, end: int = 1) -> "HikeGraph":
+        """
+        >>> HikeGraph.from_contracted_graph(Island.from_text(EXAMPLE_INPUT).get_contracted_graph())
+        HikeGraph(neighbours=[[(2, 15)], [], [(3, 22), (4, 22)], [(5, 24), (7, 30)], [(5, 12), (6, 38)], [(6, 10), (7, 18)],
+            [(8, 10)], [(8, 10)], [(1, 5)]], best_entry_lengths=[0, 5, 15, 22, 22, 24, 38, 30, 10], start=0, end=1)
+        """
+        neighbours = []
+        for node_edges in graph.edges:
+            lengths: Dict[int, int] = {}
+            for neighbour, length, _ in node_edges:
+                lengths[neighbour] = max(length, lengths.get(neighbour, 0))
+            neighbours.append(sorted(lengths.items(), key=lambda item: item[1]))
+        best_entry_lengths = [0] * len(neighbours)
+        for node_neighbours in neighbours:
+            for neighbour, length in node_neighbours:
+                best_entry_lengths[neighbour] = max(length, best_entry_lengths[neighbour])
+        end_entries = [
+            node
+            for node, node_neighbours in enumerate(neighbours)
+            if any(neighbour == end for neighbour, _ in node_neighbours)
+        ]
+        if len(end_entries) == 1:
+            # Once at the only way to the end, going anywhere else would cut it off
+            last_node, = end_entries
+            neighbours[last_node] = [
+                (neighbour, length)
+                for neighbour, length in neighbours[last_node]
+                if neighbour == end
+            ]
+        return cls(neighbours=neighbours, best_entry_lengths=best_entry_lengths, start=start, end=end)
+
+    def get_longest_length(self, workers: Optional[int] = None, branches_per_worker: int = 8, debugger: Debugger = Debugger(enabled=False)) -> int:
+        """
+        Find the longest hike with a depth-first search, optionally splitting
+        the first branches across a pool of `workers` processes
+
+        >>> _graph = HikeGraph.from_contracted_graph(Island.from_text(EXAMPLE_INPUT).get_contracted_graph(use_slopes=False))
+        >>> _graph.get_longest_length()
+        154
+        """
+        if not workers:
+            longest = self.search([self.get_start_state()], debugger=debugger)
+        else:
+            longest, chunks = self.split_states(workers * branches_per_worker)
+            debugger.default_report_if(f"Split the search in {len(chunks)} chunks, longest: {longest}")
+            with ProcessPoolExecutor(workers) as executor:
+                results = executor.map(self.search, chunks, [longest] * len(chunks))
+                for index, chunk_longest in enumerate(results, 1):
+                    longest = max(longest, chunk_longest)
+                    debugger.default_report_if(f"Searched {index}/{len(chunks)} chunks, longest: {longest}")
+        if longest < 0:
+            raise Exception(f"Could not find a hike from {self.start} to {self.end}")
+        return longest
+
+    def get_start_state(self) -> HikeState:
+        return self.start, 1 << self.start, 0, sum(self.best_entry_lengths) - self.best_entry_lengths[self.start]
+
+    def split_states(self, chunk_count: int) -> Tuple[int, List[List[HikeState]]]:
+        """
+        Expand the start breadth-first until there are at least `chunk_count`
+        branches, and deal them into up to `chunk_count` chunks that can be
+        searched separately, along with the longest hike found on the way
+
+        >>> _graph = HikeGraph.from_contracted_graph(Island.from_text(EXAMPLE_INPUT).get_contracted_graph(use_slopes=False))
+        >>> _longest, _chunks = _graph.split_states(4)
+        >>> _longest, len(_chunks), sum(map(len, _chunks)) >= 4
+        (-1, 4, True)
+        >>> max(_graph.search(_chunk, _longest) for _chunk in _chunks)
+        154
+        >>> _graph.split_states(1000)[0]
+        154
+        """
+        longest = -1
+        states = [self.get_start_state()]
+        while states and len(states) < chunk_count:
+            next_states = []
+            for state in states:
+                for next_state in self.get_next_states(state):
+                    node, _, length, _ = next_state
+                    if node == self.end:
+                        longest = max(longest, length)
+                        continue
+                    next_states.append(next_state)
+            states = next_states
+        chunk_count = min(len(states), chunk_count)
+        return longest, [states[index::chunk_count] for index in range(chunk_count)]
+
+    def search(self, states: List[HikeState], longest: int = -1, debugger: Debugger = Debugger(enabled=False)) -> int:
+        """
+        Search depth-first from the states, pruning any hike that couldn't get
+        longer than the longest, even if it entered every remaining node
+        through its longest edge
+        """
+        neighbours, best_entry_lengths, end = self.neighbours, self.best_entry_lengths, self.end
+        stack = list(states)
+        reporting = bool(debugger)
+        while stack:
+            if reporting:
+                debugger.step()
+                if debugger.should_report():
+                    debugger.default_report(f"Stack: {len(stack)}, longest: {longest}")
+            node, visited, length, remaining = stack.pop()
+            for neighbour, edge_length in neighbours[node]:
+                flag = 1 << neighbour
+                if visited & flag:
+                    continue
+                next_length = length + edge_length
+                if neighbour == end:
+                    if next_length > longest:
+                        longest = next_length
+                    continue
+                next_remaining = remaining - best_entry_lengths[neighbour]
+                if next_length + next_remaining <= longest:
+                    continue
+                stack.append((neighbour, visited | flag, next_length, next_remaining))
+        return longest
+
+    def get_next_states(self, state: HikeState) -> Iterable[HikeState]:
+        node, visited, length, remaining = state
+        for neighbour, edge_length in self.neighbours[node]:
+            flag = 1 << neighbour
+            if visited & flag:
+                continue
+            yield neighbour, visited | flag, length + edge_length, remaining - self.best_entry_lengths[neighbour]
+
+
 EXAMPLE_INPUT = """
 #.#####################
 #.......#########...###
@@ -15,7 +15,7 @@ class Challenge(BaseChallenge):
         >>> solution
         6710
         """
-        return len(IslandExpanded.from_text(_input).get_longest_path_without_slopes(debugger=debugger)) - 1
+        return IslandExpanded.from_text(_input).get_longest_hike_length(use_slopes=False, debugger=debugger)
 
     def play(self):
         island = IslandExpanded.from_text(self.input)
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 from dataclasses import dataclass
 from functools import cached_property
-from typing import List, Optional, Set, Tuple, Union
+from typing import Iterable, List, Optional, Set, Tuple, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, Direction, min_and_max_tuples
+from utils import BaseChallenge, Point2D, Direction, SearchResult, dijkstra, \
+    min_and_max_tuples
 
 
 class Challenge(BaseChallenge):
@@ -17,6 +18,7 @@ class Challenge(BaseChallenge):
 
 
 Path = List[Tuple[Point2D, Direction, int]]
+State = Tuple[Point2D, Direction]
 
 
 @dataclass
@@ -190,11 +192,11 @@ class Maze:
         #.###.#####.#^#
         #.#.#.......#^#
         #.#.#####.###^#
-        #..>>>>>>>>v#^#
-        ###^#.#####v#^#
-        #>>^#.....#v#^#
-        #^#.#.###.#v#^#
-        #^....#...#v#^#
+        #....>>>>>>v#^#
+        ###.#^#####v#^#
+        #...#^....#v#^#
+        #.#.#^###.#v#^#
+        #>>>>^#...#v#^#
         #^###.#.#.#v#^#
         #S..#.....#>>^#
         ###############
@@ -236,42 +238,29 @@ class Maze:
         #S#>>^..........#
         #################
         """
-        start_path: Path = [(self.start, Direction.Right, 0)]
-        queue: List[Path] = [start_path]
-        best_path_by_position = {self.start: start_path}
-        while queue:
-            path = queue.pop(0)
-            position, direction, cost = path[-1]
-            path_additions: List[Path] = [
-                [(position.offset(direction.offset), direction, cost + 1)],
-                [
-                    (position, direction.clockwise, cost + 1000),
-                    (position.offset(direction.clockwise.offset), direction.clockwise, cost + 1001),
-                ],
-                [
-                    (position, direction.counter_clockwise, cost + 1000),
-                    (position.offset(direction.counter_clockwise.offset), direction.counter_clockwise, cost + 1001),
-                ],
-                [
-                    (position, direction.clockwise, cost + 1000),
-                    (position, direction.opposite, cost + 2000),
-                    (position.offset(direction.opposite.offset), direction.opposite, cost + 2001),
-                ],
-            ]
-            for path_addition in path_additions:
-                next_position, next_direction, next_cost = path_addition[-1]
-                if next_position in self.walls:
-                    continue
-                if next_position in best_path_by_position and best_path_by_position[next_position][-1][2] <= next_cost:
-                    continue
-                next_path = path + path_addition
-                best_path_by_position[next_position] = next_path
-                if next_position == self.end:
-                    continue
-                queue.append(next_path)
-        if self.end not in best_path_by_position:
+        result = self.search()
+        if result.target is None:
             raise Exception(f"Could not find {self.end} from {self.start}")
-        return best_path_by_position[self.end]
+        return [
+            (position, direction, result.distances[(position, direction)])
+            for position, direction in result.get_path()
+        ]
+
+    def search(self, keep_all_parents: bool = False) -> SearchResult[State]:
+        return dijkstra(
+            [(self.start, Direction.Right)],
+            self.get_next_states,
+            is_target=lambda state: state[0] == self.end,
+            keep_all_parents=keep_all_parents,
+        )
+
+    def get_next_states(self, state: State) -> Iterable[Tuple[State, int]]:
+        position, direction = state
+        next_position = position.offset(direction.offset)
+        if next_position not in self.walls:
+            yield (next_position, direction), 1
+        yield (position, direction.clockwise), 1000
+        yield (position, direction.counter_clockwise), 1000
 
 
 
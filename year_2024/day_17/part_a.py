@@ -3,9 +3,10 @@ from abc import ABC
 from dataclasses import dataclass, field
 import re
 from math import floor
-from typing import ClassVar, Dict, Generic, List, Optional, Union, TypeVar
+from typing import ClassVar, Dict, Generic, List, Optional, Union, TypeVar, Tuple
 
 import click
+import numpy as np
 
 from aox.challenge import Debugger
 from utils import BaseChallenge, PolymorphicParser, Cls, Self
@@ -152,6 +153,53 @@ class Machine(Generic[InstructionT]):
         return ','.join(map(str, self.memory.out))
 
 
+@dataclass
+class BatchedMachine(Generic[InstructionT]):
+    """
+    Runs the program for many values of A at once, each in a uint64 lane, by
+    applying each instruction to all the lanes that are on it
+    """
+    instructions: List[InstructionT]
+
+    @classmethod
+    def from_machine(cls: Cls["BatchedMachine"], machine: Machine) -> Self["BatchedMachine"]:
+        return cls(instructions=machine.instructions)
+
+    def run(self, a_values: Union[np.ndarray, List[int]], max_output_length: int, b: int = 0, c: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the output of each lane, padded with -1, and its length. A lane
+        stops when it reaches `max_output_length`.
+
+        >>> _batched = BatchedMachine.from_machine(Machine.from_opcodes([0, 1, 5, 4, 3, 0]))
+        >>> _out, _lengths = _batched.run([2024, 0, 7], 12)
+        >>> _out[0].tolist(), _lengths.tolist()
+        ([4, 2, 5, 6, 7, 7, 7, 7, 3, 1, 0, -1], [11, 1, 3])
+        >>> _batched.run([2024], 3)[0].tolist()
+        [[4, 2, 5]]
+        >>> machine = Machine.from_text(Challenge().input)
+        >>> _out, _lengths = BatchedMachine.from_machine(machine).run([machine.memory.a], 20)
+        >>> ','.join(map(str, _out[0, :_lengths[0]])) == machine.run().show_output()
+        True
+        >>> BatchedMachine.from_machine(Machine.from_opcodes([6, 4, 5, 5, 7, 5, 5, 6])).run([1 << 63], 2, b=64, c=1)[0].tolist()
+        [[0, 0]]
+        """
+        memory = BatchedMemory.from_a_values(np.asarray(a_values, dtype=np.uint64), max_output_length, b=b, c=c)
+        last_pc = len(self.instructions) - 1
+        while True:
+            active = (memory.pc < last_pc) & (memory.out_length < max_output_length)
+            if not active.any():
+                break
+            for pc in np.unique(memory.pc[active]).tolist():
+                lanes = np.flatnonzero(active & (memory.pc == pc))
+                instruction = self.instructions[pc]
+                operand = self.instructions[pc + 1].opcode
+                new_pc = instruction.operate_batched(memory, operand, lanes)
+                if new_pc is None:
+                    new_pc = pc + 2
+                memory.pc[lanes] = new_pc
+        return memory.out, memory.out_length
+
+
 @dataclass
 class Memory:
     a: int = 0
@@ -207,6 +255,51 @@ class Memory:
         )
 
 
+@dataclass
+class BatchedMemory:
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    pc: np.ndarray
+    out: np.ndarray
+    out_length: np.ndarray
+
+    @classmethod
+    def from_a_values(cls, a_values: np.ndarray, max_output_length: int, b: int = 0, c: int = 0) -> "BatchedMemory":
+        lane_count = len(a_values)
+        return cls(
+            a=a_values.copy(),
+            b=np.full(lane_count, b, dtype=np.uint64),
+            c=np.full(lane_count, c, dtype=np.uint64),
+            pc=np.zeros(lane_count, dtype=np.int64),
+            out=np.full((lane_count, max_output_length), -1, dtype=np.int8),
+            out_length=np.zeros(lane_count, dtype=np.int64),
+        )
+
+    def get_combo(self, operand: int, lanes: np.ndarray) -> np.ndarray:
+        if 0 <= operand <= 3:
+            return np.full(len(lanes), operand, dtype=np.uint64)
+        if 4 <= operand <= 6:
+            return [self.a, self.b, self.c][operand - 4][lanes]
+        raise Exception(f"Cannot parse combo operand {operand}")
+
+    def divide_a(self, operand: int, lanes: np.ndarray) -> np.ndarray:
+        """
+        >>> _memory = BatchedMemory.from_a_values(np.array([5, 1 << 63], dtype=np.uint64), 1, b=64)
+        >>> _memory.divide_a(1, np.array([0, 1])).tolist()
+        [2, 4611686018427387904]
+        >>> _memory.divide_a(5, np.array([0, 1])).tolist()
+        [0, 0]
+        """
+        power = self.get_combo(operand, lanes)
+        # Shifting by 64 bits or more is not defined for uint64
+        return np.where(power < 64, self.a[lanes] >> np.minimum(power, np.uint64(63)), np.uint64(0))
+
+    def write_out(self, value: np.ndarray, lanes: np.ndarray):
+        self.out[lanes, self.out_length[lanes]] = value
+        self.out_length[lanes] += 1
+
+
 @dataclass
 class InstructionBase(PolymorphicParser, ABC, root=True):
     opcode: ClassVar[int]
@@ -218,6 +311,9 @@ class InstructionBase(PolymorphicParser, ABC, root=True):
     def operate(self, memory: Memory, operand: int) -> Optional[int]:
         raise NotImplementedError()
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray) -> Optional[np.ndarray]:
+        raise NotImplementedError()
+
     @classmethod
     def get_instructions_by_opcode(cls) -> Dict[int, "InstructionBase"]:
         # noinspection PyUnresolvedReferences,PyTypeChecker
@@ -241,6 +337,9 @@ class AdvInstruction(InstructionBase):
         denominator = floor(2 ** memory.get_combo(operand))
         memory.a = numerator // denominator
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.a[lanes] = memory.divide_a(operand, lanes)
+
     def disassemble(self, operand: int) -> str:
         return f"a = a // (2 ** {Memory.disassemble_combo(operand)})"
 
@@ -254,6 +353,9 @@ class BxlInstruction(InstructionBase):
     def operate(self, memory: Memory, operand: int):
         memory.b = memory.b ^ operand
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.b[lanes] ^= np.uint64(operand)
+
     def disassemble(self, operand: int) -> str:
         return f"b = b ^ {operand}"
 
@@ -267,6 +369,9 @@ class BstInstruction(InstructionBase):
     def operate(self, memory: Memory, operand: int):
         memory.b = memory.get_combo(operand) % 8
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.b[lanes] = memory.get_combo(operand, lanes) & np.uint64(7)
+
     def disassemble(self, operand: int) -> str:
         return f"b = {Memory.disassemble_combo(operand)} % 8"
 
@@ -282,6 +387,9 @@ class JnzInstruction(InstructionBase):
             return None
         return operand
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray) -> Optional[np.ndarray]:
+        return np.where(memory.a[lanes] == 0, memory.pc[lanes] + 2, operand)
+
     def disassemble(self, operand: int) -> str:
         return f"if a != 0: goto {operand}"
 
@@ -295,6 +403,9 @@ class BxcInstruction(InstructionBase):
     def operate(self, memory: Memory, operand: int):
         memory.b = memory.b ^ memory.c
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.b[lanes] ^= memory.c[lanes]
+
     def disassemble(self, operand: int) -> str:
         return f"b = b ^ c"
 
@@ -308,6 +419,9 @@ class OutInstruction(InstructionBase):
     def operate(self, memory: Memory, operand: int):
         memory.write_out(memory.get_combo(operand) % 8)
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.write_out(memory.get_combo(operand, lanes) & np.uint64(7), lanes)
+
     def disassemble(self, operand: int) -> str:
         return f"out({Memory.disassemble_combo(operand)} % 8)"
 
@@ -323,6 +437,9 @@ class BdvInstruction(InstructionBase):
         denominator = floor(2 ** memory.get_combo(operand))
         memory.b = numerator // denominator
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.b[lanes] = memory.divide_a(operand, lanes)
+
     def disassemble(self, operand: int) -> str:
         return f"b = a // (2 ** {Memory.disassemble_combo(operand)})"
 
@@ -338,6 +455,9 @@ class CdvInstruction(InstructionBase):
         denominator = floor(2 ** memory.get_combo(operand))
         memory.c = numerator // denominator
 
+    def operate_batched(self, memory: BatchedMemory, operand: int, lanes: np.ndarray):
+        memory.c[lanes] = memory.divide_a(operand, lanes)
+
     def disassemble(self, operand: int) -> str:
         return f"c = a // (2 ** {Memory.disassemble_combo(operand)})"
 
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-from typing import ClassVar, Dict, List, Tuple, Union
+from typing import ClassVar, Dict, List, Optional, Tuple, Union
 
 import click
+import numpy as np
 
 from aox.challenge import Debugger
 from utils import BaseChallenge
@@ -14,7 +15,7 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         236555995274861
         """
-        return OptimisedMachine().find_smallest_value_for_output()
+        return find_smallest_quine_a(part_a.Machine.from_text(_input))
 
     def play(self):
         machine = part_a.Machine.from_text(self.input)
@@ -145,6 +146,34 @@ class Challenge(BaseChallenge):
                 break
 
 
+def find_smallest_quine_a(machine: part_a.Machine) -> Optional[int]:
+    """
+    Find the smallest A for which the program outputs itself, assuming that it
+    outputs once per octal digit of A, and that the last outputs only depend
+    on the most significant digits. It builds A one octal digit at a time,
+    keeping every prefix whose output matches the end of the program, and
+    checks all 8 extensions of all prefixes in one batched run.
+
+    >>> find_smallest_quine_a(part_a.Machine.from_opcodes([0, 3, 5, 4, 3, 0]))
+    117440
+    >>> find_smallest_quine_a(part_a.Machine.from_text(Challenge().input)) == OptimisedMachine().find_smallest_value_for_output()
+    True
+    """
+    batched = part_a.BatchedMachine.from_machine(machine)
+    program = [instruction.opcode for instruction in machine.instructions]
+    prefixes = np.zeros(1, dtype=np.uint64)
+    for length in range(1, len(program) + 1):
+        candidates = (prefixes[:, np.newaxis] * np.uint64(8) + np.arange(8, dtype=np.uint64)).ravel()
+        candidates = candidates[candidates != 0]
+        out, out_length = batched.run(candidates, length + 1, b=machine.memory.b, c=machine.memory.c)
+        expected = np.array(program[-length:], dtype=np.int8)
+        matching = (out_length == length) & (out[:, :length] == expected).all(axis=1)
+        prefixes = candidates[matching]
+        if not len(prefixes):
+            return None
+    return int(prefixes.min())
+
+
 class OptimisedMachine:
     expected_output: ClassVar[List[int]] = [2, 4, 1, 3, 7, 5, 4, 2, 0, 3, 1, 5, 5, 5, 3, 0]
 
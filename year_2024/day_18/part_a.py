@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 from dataclasses import dataclass
 from functools import cached_property
-from typing import List, Optional, Set, Tuple, Union
+from typing import Iterable, List, Optional, Set, Tuple, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, make_and_show_string_table, min_and_max_tuples
+from utils import BaseChallenge, Point2D, bfs, make_and_show_string_table, min_and_max_tuples
 
 
 class Challenge(BaseChallenge):
@@ -75,6 +75,14 @@ class Space:
         """
         return len(self.find_shortest_path()) - 1
 
+    def get_next_positions(self, position: Point2D) -> Iterable[Point2D]:
+        for next_position in position.get_manhattan_neighbours():
+            if next_position in self.obstacles:
+                continue
+            if not self.is_within_boundaries(next_position):
+                continue
+            yield next_position
+
     def find_shortest_path(self, start: Point2D = Point2D(0, 0), end: Optional[Point2D] = None) -> List[Point2D]:
         """
         >>> _space = Space.from_text(EXAMPLE_TEXT, limit=12, size=7)
@@ -89,24 +97,10 @@ class Space:
         """
         if end is None:
             end = Point2D(self.size - 1, self.size - 1)
-        seen = {start}
-        queue = [[start]]
-        while queue:
-            path = queue.pop(0)
-            position = path[-1]
-            for next_position in position.get_manhattan_neighbours():
-                if next_position in self.obstacles:
-                    continue
-                if not self.is_within_boundaries(next_position):
-                    continue
-                if next_position in seen:
-                    continue
-                next_path = path + [next_position]
-                if next_position == end:
-                    return next_path
-                seen.add(next_position)
-                queue.append(next_path)
-        raise Exception(f"Could not find path from {start} to {end}")
+        result = bfs([start], self.get_next_positions, is_target=lambda position: position == end)
+        if result.target is None:
+            raise Exception(f"Could not find path from {start} to {end}")
+        return result.get_path()
 
 
 EXAMPLE_TEXT = """
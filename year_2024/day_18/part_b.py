@@ -11,7 +11,7 @@ class Challenge(BaseChallenge):
     def solve(self, _input: str, debugger: Debugger) -> Union[str, int]:
         """
         >>> Challenge().default_solve()
-        52,32
+        '52,32'
         """
         return ChangingSpace.from_text(_input).find_first_point_text_to_block_end(debugger=debugger)
 
@@ -5,7 +5,7 @@ from itertools import groupby
 from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge, Point2D, min_and_max_tuples, make_and_show_string_table, parse_map_points
+from utils import BaseChallenge, Point2D, bfs, min_and_max_tuples, make_and_show_string_table, parse_map_points
 
 
 class Challenge(BaseChallenge):
@@ -186,19 +186,13 @@ class Racetrack:
                     yield duration_save
 
     def get_distance_map(self, start: Point2D) -> Dict[Point2D, int]:
-        queue = [start]
-        distance_map = {start: 0}
-        while queue:
-            position = queue.pop(0)
-            distance = distance_map[position]
-            for next_position in position.get_manhattan_neighbours():
-                if next_position in self.walls:
-                    continue
-                if next_position in distance_map:
-                    continue
-                distance_map[next_position] = distance + 1
-                queue.append(next_position)
-        return distance_map
+        return bfs([start], self.get_next_positions).distances
+
+    def get_next_positions(self, position: Point2D) -> Iterable[Point2D]:
+        for next_position in position.get_manhattan_neighbours():
+            if next_position in self.walls:
+                continue
+            yield next_position
 
     def get_shortest_duration_without_cheats(self, start_distance_map: Optional[Dict[Point2D, int]] = None) -> int:
         """
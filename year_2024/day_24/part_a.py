@@ -5,7 +5,7 @@ from functools import cached_property
 from typing import Callable, ClassVar, Dict, List, Optional, Union
 
 from aox.challenge import Debugger
-from utils import BaseChallenge
+from utils import BaseChallenge, Circuit
 
 
 class Challenge(BaseChallenge):
@@ -40,17 +40,32 @@ class Device:
             values.setdefault(wire.result, None)
         return cls(values=values, wires=wires)
 
-    def __getitem__(self, key: str) -> Optional[bool]:
-        value = self.values[key]
-        if value is None:
-            raise KeyError(key)
-        return value
+    def __getitem__(self, key: str) -> bool:
+        return self.circuit[key]
 
     def __setitem__(self, key: str, value: bool):
+        """
+        >>> _device = Device.from_text(SMALL_EXAMPLE_TEXT)
+        >>> _device["y00"] = True
+        >>> _device.get_output()
+        5
+        """
         self.values[key] = value
+        self.circuit.set_values({key: value})
 
     def __contains__(self, item: str) -> bool:
-        return self.values[item] is not None
+        return item in self.circuit
+
+    @cached_property
+    def circuit(self) -> Circuit:
+        return Circuit({
+            wire.result: (wire.operator, (wire.left, wire.right))
+            for wire in self.wires
+        }, {
+            gate: value
+            for gate, value in self.values.items()
+            if value is not None
+        })
 
     @cached_property
     def wires_by_result(self) -> Dict[str, "Wire"]:
@@ -80,24 +95,7 @@ class Device:
         >>> Device.from_text(SMALL_EXAMPLE_TEXT).get_variable_values("z")
         [True, False, False]
         """
-        gates = self.get_variable_gates(variable)
-        stack = list(gates)
-        seen = set(stack)
-        while stack:
-            gate = stack[-1]
-            if gate in self:
-                stack.pop()
-                continue
-            wire = self.wires_by_result[gate]
-            dependencies = {wire.left, wire.right}
-            if all(dependency in self for dependency in dependencies):
-                self[gate] = wire.calculate(self)
-                stack.pop()
-                continue
-            next_items = dependencies - seen
-            stack.extend(next_items)
-            seen.update(next_items)
-        return [self[gate] for gate in gates]
+        return [self[gate] for gate in self.get_variable_gates(variable)]
 
     def get_variable_gates(self, variable: str) -> List[str]:
         """
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
+import random
 from itertools import groupby, combinations, permutations
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import click
 import pyperclip
 
 from aox.challenge import Debugger
-from utils import BaseChallenge
+from utils import BaseChallenge, Circuit, CircuitCycleException
 from year_2024.day_24 import part_a
 
 
@@ -16,7 +17,10 @@ class Challenge(BaseChallenge):
         >>> Challenge().default_solve()
         'ctg,dmh,dvq,rpb,rpv,z11,z31,z38'
         """
-        return 'ctg,dmh,dvq,rpb,rpv,z11,z31,z38'
+        swaps = DeviceExtended.from_text(_input).find_adder_swaps(debugger=debugger)
+        if swaps is None:
+            raise Exception("Could not find the swapped wires")
+        return ",".join(sorted(gate for swap in swaps for gate in swap))
 
     def play(self):
         device = DeviceExtended.from_text(self.input)
@@ -464,6 +468,155 @@ class DeviceExtended(part_a.Device):
             return gate
         return self.get_wire_expression(wire, seen=seen)
 
+    def find_adder_swaps(self, count: int = 4, vector_count: int = 64, debugger: Debugger = Debugger(enabled=False)) -> Optional[List[Tuple[str, str]]]:
+        """
+        Find the swapped outputs bit by bit: check the adder on many x/y pairs
+        at once, and at the first wrong output bit, try swapping pairs of gates
+        from the stage of that bit, and the one before it, that move the wrong
+        bit higher. If the rest of the swaps can't fix the remaining bits, it
+        backtracks to the next candidate swap. All the trials swap gates in
+        place on a single compiled circuit, that only re-evaluates the gates
+        downstream of each swap.
+
+        >>> _device = DeviceExtended.from_text(make_ripple_carry_adder_text(4))
+        >>> _device.find_adder_swaps(count=0)
+        []
+        >>> _device.swap_wires_by_name([("z02", "z01")]).find_adder_swaps(count=1)
+        [('z01', 'z02')]
+        >>> _device.swap_wires_by_name([("z02", "z01")]).find_adder_swaps(count=2)
+        """
+        inputs, expected = self.get_bit_sliced_vectors(vector_count)
+        circuit = Circuit(self.circuit.gates, inputs)
+        swaps = self.search_adder_swaps(circuit, count, expected, debugger=debugger)
+        if swaps is None:
+            return None
+        return sorted(swaps)
+
+    def search_adder_swaps(self, circuit: Circuit, count: int, expected: Dict[str, int], debugger: Debugger = Debugger(enabled=False)) -> Optional[List[Tuple[str, str]]]:
+        """
+        >>> _device = DeviceExtended.from_text(make_ripple_carry_adder_text(6))
+        >>> _inputs, _expected = _device.get_bit_sliced_vectors()
+        >>> _swapped = _device.swap_wires_by_name([("z00", "c01"), ("c00", "r01")])
+        >>> _circuit = Circuit(_swapped.circuit.gates, _inputs)
+        >>> next(iter(_swapped.get_fixing_swaps(_circuit, 0, _expected)))
+        ('c01', 'r01')
+        >>> _swapped.search_adder_swaps(_circuit, 2, _expected)
+        [('c01', 'z00'), ('c00', 'r01')]
+        >>> _circuit.as_dict() == Circuit(_swapped.circuit.gates, _inputs).as_dict()
+        True
+        """
+        wrong_bit = self.get_first_wrong_sum_bit(circuit, expected)
+        if wrong_bit is None:
+            return [] if count == 0 else None
+        if count == 0:
+            return None
+        for swap in self.get_fixing_swaps(circuit, wrong_bit, expected):
+            debugger.default_report_if(f"Trying to fix bit {wrong_bit} by swapping {', '.join(swap)}")
+            circuit.swap_outputs([swap])
+            rest = self.search_adder_swaps(circuit, count - 1, expected, debugger=debugger)
+            circuit.swap_outputs([swap])
+            if rest is not None:
+                return [swap] + rest
+        return None
+
+    def get_fixing_swaps(self, circuit: Circuit, wrong_bit: int, expected: Dict[str, int]) -> Iterable[Tuple[str, str]]:
+        """
+        The swaps that move the first wrong bit higher, starting from the
+        gates of that bit's stage, and the one before it. Each swap is tried on
+        the circuit and undone, and swaps that create a cycle are skipped.
+        """
+        stages = self.get_gate_stages(circuit)
+        local_gates = sorted(
+            gate
+            for gate, stage in stages.items()
+            if wrong_bit - 1 <= stage <= wrong_bit
+        )
+        candidate_pairs = list(combinations(local_gates, 2)) + [
+            (first, second)
+            for first in local_gates
+            for second in sorted(stages)
+            if second not in local_gates
+        ]
+        for first, second in candidate_pairs:
+            try:
+                circuit.swap_outputs([(first, second)])
+            except CircuitCycleException:
+                continue
+            next_wrong_bit = self.get_first_wrong_sum_bit(circuit, expected)
+            circuit.swap_outputs([(first, second)])
+            if next_wrong_bit is None or next_wrong_bit > wrong_bit:
+                yield tuple(sorted((first, second)))
+
+    def get_gate_stages(self, circuit: Optional[Circuit] = None) -> Dict[str, int]:
+        """
+        The stage of a gate is the highest input bit it depends on, which, for
+        a ripple-carry adder, groups the gates of each bit together
+
+        >>> DeviceExtended.from_text(part_a.SMALL_EXAMPLE_TEXT).get_gate_stages()
+        {'z00': 0, 'z01': 1, 'z02': 2}
+        """
+        if circuit is None:
+            circuit = self.circuit
+        stages = {}
+        for output_slot, _, input_slots in circuit.operations:
+            stages[circuit.names[output_slot]] = max(
+                stages[name] if name in stages else int(name[1:])
+                for input_slot in input_slots
+                for name in [circuit.names[input_slot]]
+            )
+        return {
+            wire.result: stages[wire.result]
+            for wire in self.wires
+        }
+
+    def get_bit_sliced_vectors(self, count: int = 64, seed: int = 0) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Pack `count` random x/y pairs into ints, with each test case in a
+        separate bit, so that a single evaluation of the circuit checks all of
+        them
+
+        >>> _inputs, _expected = DeviceExtended.from_text(make_ripple_carry_adder_text(2)).get_bit_sliced_vectors(3, seed=1)
+        >>> _inputs, _expected
+        ({'x00': 4, 'x01': 6, 'y00': 3, 'y01': 3}, {'z00': 7, 'z01': 5, 'z02': 2})
+        """
+        rng = random.Random(seed)
+        x_gates = list(reversed(self.get_variable_gates("x")))
+        y_gates = list(reversed(self.get_variable_gates("y")))
+        z_gates = list(reversed(self.get_variable_gates("z")))
+        xs = [rng.getrandbits(len(x_gates)) for _ in range(count)]
+        ys = [rng.getrandbits(len(y_gates)) for _ in range(count)]
+        zs = [x + y for x, y in zip(xs, ys)]
+        inputs = {}
+        for gates, numbers in [(x_gates, xs), (y_gates, ys)]:
+            inputs.update(self.pack_bits(gates, numbers))
+        expected = self.pack_bits(z_gates, zs)
+        return inputs, expected
+
+    def pack_bits(self, gates: List[str], numbers: List[int]) -> Dict[str, int]:
+        return {
+            gate: sum(
+                ((number >> index) & 1) << vector_index
+                for vector_index, number in enumerate(numbers)
+            )
+            for index, gate in enumerate(gates)
+        }
+
+    def get_first_wrong_sum_bit(self, circuit: Circuit, expected: Dict[str, int]) -> Optional[int]:
+        """
+        >>> _device = DeviceExtended.from_text(make_ripple_carry_adder_text(4))
+        >>> _inputs, _expected = _device.get_bit_sliced_vectors()
+        >>> _circuit = Circuit(_device.circuit.gates, _inputs)
+        >>> _device.get_first_wrong_sum_bit(_circuit, _expected)
+        >>> sorted(_circuit.swap_outputs([("z02", "z03")]))
+        ['z02', 'z03']
+        >>> _device.get_first_wrong_sum_bit(_circuit, _expected)
+        2
+        """
+        for gate in reversed(self.get_variable_gates("z")):
+            if circuit[gate] != expected[gate]:
+                return int(gate[1:])
+        return None
+
     def find_swaps(self, count: int = 4, debugger: Debugger = Debugger(enabled=False)) -> Optional[List[Tuple[str, str]]]:
         pass
         """
@@ -510,17 +663,17 @@ class DeviceExtended(part_a.Device):
         return None
 
     def is_output_addition(self) -> bool:
-        x = self.get_variable("x")
-        y = self.get_variable("y")
-        z = self.get_variable("z")
+        try:
+            x = self.get_variable("x")
+            y = self.get_variable("y")
+            z = self.get_variable("z")
+        except CircuitCycleException:
+            return False
         return z == x + y
 
     def find_swaps_2(self, count: int = 4, exclude: Optional[Set[str]] = None, debugger: Debugger = Debugger(enabled=False)) -> Optional[List[Tuple[str, str]]]:
         if count == 0:
-            x = self.get_variable("x")
-            y = self.get_variable("y")
-            z = self.get_variable("z")
-            if z == x + y:
+            if self.is_output_addition():
                 return []
             else:
                 return None
@@ -608,5 +761,47 @@ class DeviceExtended(part_a.Device):
         ]
 
 
+def make_ripple_carry_adder_text(bit_count: int) -> str:
+    """
+    >>> print(make_ripple_carry_adder_text(2))
+    x00: 0
+    x01: 0
+    y00: 0
+    y01: 0
+    <BLANKLINE>
+    x00 XOR y00 -> z00
+    x00 AND y00 -> c00
+    x01 XOR y01 -> p01
+    x01 AND y01 -> r01
+    p01 XOR c00 -> z01
+    p01 AND c00 -> a01
+    a01 OR r01 -> z02
+    >>> DeviceExtended.from_text(make_ripple_carry_adder_text(4)).is_output_addition()
+    True
+    """
+    lines = [
+        f"{prefix}{index:02}: 0"
+        for prefix in "xy"
+        for index in range(bit_count)
+    ]
+    lines.append("")
+    for index in range(bit_count):
+        carry_out = f"c{index:02}" if index < bit_count - 1 else f"z{bit_count:02}"
+        if index == 0:
+            lines.extend([
+                "x00 XOR y00 -> z00",
+                f"x00 AND y00 -> {carry_out}",
+            ])
+            continue
+        lines.extend([
+            f"x{index:02} XOR y{index:02} -> p{index:02}",
+            f"x{index:02} AND y{index:02} -> r{index:02}",
+            f"p{index:02} XOR c{index - 1:02} -> z{index:02}",
+            f"p{index:02} AND c{index - 1:02} -> a{index:02}",
+            f"a{index:02} OR r{index:02} -> {carry_out}",
+        ])
+    return "\n".join(lines)
+
+
 Challenge.main()
 challenge = Challenge()